@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+# This script load-tests the HTTP API locally: it seeds a scratch database with users and problems, serves it with gunicorn, replays a mix of user traffic at increasing concurrency, and reports per-route latency histograms and the saturation point.
+# Author: Jay Patel
+
+"""
+Leetle HTTP Load Test
+
+Seeds N users (one shared password, with streaks and stats so the
+leaderboard has work to do) and M problems (copies of the seed problems)
+into a SQLite file in a temporary directory, starts
+`gunicorn -c gunicorn.conf.py app:app` on it bound to 127.0.0.1, and
+drives it with virtual users over keep-alive connections. Nothing outside
+this machine is used. Each virtual user logs in, then repeats actions
+drawn from the traffic model below, pausing an exponentially distributed
+think time between them, and logs in again every --session-length
+actions:
+
+    problem       GET  /problem                   the home page's daily problem
+    leaderboard   GET  /api/leaderboard           polled while the page is open
+    profile       GET  /api/user/stats/<id>       a random user's profile
+    hints         GET  /api/hints/<id>
+    hint_reveal   POST /api/hints/<id>/partial
+    submit        POST /submit                    the Python or JavaScript reference solution, or a wrong answer
+    login         POST /auth/login
+
+Concurrency is ramped through --ramp, each stage lasting --stage-seconds;
+users started in one stage keep running in the next. For each stage the
+report gives requests per second and p50/p95/p99 overall and per route,
+plus a latency histogram per route. A response is an error when it is a
+5xx or the connection fails; 429 and 503 are counted as rejections (the
+server shedding load), other 4xx are normal answers such as a wrong
+submission or an exhausted hint quota. The login rate limits are raised
+for the run, since every virtual user shares one address.
+
+The saturation point is the last stage before throughput stops growing
+by at least --min-gain, p95 exceeds --slo-ms, or errors and rejections
+exceed --max-error-rate.
+
+Usage:
+    python benchmarks/http_load.py                                   # 200 users, 20 problems, ramp 1..32
+    python benchmarks/http_load.py --users 2000 --problems 100 --ramp 4 8 16 32 64
+    python benchmarks/http_load.py --workers 2 --stage-seconds 30 --slo-ms 300 --json
+    python benchmarks/http_load.py --think-ms 0 --output load.json   # Closed loop, save the results
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, APP_DIR)
+
+PASSWORD = 'load-test-password'
+# Relative frequency of each action after login
+TRAFFIC_MODEL = {
+    'problem': 35,
+    'leaderboard': 20,
+    'profile': 15,
+    'hints': 10,
+    'submit': 10,
+    'login': 5,
+    'hint_reveal': 5,
+}
+# Share of submissions that are wrong, and the languages they are written in
+WRONG_SUBMISSION_RATE = 0.3
+SUBMIT_LANGUAGES = {'python': 'py', 'javascript': 'js'}
+# Upper bounds, in ms, of the latency histogram buckets; the last bucket is everything slower
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SERVER_START_TIMEOUT = 60
+
+
+# Seeds the scratch database with users, their stats and copies of the seed problems.
+# Inputs: database_uri (str), users (int), problems (int), seed (int)
+# Outputs: Dictionary with the problem titles in id order
+# Contributor: Jay Patel
+def seed_scratch_database(database_uri: str, users: int, problems: int, seed: int) -> dict:
+    from werkzeug.security import generate_password_hash
+    from leetle import create_app
+    from leetle.database import db
+    from leetle.models import Problem, User, UserStats
+    from leetle.seed import SEED_DIR, bulk_upsert, problem_values, read_definitions
+
+    rng = random.Random(seed)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri})
+    with app.app_context():
+        db.create_all()
+        definitions = [definition for definition, _ in read_definitions([os.path.join(SEED_DIR, 'problems')])]
+        rows = []
+        for i in range(problems):
+            definition = definitions[i % len(definitions)]
+            copy = i // len(definitions)
+            title = definition['title'] if copy == 0 else f"{definition['title']} ({copy + 1})"
+            rows.append(problem_values(dict(definition, title=title), 'seed'))
+        bulk_upsert(Problem, 'title', rows)
+
+        # One hash for everyone; hashing thousands of passwords would dominate seeding
+        password_hash = generate_password_hash(PASSWORD)
+        for start in range(0, users, 1000):
+            batch = range(start, min(users, start + 1000))
+            db.session.execute(db.insert(User), [{
+                'email': f'load{i}@leetle.com', 'password_hash': password_hash,
+                'current_streak': rng.randint(0, 30), 'longest_streak': rng.randint(30, 90),
+                'total_solutions': rng.randint(0, 200),
+            } for i in batch])
+            db.session.commit()
+        user_ids = [row[0] for row in db.session.query(User.id).order_by(User.id)]
+        for start in range(0, len(user_ids), 1000):
+            stats = []
+            for user_id in user_ids[start:start + 1000]:
+                attempts = rng.randint(1, 300)
+                correct = rng.randint(0, attempts)
+                stats.append({'user_id': user_id, 'total_attempts': attempts, 'total_correct': correct,
+                              'success_rate': 100.0 * correct / attempts,
+                              'favorite_language': rng.choice(['python', 'javascript', 'java']),
+                              'problems_attempted': rng.randint(1, problems)})
+            db.session.execute(db.insert(UserStats), stats)
+            db.session.commit()
+        titles = [row[0] for row in db.session.query(Problem.title).order_by(Problem.id)]
+    return {'titles': titles, 'user_ids': user_ids}
+
+
+# Reads the reference solutions for the problem the server serves today, matching get_today_problem.
+# Inputs: titles (list of problem titles in id order)
+# Outputs: Tuple of (problem id, dictionary of language to correct source code)
+# Contributor: Jay Patel
+def today_problem(titles: list) -> tuple:
+    from datetime import datetime
+    problem_id = datetime.now().day % len(titles) or len(titles)
+    # Copies are titled "Two Sum (2)" and so on
+    base_title = titles[problem_id - 1].split(' (')[0]
+    name = base_title.lower().replace(' ', '_')
+    solutions = {}
+    for language, extension in SUBMIT_LANGUAGES.items():
+        path = os.path.join(APP_DIR, 'tests', 'reference_solutions', language, f'{name}.{extension}')
+        if os.path.exists(path):
+            with open(path) as f:
+                solutions[language] = f.read()
+    return problem_id, solutions
+
+
+# Starts gunicorn on the scratch database and waits until it answers.
+# Inputs: database_uri (str), port (int), workers (int or None), threads (int or None)
+# Outputs: subprocess.Popen of the gunicorn master
+# Contributor: Jay Patel
+def start_server(database_uri: str, port: int, workers, threads) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_uri, GUNICORN_BIND=f'127.0.0.1:{port}', LEETLE_POOL='all',
+               LEETLE_AUTH_RATE_LIMIT_IP_BURST='1000000', LEETLE_AUTH_RATE_LIMIT_IP_PER_MINUTE='1000000',
+               LEETLE_AUTH_RATE_LIMIT_EMAIL_BURST='1000000', LEETLE_AUTH_RATE_LIMIT_EMAIL_PER_MINUTE='1000000')
+    if workers:
+        env['GUNICORN_WORKERS'] = str(workers)
+    if threads:
+        env['GUNICORN_THREADS'] = str(threads)
+    server = subprocess.Popen([shutil.which('gunicorn') or 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                              cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with status {server.returncode}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/problem')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError('gunicorn did not start in time')
+
+
+# Stops the gunicorn master and its workers.
+# Inputs: server (subprocess.Popen)
+# Outputs: None
+# Contributor: Jay Patel
+def stop_server(server: subprocess.Popen):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+class Recorder:
+    """Collects request samples for the current ramp stage."""
+
+    # Initializes an empty recorder.
+    # Inputs: None
+    # Outputs: None
+    # Contributor: Jay Patel
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    # Records one request.
+    # Inputs: route (str), seconds (float), status (int, 0 when the connection failed)
+    # Outputs: None
+    # Contributor: Jay Patel
+    def record(self, route: str, seconds: float, status: int):
+        with self.lock:
+            self.samples.append((route, seconds, status))
+
+    # Returns the samples recorded since the last call and starts a new stage.
+    # Inputs: None
+    # Outputs: List of (route, seconds, status) tuples
+    # Contributor: Jay Patel
+    def take(self) -> list:
+        with self.lock:
+            samples, self.samples = self.samples, []
+        return samples
+
+
+class VirtualUser:
+    """One simulated user replaying the traffic model over a keep-alive connection."""
+
+    # Initializes the user.
+    # Inputs: target (host, port), email (str), workload (dict of problem_id, solutions, user_ids), args (parsed options), recorder (Recorder), stop (threading.Event), seed (int)
+    # Outputs: None
+    # Contributor: Jay Patel
+    def __init__(self, target, email, workload, args, recorder, stop, seed):
+        self.target = target
+        self.email = email
+        self.workload = workload
+        self.args = args
+        self.recorder = recorder
+        self.stop = stop
+        self.rng = random.Random(seed)
+        self.connection = None
+        self.token = None
+        self.actions = list(TRAFFIC_MODEL)
+        self.weights = [TRAFFIC_MODEL[action] for action in self.actions]
+
+    # Sends one request, records it and returns the status and decoded JSON body (None when not JSON).
+    # Inputs: route (str), method (str), path (str), body (dict or None)
+    # Outputs: Tuple of (status, body)
+    # Contributor: Jay Patel
+    def request(self, route: str, method: str, path: str, body=None) -> tuple:
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        started = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(*self.target, timeout=self.args.request_timeout)
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.recorder.record(route, time.perf_counter() - started, 0)
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            return 0, None
+        self.recorder.record(route, time.perf_counter() - started, status)
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None
+
+    # Logs in, keeping the access token for later requests.
+    # Inputs: None
+    # Outputs: None
+    # Contributor: Jay Patel
+    def login(self):
+        status, body = self.request('login', 'POST', '/auth/login', {'email': self.email, 'password': PASSWORD})
+        if status == 200:
+            self.token = body['access_token']
+
+    # Performs one action of the traffic model.
+    # Inputs: action (str)
+    # Outputs: None
+    # Contributor: Jay Patel
+    def perform(self, action: str):
+        problem_id = self.workload['problem_id']
+        if action == 'login':
+            self.login()
+        elif action == 'problem':
+            self.request(action, 'GET', '/problem')
+        elif action == 'leaderboard':
+            self.request(action, 'GET', '/api/leaderboard')
+        elif action == 'profile':
+            self.request(action, 'GET', f"/api/user/stats/{self.rng.choice(self.workload['user_ids'])}")
+        elif action == 'hints':
+            self.request(action, 'GET', f'/api/hints/{problem_id}')
+        elif action == 'hint_reveal':
+            self.request(action, 'POST', f'/api/hints/{problem_id}/partial')
+        elif action == 'submit':
+            language = self.rng.choice(sorted(self.workload['solutions']))
+            code = self.workload['solutions'][language]
+            if self.rng.random() < WRONG_SUBMISSION_RATE:
+                code = "console.log('[]')" if language == 'javascript' else "print('[]')"
+            self.request(action, 'POST', '/submit', {'language': language, 'code': code})
+
+    # Runs until stopped: logs in, then repeats actions with think time between them.
+    # Inputs: None
+    # Outputs: None
+    # Contributor: Jay Patel
+    def run(self):
+        while not self.stop.is_set():
+            self.login()
+            for _ in range(self.args.session_length):
+                if self.stop.is_set():
+                    break
+                if self.args.think_ms > 0:
+                    self.stop.wait(self.rng.expovariate(1000.0 / self.args.think_ms))
+                    if self.stop.is_set():
+                        break
+                self.perform(self.rng.choices(self.actions, self.weights)[0])
+        if self.connection is not None:
+            self.connection.close()
+
+
+# Returns the nearest-rank percentile of a list of values.
+# Inputs: values (list of floats), percent (float between 0 and 100)
+# Outputs: float (0.0 for an empty list)
+# Contributor: Jay Patel
+def percentile(values: list, percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+# Summarizes a set of samples.
+# Inputs: samples (list of (route, seconds, status)), duration (seconds)
+# Outputs: Dictionary with counts, rates, latency percentiles and histogram
+# Contributor: Jay Patel
+def summarize(samples: list, duration: float) -> dict:
+    latencies = [seconds * 1000 for _, seconds, _ in samples]
+    histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for latency in latencies:
+        histogram[next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if latency <= bound),
+                       len(HISTOGRAM_BUCKETS_MS))] += 1
+    return {
+        'requests': len(samples),
+        'per_second': round(len(samples) / duration, 2) if duration > 0 else 0.0,
+        'errors': sum(1 for _, _, status in samples if status == 0 or (status >= 500 and status != 503)),
+        'rejected': sum(1 for _, _, status in samples if status in (429, 503)),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'histogram': histogram,
+    }
+
+
+# Summarizes one ramp stage overall and per route.
+# Inputs: concurrency (int), samples (list), duration (seconds)
+# Outputs: Stage dictionary
+# Contributor: Jay Patel
+def summarize_stage(concurrency: int, samples: list, duration: float) -> dict:
+    routes = sorted({route for route, _, _ in samples})
+    return {
+        'concurrency': concurrency,
+        'duration': round(duration, 2),
+        'overall': summarize(samples, duration),
+        'routes': {route: summarize([s for s in samples if s[0] == route], duration) for route in routes},
+    }
+
+
+# Finds the last stage before the server saturates.
+# Inputs: stages (list of stage dictionaries), slo_ms (float), max_error_rate (fraction), min_gain (fraction)
+# Outputs: Dictionary with the saturation concurrency, its throughput and the reason, or reason 'not reached'
+# Contributor: Jay Patel
+def find_saturation(stages: list, slo_ms: float, max_error_rate: float, min_gain: float) -> dict:
+    previous = None
+    for stage in stages:
+        overall = stage['overall']
+        failed = (overall['errors'] + overall['rejected']) / overall['requests'] if overall['requests'] else 1.0
+        reason = None
+        if failed > max_error_rate:
+            reason = f'errors and rejections {failed:.1%} > {max_error_rate:.1%}'
+        elif overall['p95_ms'] > slo_ms:
+            reason = f"p95 {overall['p95_ms']} ms > {slo_ms} ms"
+        elif previous is not None and overall['per_second'] < previous['overall']['per_second'] * (1 + min_gain):
+            reason = f"throughput grew less than {min_gain:.0%} from {previous['concurrency']} users"
+        if reason:
+            if previous is None:
+                return {'concurrency': None, 'per_second': None, 'reason': f"already saturated at {stage['concurrency']} users: {reason}"}
+            return {'concurrency': previous['concurrency'], 'per_second': previous['overall']['per_second'], 'reason': reason}
+        previous = stage
+    return {'concurrency': previous['concurrency'] if previous else None,
+            'per_second': previous['overall']['per_second'] if previous else None, 'reason': 'not reached'}
+
+
+# Ramps virtual users through the stages against a running server.
+# Inputs: target (host, port), workload (dict), args (parsed options)
+# Outputs: List of stage dictionaries
+# Contributor: Jay Patel
+def run_ramp(target, workload: dict, args) -> list:
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = []
+    stages = []
+    try:
+        for concurrency in args.ramp:
+            while len(threads) < concurrency:
+                index = len(threads)
+                user = VirtualUser(target, f'load{index % args.users}@leetle.com', workload, args, recorder, stop,
+                                   args.seed * 100003 + index)
+                thread = threading.Thread(target=user.run, name=f'virtual-user-{index}', daemon=True)
+                thread.start()
+                threads.append(thread)
+            recorder.take()
+            started = time.perf_counter()
+            time.sleep(args.stage_seconds)
+            stages.append(summarize_stage(concurrency, recorder.take(), time.perf_counter() - started))
+            if not args.json:
+                overall = stages[-1]['overall']
+                print(f"  {concurrency:>4} users: {overall['per_second']:>8.1f} req/s  p95 {overall['p95_ms']:>8.1f} ms  "
+                      f"errors {overall['errors']}  rejected {overall['rejected']}", file=sys.stderr)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(args.request_timeout + 5)
+    return stages
+
+
+# Returns a free TCP port on the loopback interface.
+# Inputs: None
+# Outputs: int
+# Contributor: Jay Patel
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+# Prints the stage table, the per-route tables with histograms for the saturation stage, and the saturation point.
+# Inputs: results (dictionary)
+# Outputs: None
+# Contributor: Jay Patel
+def print_report(results: dict):
+    print(f"{'Users':>6}{'Req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'Errors':>8}{'Rejected':>10}")
+    for stage in results['stages']:
+        overall = stage['overall']
+        print(f"{stage['concurrency']:>6}{overall['per_second']:>10.1f}{overall['p50_ms']:>10.1f}{overall['p95_ms']:>10.1f}"
+              f"{overall['p99_ms']:>10.1f}{overall['errors']:>8}{overall['rejected']:>10}")
+
+    saturation = results['saturation']
+    shown = next((stage for stage in results['stages'] if stage['concurrency'] == saturation['concurrency']),
+                 results['stages'][-1] if results['stages'] else None)
+    if shown is not None:
+        labels = [f'<={bound}' for bound in HISTOGRAM_BUCKETS_MS] + [f'>{HISTOGRAM_BUCKETS_MS[-1]}']
+        print(f"\nPer route at {shown['concurrency']} users (histogram buckets in ms: {' '.join(labels)})")
+        print(f"{'Route':<13}{'Req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'Err':>5}{'Rej':>5}  Histogram")
+        for route, summary in shown['routes'].items():
+            print(f"{route:<13}{summary['per_second']:>8.1f}{summary['p50_ms']:>8.1f}{summary['p95_ms']:>8.1f}"
+                  f"{summary['p99_ms']:>8.1f}{summary['errors']:>5}{summary['rejected']:>5}  "
+                  f"{' '.join(str(count) for count in summary['histogram'])}")
+
+    if saturation['concurrency'] is None:
+        print(f"\nSaturation: {saturation['reason']}")
+    elif saturation['reason'] == 'not reached':
+        print(f"\nSaturation: not reached; {saturation['per_second']} req/s at {saturation['concurrency']} users")
+    else:
+        print(f"\nSaturation: {saturation['concurrency']} users, {saturation['per_second']} req/s "
+              f"(next stage: {saturation['reason']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local HTTP load test with a concurrency ramp')
+    parser.add_argument('--users', type=int, default=200, help='Users to seed')
+    parser.add_argument('--problems', type=int, default=20, help='Problems to seed')
+    parser.add_argument('--ramp', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32], help='Virtual users per stage')
+    parser.add_argument('--stage-seconds', type=float, default=15, help='Length of each stage')
+    parser.add_argument('--think-ms', type=float, default=100, help='Mean pause between a user\'s actions (0 for none)')
+    parser.add_argument('--session-length', type=int, default=20, help='Actions before a user logs in again')
+    parser.add_argument('--workers', type=int, help='gunicorn workers (default: gunicorn.conf.py)')
+    parser.add_argument('--threads', type=int, help='Threads per gunicorn worker (default: gunicorn.conf.py)')
+    parser.add_argument('--slo-ms', type=float, default=500, help='p95 latency a stage must stay under')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Fraction of errors and rejections allowed')
+    parser.add_argument('--min-gain', type=float, default=0.1, help='Throughput growth a stage must add over the last')
+    parser.add_argument('--request-timeout', type=float, default=60, help='Seconds before a request counts as failed')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the data and the traffic')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_uri = f"sqlite:///{os.path.join(tmp_dir, 'load.db')}"
+        seeded = seed_scratch_database(database_uri, args.users, args.problems, args.seed)
+        problem_id, solutions = today_problem(seeded['titles'])
+        workload = {'problem_id': problem_id, 'solutions': solutions, 'user_ids': seeded['user_ids']}
+        port = free_port()
+        server = start_server(database_uri, port, args.workers, args.threads)
+        try:
+            stages = run_ramp(('127.0.0.1', port), workload, args)
+        finally:
+            stop_server(server)
+
+    results = {
+        'config': {'users': args.users, 'problems': args.problems, 'ramp': args.ramp,
+                   'stage_seconds': args.stage_seconds, 'think_ms': args.think_ms, 'workers': args.workers,
+                   'threads': args.threads, 'traffic_model': TRAFFIC_MODEL, 'cpu_count': os.cpu_count(),
+                   'histogram_buckets_ms': HISTOGRAM_BUCKETS_MS},
+        'stages': stages,
+        'saturation': find_saturation(stages, args.slo_ms, args.max_error_rate, args.min_gain),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# This script measures judge latency and throughput by running the reference solutions for every language and problem through run_code_in_docker and validate_submission at a configurable concurrency, and compares the results with a stored baseline.
+# Author: Jay Patel
+
+"""
+Leetle Judge Pipeline Benchmark
+
+Loads the seed problems into a scratch database and judges the reference
+solutions in tests/reference_solutions, for every language whose
+interpreter is installed, in two phases:
+
+    case        - every test case on its own through run_code_in_docker,
+                  which builds the program and runs one input
+    submission  - every reference solution through validate_submission,
+                  which judges all of a problem's test cases
+
+Work items are spread over --concurrency threads, each in its own app
+context, the way concurrent requests reach one web worker. For each phase,
+overall and per language, the report gives p50/p95/p99 latency, items per
+second and the number of items whose output or verdict was wrong. It also
+reports CPU utilization across all cores (this process and the judged
+programs it waited for) and peak RSS of this process and of the largest
+judged program.
+
+Results can be saved with --output and compared with a saved run with
+--baseline: a latency percentile more than --tolerance above the
+baseline, or a throughput more than --tolerance below it, is reported as a
+regression and fails the run.
+
+Usage:
+    python benchmarks/judge_pipeline.py                              # All languages, concurrency 4, print a table
+    python benchmarks/judge_pipeline.py --concurrency 8 --iterations 3
+    python benchmarks/judge_pipeline.py --languages python --warm-runners
+    python benchmarks/judge_pipeline.py --output baseline.json       # Save a baseline
+    python benchmarks/judge_pipeline.py --baseline baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, APP_DIR)
+
+from benchmarks.warm_runners import INTERPRETERS, SOLUTION_FILES, load_problems
+from leetle import create_app
+from leetle.database import db
+from leetle.judge import run_code_in_docker, validate_submission
+from leetle.models import Problem
+from leetle.seed import import_problems
+
+PHASES = ('case', 'submission')
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+# Returns the nearest-rank percentile of a list of values.
+# Inputs: values (list of floats), percent (float between 0 and 100)
+# Outputs: float (0.0 for an empty list)
+# Contributor: Jay Patel
+def percentile(values: list, percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+# Summarizes one group of timed items.
+# Inputs: samples (list of (seconds, correct) pairs), wall_time (seconds the phase took)
+# Outputs: Dictionary with count, failures, latency percentiles and items per second
+# Contributor: Jay Patel
+def summarize(samples: list, wall_time: float) -> dict:
+    latencies = [seconds * 1000 for seconds, _ in samples]
+    return {
+        'count': len(samples),
+        'failures': sum(1 for _, correct in samples if not correct),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'per_second': round(len(samples) / wall_time, 2) if wall_time > 0 else 0.0,
+    }
+
+
+# Returns CPU seconds used so far by this process and the children it has waited for.
+# Inputs: None
+# Outputs: float
+# Contributor: Jay Patel
+def cpu_seconds() -> float:
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+# Runs work items on a thread pool, each inside an app context, and times them.
+# Inputs: app (Flask application), items (list of (language, callable returning correctness)), concurrency (int)
+# Outputs: Dictionary with the overall and per-language summaries and the phase's CPU utilization
+# Contributor: Jay Patel
+def run_phase(app, items: list, concurrency: int) -> dict:
+    def timed(item):
+        language, work = item
+        with app.app_context():
+            started = time.perf_counter()
+            correct = work()
+            return language, (time.perf_counter() - started, correct)
+
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, items))
+    wall_time = time.perf_counter() - started
+    cpu_used = cpu_seconds() - cpu_before
+
+    phase = {'overall': summarize([sample for _, sample in results], wall_time), 'languages': {}}
+    for language in sorted({language for language, _ in results}):
+        phase['languages'][language] = summarize([sample for name, sample in results if name == language], wall_time)
+    phase['wall_time'] = round(wall_time, 3)
+    phase['cpu_percent'] = round(100 * cpu_used / (wall_time * (os.cpu_count() or 1)), 1) if wall_time > 0 else 0.0
+    return phase
+
+
+# Builds the work items for both phases from the reference solutions.
+# Inputs: languages (list of strings), problem_names (list of strings or None for all), iterations (int), problem_ids (dictionary of problem name to id)
+# Outputs: Dictionary of phase name to list of (language, callable) items
+# Contributor: Jay Patel
+def build_workload(languages: list, problem_names, iterations: int, problem_ids: dict) -> dict:
+    workload = {phase: [] for phase in PHASES}
+    for language in languages:
+        for name, code, cases in load_problems(language):
+            if problem_names and name not in problem_names:
+                continue
+            for input_data, expected in cases:
+                workload['case'].append((language, lambda language=language, code=code, input_data=input_data,
+                                         expected=expected: run_case(language, code, input_data, expected)))
+            workload['submission'].append((language, lambda language=language, code=code, problem_id=problem_ids[name]:
+                                           run_submission(language, code, problem_id)))
+    return {phase: items * iterations for phase, items in workload.items()}
+
+
+# Runs one test case and checks its output.
+# Inputs: language (string), code (string), input_data (bytes), expected (string)
+# Outputs: Whether the case produced the expected output
+# Contributor: Jay Patel
+def run_case(language: str, code: str, input_data: bytes, expected: str) -> bool:
+    output, _, completed = run_code_in_docker(language, code, input_data)
+    return completed and output.strip() == expected
+
+
+# Judges one submission the way /submit does.
+# Inputs: language (string), code (string), problem_id (int)
+# Outputs: Whether the submission was accepted
+# Contributor: Jay Patel
+def run_submission(language: str, code: str, problem_id: int) -> bool:
+    return validate_submission(db.session.get(Problem, problem_id), language, code)[0] is True
+
+
+# Loads the seed problems into the scratch database and maps seed file names to problem ids.
+# Inputs: None
+# Outputs: Dictionary of problem name (e.g. two_sum) to problem id
+# Contributor: Jay Patel
+def load_seed_problems() -> dict:
+    problem_dir = os.path.join(APP_DIR, 'seed', 'problems')
+    db.create_all()
+    import_problems([problem_dir])
+    problem_ids = {}
+    for file_name in sorted(os.listdir(problem_dir)):
+        if file_name.endswith('.json'):
+            with open(os.path.join(problem_dir, file_name)) as f:
+                title = json.load(f)['title']
+            name = file_name[:-len('.json')].split('_', 1)[1]
+            problem_ids[name] = Problem.query.filter_by(title=title).one().id
+    return problem_ids
+
+
+# Runs both phases and collects the report.
+# Inputs: languages (list of strings), problem_names (list or None), concurrency (int), iterations (int), warm_runners (bool)
+# Outputs: Results dictionary (config, phases, peak RSS)
+# Contributor: Jay Patel
+def run_benchmark(languages: list, problem_names, concurrency: int, iterations: int, warm_runners: bool) -> dict:
+    skipped = [language for language in languages if shutil.which(INTERPRETERS[language]) is None]
+    languages = [language for language in languages if language not in skipped]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+            'TESTCASE_BLOB_DIR': os.path.join(tmp_dir, 'testcases'),
+            'JUDGE_WARM_RUNNERS': tuple(languages) if warm_runners else (),
+        })
+        with app.app_context():
+            problem_ids = load_seed_problems()
+        workload = build_workload(languages, problem_names, iterations, problem_ids)
+        phases = {phase: run_phase(app, items, concurrency) for phase, items in workload.items() if items}
+        for pool in app.extensions.get('leetle_runner_pools', {}).values():
+            if pool is not None:
+                pool.close()
+
+    return {
+        'config': {'languages': languages, 'skipped_languages': skipped, 'problems': problem_names or 'all',
+                   'concurrency': concurrency, 'iterations': iterations, 'warm_runners': warm_runners,
+                   'cpu_count': os.cpu_count()},
+        'phases': phases,
+        # ru_maxrss is in kilobytes on Linux; for children it is the largest single judged program
+        'peak_rss_mb': {'judge': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                        'largest_program': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)},
+    }
+
+
+# Lists the metrics that regressed against a baseline run, overall and per language.
+# Inputs: results (dictionary), baseline (dictionary), tolerance (fraction, e.g. 0.2 for 20%)
+# Outputs: List of regression descriptions (strings)
+# Contributor: Jay Patel
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for phase_name, phase in results['phases'].items():
+        base_phase = baseline.get('phases', {}).get(phase_name)
+        if base_phase is None:
+            continue
+        groups = [('overall', phase['overall'], base_phase.get('overall'))]
+        groups += [(language, summary, base_phase.get('languages', {}).get(language))
+                   for language, summary in phase['languages'].items()]
+        for group, current, base in groups:
+            if not base:
+                continue
+            for metric in LATENCY_METRICS:
+                if base[metric] > 0 and current[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(f'{phase_name} {group} {metric}: {current[metric]} > baseline {base[metric]}')
+            if current['per_second'] < base['per_second'] * (1 - tolerance):
+                regressions.append(f"{phase_name} {group} per_second: {current['per_second']} "
+                                   f"< baseline {base['per_second']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark judge latency and throughput on the reference solutions')
+    parser.add_argument('--languages', nargs='+', choices=sorted(SOLUTION_FILES), default=sorted(SOLUTION_FILES),
+                        help='Languages to judge')
+    parser.add_argument('--problems', nargs='+', help='Problem names to judge, e.g. two_sum (default: all)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Work items judged at once')
+    parser.add_argument('--iterations', type=int, default=1, help='Times to repeat the whole workload')
+    parser.add_argument('--warm-runners', action='store_true', help='Judge on warm runners (JUDGE_WARM_RUNNERS)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare with results previously written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed fractional change before a regression')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.languages, args.problems, args.concurrency, args.iterations, args.warm_runners)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'Phase':<12}{'Group':<12}{'Items':>7}{'Wrong':>7}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+              f"{'Items/s':>10}")
+        for phase_name, phase in results['phases'].items():
+            for group, summary in [('overall', phase['overall'])] + sorted(phase['languages'].items()):
+                print(f"{phase_name:<12}{group:<12}{summary['count']:>7}{summary['failures']:>7}"
+                      f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}"
+                      f"{summary['per_second']:>10.2f}")
+            print(f"{'':<12}CPU {phase['cpu_percent']}% of {os.cpu_count()} cores over {phase['wall_time']} s")
+        print(f"Peak RSS: judge {results['peak_rss_mb']['judge']} MB, "
+              f"largest program {results['peak_rss_mb']['largest_program']} MB")
+        if results['config']['skipped_languages']:
+            print(f"Skipped (not installed): {', '.join(results['config']['skipped_languages'])}")
+
+    failures = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ('concurrency', 'warm_runners', 'cpu_count'):
+            if baseline.get('config', {}).get(key) != results['config'][key]:
+                print(f"Warning: baseline {key} was {baseline.get('config', {}).get(key)}, "
+                      f"this run used {results['config'][key]}", file=sys.stderr)
+        failures = compare_with_baseline(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# This script load-tests the database write path of /submit by running several worker processes against one SQLite file, comparing the default storage profile with the production profile.
+# Author: Daniel Neugent
+
+"""
+Leetle Concurrent Submit Load Test
+
+Each worker process builds the app the way a gunicorn worker would and
+repeatedly saves a submission and updates the user's stats, which is the
+write portion of /submit. Code execution is skipped so that only database
+contention is measured.
+
+Usage:
+    python benchmarks/sqlite_submit_load.py                  # Compare both profiles
+    python benchmarks/sqlite_submit_load.py --workers 8      # More concurrent workers
+    python benchmarks/sqlite_submit_load.py --profile production
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+# Builds an app pointed at the scratch database with the given profile and retry budget.
+# Inputs: database_uri (str), profile (str), retries (int)
+# Outputs: Flask application instance
+# Contributor: Daniel Neugent
+def load_app(database_uri: str, profile: str, retries: int):
+    from leetle import create_app
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'DB_PROFILE': profile,
+        'DB_WRITE_RETRIES': retries,
+    })
+
+
+# Creates the schema, one problem and one user per worker in a fresh database file.
+# Inputs: database_uri (str), profile (str), workers (int)
+# Outputs: None
+# Contributor: Daniel Neugent
+def seed_database(database_uri: str, profile: str, workers: int):
+    from leetle.database import db
+    from leetle.models import Problem, User
+
+    app = load_app(database_uri, profile, 0)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Problem(
+            title='Load Test', description='Load test problem', difficulty='Easy',
+            input_example='', output_example='', test_cases=json.dumps([])
+        ))
+        for i in range(workers):
+            db.session.add(User(email=f'load{i}@leetle.com', password_hash='x'))
+        db.session.commit()
+
+
+# Saves submissions for one user as fast as possible and reports successes, failures and elapsed time.
+# Inputs: database_uri (str), profile (str), retries (int), user_index (int), submissions (int), results (Queue)
+# Outputs: None (puts a result dictionary on the queue)
+# Contributor: Daniel Neugent
+def run_worker(database_uri: str, profile: str, retries: int, user_index: int, submissions: int, results):
+    from sqlalchemy.exc import OperationalError
+    from leetle.database import commit_with_retry, db
+    from leetle.models import Submission, User
+    from leetle.submit import update_user_stats
+
+    app = load_app(database_uri, profile, retries)
+    ok = 0
+    failed = 0
+    start_time = time.time()
+    try:
+        with app.app_context():
+            user = User.query.filter_by(email=f'load{user_index}@leetle.com').first()
+            for i in range(submissions):
+                def save_submission():
+                    db.session.add(Submission(
+                        user_id=user.id, problem_id=1, language='python',
+                        code='print(1)', exec_time=0.01, is_correct=True
+                    ))
+                try:
+                    commit_with_retry(save_submission)
+                    commit_with_retry(lambda: update_user_stats(user, 'python', True))
+                    ok += 1
+                except OperationalError:
+                    db.session.rollback()
+                    failed += 1
+    finally:
+        # Always report back so the parent never blocks on a crashed worker
+        failed += submissions - ok - failed
+        results.put({'ok': ok, 'failed': failed, 'elapsed': time.time() - start_time})
+
+
+# Runs one profile end to end on a fresh database file and aggregates the worker results.
+# Inputs: profile (str), retries (int), workers (int), submissions (int)
+# Outputs: Dictionary with throughput and failure counts
+# Contributor: Daniel Neugent
+def run_profile(profile: str, retries: int, workers: int, submissions: int) -> dict:
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_uri = f"sqlite:///{os.path.join(tmp_dir, 'load.db')}"
+        seeder = ctx.Process(target=seed_database, args=(database_uri, profile, workers))
+        seeder.start()
+        seeder.join()
+
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=run_worker, args=(database_uri, profile, retries, i, submissions, results))
+            for i in range(workers)
+        ]
+        start_time = time.time()
+        for process in processes:
+            process.start()
+        worker_results = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        wall_time = time.time() - start_time
+
+    ok = sum(r['ok'] for r in worker_results)
+    return {
+        'profile': profile,
+        'retries': retries,
+        'workers': workers,
+        'submissions_ok': ok,
+        'submissions_failed': sum(r['failed'] for r in worker_results),
+        'wall_time': round(wall_time, 3),
+        'submits_per_second': round(ok / wall_time, 1) if wall_time > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent submit load test for the SQLite storage profiles')
+    parser.add_argument('--workers', type=int, default=4, help='Number of concurrent worker processes')
+    parser.add_argument('--submissions', type=int, default=200, help='Submissions per worker')
+    parser.add_argument('--profile', choices=['default', 'production'], help='Run a single profile')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    # "Before" is the stock setup with no retries; "after" is the production profile
+    runs = [('default', 0), ('production', 5)]
+    if args.profile:
+        runs = [run for run in runs if run[0] == args.profile]
+
+    results = [run_profile(profile, retries, args.workers, args.submissions) for profile, retries in runs]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'Profile':<12}{'OK':>8}{'Failed':>8}{'Wall (s)':>10}{'Submits/s':>12}")
+    for result in results:
+        print(f"{result['profile']:<12}{result['submissions_ok']:>8}{result['submissions_failed']:>8}"
+              f"{result['wall_time']:>10}{result['submits_per_second']:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# This script measures how long a fresh worker takes to import the app and serve its first request, and fails when either exceeds a threshold.
+# Author: Jay Patel
+
+"""
+Leetle Startup Benchmark
+
+Every run starts a new interpreter, the way gunicorn starts a worker after
+a restart or max_requests recycle, and times three phases:
+
+    import   - `import app` (builds the application through create_app)
+    request  - the first request through the test client
+    boot     - import plus first request
+
+It also reports which deferred modules (PyJWT, the PostgreSQL dialect, the
+process pool, the judge) were loaded at import time; they should not be.
+
+Usage:
+    python benchmarks/startup.py                          # 7 runs, print a table
+    python benchmarks/startup.py --runs 15 --json         # Machine-readable output
+    python benchmarks/startup.py --max-import-ms 600 --max-boot-ms 800
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that create_app defers until first use
+LAZY_MODULES = ['jwt', 'sqlalchemy.dialects.postgresql', 'concurrent.futures.process', 'leetle.judge']
+
+# Runs inside the child interpreter; prints one JSON line of timings
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+lazy_loaded = [name for name in %r if name in sys.modules]
+with app.app.test_client() as client:
+    client.post('/auth/login', json={})
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'request_ms': (finished - imported) * 1000,
+    'boot_ms': (finished - start) * 1000,
+    'lazy_loaded': lazy_loaded,
+}))
+''' % (LAZY_MODULES,)
+
+
+# Starts one fresh interpreter and returns the timings it reports.
+# Inputs: None
+# Outputs: Dictionary with import_ms, request_ms, boot_ms and lazy_loaded
+# Contributor: Jay Patel
+def measure_once() -> dict:
+    env = dict(os.environ, DATABASE_URL='sqlite:///:memory:')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# Runs the probe several times and summarizes each phase by its median and worst case.
+# Inputs: runs (int)
+# Outputs: Dictionary of per-phase statistics and the union of eagerly loaded lazy modules
+# Contributor: Jay Patel
+def run_benchmark(runs: int) -> dict:
+    samples = [measure_once() for _ in range(runs)]
+    summary = {'runs': runs, 'lazy_loaded': sorted({name for s in samples for name in s['lazy_loaded']})}
+    for phase in ('import_ms', 'request_ms', 'boot_ms'):
+        values = [s[phase] for s in samples]
+        summary[phase] = {'median': round(statistics.median(values), 1), 'max': round(max(values), 1)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold import and worker boot time')
+    parser.add_argument('--runs', type=int, default=7, help='Fresh interpreters to start')
+    parser.add_argument('--max-import-ms', type=float, help='Fail if the median import exceeds this')
+    parser.add_argument('--max-boot-ms', type=float, help='Fail if the median boot exceeds this')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    summary = run_benchmark(args.runs)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{'Phase':<10}{'Median (ms)':>14}{'Max (ms)':>12}")
+        for phase in ('import_ms', 'request_ms', 'boot_ms'):
+            print(f"{phase[:-3]:<10}{summary[phase]['median']:>14.1f}{summary[phase]['max']:>12.1f}")
+        print(f"Deferred modules loaded at import: {', '.join(summary['lazy_loaded']) or 'none'}")
+
+    failures = []
+    if summary['lazy_loaded']:
+        failures.append(f"deferred modules imported eagerly: {', '.join(summary['lazy_loaded'])}")
+    if args.max_import_ms is not None and summary['import_ms']['median'] > args.max_import_ms:
+        failures.append(f"import median {summary['import_ms']['median']} ms > {args.max_import_ms} ms")
+    if args.max_boot_ms is not None and summary['boot_ms']['median'] > args.max_boot_ms:
+        failures.append(f"boot median {summary['boot_ms']['median']} ms > {args.max_boot_ms} ms")
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# This script compares judging on warm runners with starting a fresh interpreter for every test case, using the reference solutions and the seed problems' test cases.
+# Author: Jay Patel
+
+"""
+Leetle Warm Runner Benchmark
+
+For each language with a warm runner (Python's zygote, Node's per-case
+contexts, the JVM judge host) and each seed problem, judges the reference solution in
+tests/reference_solutions both ways and times:
+
+    case        - one test case through BuiltProgram.run (median)
+    submission  - judge_cases over all of the problem's test cases (median)
+
+Warm submissions take their runner from a pool that is filled before
+timing starts, the way a running server has them ready. A problem whose
+warm verdict differs from its cold one fails the benchmark.
+
+Usage:
+    python benchmarks/warm_runners.py                         # 5 runs, print a table
+    python benchmarks/warm_runners.py --runs 10 --json        # Machine-readable output
+    python benchmarks/warm_runners.py --languages javascript
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, APP_DIR)
+
+from leetle import create_app
+from leetle.judge import build_program, judge_cases
+from leetle.runners import get_runner_pool
+
+# Reference solution file name for a problem name such as two_sum
+SOLUTION_FILES = {
+    'python': lambda name: f'{name}.py',
+    'javascript': lambda name: f'{name}.js',
+    'java': lambda name: ''.join(part.title() for part in name.split('_')) + '.java',
+}
+# Interpreter each language needs; languages without one installed are skipped
+INTERPRETERS = {'python': 'python3', 'javascript': 'node', 'java': 'java'}
+
+
+# Pairs each seed problem with its reference solution in a language.
+# Inputs: language (string)
+# Outputs: List of (problem name, source code, cases) with cases as (input bytes, expected output) pairs
+# Contributor: Jay Patel
+def load_problems(language: str) -> list:
+    problems = []
+    for path in sorted(glob.glob(os.path.join(APP_DIR, 'seed', 'problems', '*.json'))):
+        name = os.path.basename(path)[:-len('.json')].split('_', 1)[1]
+        solution = os.path.join(APP_DIR, 'tests', 'reference_solutions', language, SOLUTION_FILES[language](name))
+        if not os.path.exists(solution):
+            continue
+        with open(path) as f:
+            test_cases = json.load(f)['test_cases']
+        with open(solution) as f:
+            code = f.read()
+        problems.append((name, code, tuple((str(test['input']).encode('utf-8'), str(test['output']).strip())
+                                           for test in test_cases)))
+    return problems
+
+
+# Waits until a language's pool has its idle runners started.
+# Inputs: language (string)
+# Outputs: None
+# Contributor: Jay Patel
+def fill_pool(language: str):
+    pool = get_runner_pool(language)
+    pool.checkout().close()
+    deadline = time.monotonic() + 30
+    while len(pool.idle) < pool.size and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+# Times one problem's reference solution, per case and per submission.
+# Inputs: language (string), code (string), cases (tuple), runs (int)
+# Outputs: Dictionary with case_ms and submission_ms medians, and whether every submission passed
+# Contributor: Jay Patel
+def measure(language: str, code: str, cases: tuple, runs: int) -> dict:
+    case_times = []
+    with build_program(language, code) as program:
+        for _ in range(runs):
+            for input_data, _ in cases:
+                started = time.perf_counter()
+                program.run(input_data)
+                case_times.append(time.perf_counter() - started)
+    submission_times = []
+    passed = True
+    for _ in range(runs):
+        started = time.perf_counter()
+        passed = judge_cases(language, code, cases)[0] is True and passed
+        submission_times.append(time.perf_counter() - started)
+    return {'case_ms': round(statistics.median(case_times) * 1000, 2),
+            'submission_ms': round(statistics.median(submission_times) * 1000, 1),
+            'passed': passed}
+
+
+# Measures every problem cold and warm for each language.
+# Inputs: languages (list of strings), runs (int)
+# Outputs: List of result dictionaries, one per language and problem
+# Contributor: Jay Patel
+def run_benchmark(languages: list, runs: int) -> list:
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    results = []
+    with app.app_context():
+        for language in languages:
+            if shutil.which(INTERPRETERS[language]) is None:
+                print(f'Skipping {language}: {INTERPRETERS[language]} is not installed', file=sys.stderr)
+                continue
+            for name, code, cases in load_problems(language):
+                result = {'language': language, 'problem': name, 'cases': len(cases)}
+                for mode, warm_runners in (('cold', ()), ('warm', (language,))):
+                    app.config['JUDGE_WARM_RUNNERS'] = warm_runners
+                    if warm_runners:
+                        fill_pool(language)
+                    result[mode] = measure(language, code, cases, runs)
+                result['speedup'] = round(result['cold']['case_ms'] / max(result['warm']['case_ms'], 0.01), 1)
+                results.append(result)
+        for pool in app.extensions.get('leetle_runner_pools', {}).values():
+            if pool is not None:
+                pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare warm runners with cold process starts')
+    parser.add_argument('--runs', type=int, default=5, help='Times to judge each reference solution per mode')
+    parser.add_argument('--languages', nargs='+', choices=sorted(SOLUTION_FILES), default=sorted(SOLUTION_FILES),
+                        help='Languages to measure')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.languages, args.runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'Language':<12}{'Problem':<20}{'Cold case (ms)':>16}{'Warm case (ms)':>16}"
+              f"{'Cold sub (ms)':>15}{'Warm sub (ms)':>15}{'Speedup':>9}")
+        for r in results:
+            print(f"{r['language']:<12}{r['problem']:<20}{r['cold']['case_ms']:>16.2f}{r['warm']['case_ms']:>16.2f}"
+                  f"{r['cold']['submission_ms']:>15.1f}{r['warm']['submission_ms']:>15.1f}{r['speedup']:>8.1f}x")
+
+    failures = [f"{r['language']} {r['problem']}: warm verdict {r['warm']['passed']} != cold {r['cold']['passed']}"
+                for r in results if r['warm']['passed'] != r['cold']['passed']]
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
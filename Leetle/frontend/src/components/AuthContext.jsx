@@ -6,7 +6,7 @@
  * * Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, Arnav Jain
  */
 
-import React, { createContext, useContext, useState, useEffect } from 'react';
+import React, { createContext, useContext, useState, useEffect, useRef } from 'react';
 
 const AuthContext = createContext();
 
@@ -37,6 +37,10 @@ export const useAuth = () => {
 export const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
   const [loading, setLoading] = useState(true);
+  // Refresh tokens are single-use, so concurrent 401s must share one refresh request
+  const refreshPromise = useRef(null);
+  // Signed pin the server returns after a write; sending it back keeps this user's reads on the primary database
+  const readPrimaryPin = useRef(null);
 
   // Check for stored tokens on app load
   /**
@@ -76,12 +80,23 @@ export const AuthProvider = ({ children }) => {
 
   /**
    * Function: logout
-   * Description: Clears the user state and removes all authentication data from LocalStorage.
+   * Description: Clears the user state and removes all authentication data from LocalStorage,
+   * and asks the backend to revoke the refresh token so the session cannot be resumed.
    * Inputs: None
    * Outputs: None (Void)
    * Contributors: Tej Gumaste, Daniel Neugent
    */
   const logout = () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      fetch('http://localhost:5001/auth/logout', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => {});
+    }
     setUser(null);
     localStorage.removeItem('accessToken');
     localStorage.removeItem('refreshToken');
@@ -101,13 +116,23 @@ export const AuthProvider = ({ children }) => {
 
   /**
    * Function: refreshAccessToken
-   * Description: Attempts to get a new access token from the backend using the stored refresh token.
+   * Description: Attempts to get a new access token from the backend using the stored refresh token,
+   * storing the rotated refresh token it returns. Concurrent callers share the in-flight request.
    * Logs the user out if the refresh fails.
    * Inputs: None (Uses stored refresh token)
    * Outputs: newAccessToken (String) or null
    * Contributors: Jay Patel, Daniel Neugent, Brett Balquist
    */
-  const refreshAccessToken = async () => {
+  const refreshAccessToken = () => {
+    if (!refreshPromise.current) {
+      refreshPromise.current = requestNewTokens().finally(() => {
+        refreshPromise.current = null;
+      });
+    }
+    return refreshPromise.current;
+  };
+
+  const requestNewTokens = async () => {
     const refreshToken = localStorage.getItem('refreshToken');
     if (!refreshToken) {
       logout();
@@ -127,6 +152,7 @@ export const AuthProvider = ({ children }) => {
         const data = await response.json();
         const newAccessToken = data.access_token;
         localStorage.setItem('accessToken', newAccessToken);
+        localStorage.setItem('refreshToken', data.refresh_token);
         return newAccessToken;
       } else {
         logout();
@@ -142,7 +168,8 @@ export const AuthProvider = ({ children }) => {
   /**
    * Function: makeAuthenticatedRequest
    * Description: A wrapper around the fetch API that automatically attaches the Authorization header.
-   * If a 401 error occurs, it attempts to refresh the token and retry the request.
+   * If a 401 error occurs, it attempts to refresh the token and retry the request. It also echoes the
+   * server's read-primary pin, so reads right after a submission see it whichever server answers.
    * Inputs: url (String), options (Object - fetch options)
    * Outputs: response (Promise<Response>)
    * Contributors: Arnav Jain, Tej Gumaste
@@ -159,6 +186,9 @@ export const AuthProvider = ({ children }) => {
       'Authorization': `Bearer ${token}`,
       'Content-Type': 'application/json',
     };
+    if (readPrimaryPin.current) {
+      headers['X-Leetle-Read-Primary'] = readPrimaryPin.current;
+    }
 
     let response = await fetch(url, { ...options, headers });
 
@@ -171,6 +201,10 @@ export const AuthProvider = ({ children }) => {
       }
     }
 
+    const pin = response.headers.get('X-Leetle-Read-Primary');
+    if (pin) {
+      readPrimaryPin.current = pin;
+    }
     return response;
   };
 
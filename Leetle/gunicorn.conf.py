@@ -0,0 +1,71 @@
+"""
+Gunicorn configuration for running the Leetle backend in production. The app is preloaded once in the master and forked into gthread workers, with worker counts derived from the available cores.
+Usage: gunicorn -c gunicorn.conf.py app:app
+Authors: Jay Patel, Daniel Neugent
+"""
+import os
+
+from leetle.config import available_cpus
+
+"""
+Worker pool profiles. Code execution keeps a request busy for up to 30 seconds per test case while reads return in milliseconds, so the two are run as separate gunicorn instances in production: the reverse proxy sends /submit to a 'judge' pool and everything else to a 'web' pool. The 'all' profile serves every route from one instance for small deployments.
+Inputs: LEETLE_POOL environment variable ('all', 'web' or 'judge'); LEETLE_CPU_COUNT overrides the detected cores
+Outputs: Worker, thread and timeout settings for the selected pool
+Contributors: Jay Patel, Daniel Neugent
+"""
+# Cores this container may use (affinity mask and cgroup quota), not every core on the host
+cores = available_cpus()
+POOL_PROFILES = {
+    'all': {'workers': cores * 2 + 1, 'threads': 4, 'timeout': 120},
+    'web': {'workers': cores * 2 + 1, 'threads': 8, 'timeout': 30},
+    'judge': {'workers': min(cores, 2), 'threads': cores * 2 + 2, 'timeout': 120},
+}
+pool = os.getenv('LEETLE_POOL', 'all')
+profile = POOL_PROFILES[pool]
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5001')}")
+workers = int(os.getenv('GUNICORN_WORKERS', profile['workers']))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', profile['threads']))
+# LEETLE_JUDGE_MAX_CONCURRENT is a per-worker cap, so split the instance's total budget for code execution
+# (LEETLE_JUDGE_TOTAL_CONCURRENT, default one run per core) between the workers; threads beyond a worker's slots wait in
+# its fair queue. Every worker needs at least one slot, so with more workers than the budget, as in the 'all' and 'web'
+# profiles on small machines, up to one run per worker can execute at once; use the 'judge' pool to hold the total.
+judge_budget = int(os.getenv('LEETLE_JUDGE_TOTAL_CONCURRENT', cores))
+os.environ.setdefault('LEETLE_JUDGE_MAX_CONCURRENT', str(max(1, judge_budget // workers)))
+# The other scheduler limits are per worker too (see leetle/scheduler.py). A user's allowance is split the same way, so
+# their submissions across all workers stay near LEETLE_JUDGE_TOTAL_PER_USER; the queue depth defaults to 4 per slot.
+per_user_budget = int(os.getenv('LEETLE_JUDGE_TOTAL_PER_USER', '2'))
+os.environ.setdefault('LEETLE_JUDGE_MAX_PER_USER', str(max(1, per_user_budget // workers)))
+timeout = profile['timeout']
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app once in the master so workers share its memory copy-on-write and boot instantly
+preload_app = True
+
+# Recycle workers periodically, staggered so they do not all restart at once
+max_requests = 1000
+max_requests_jitter = 100
+
+proc_name = f'leetle-{pool}'
+accesslog = '-'
+errorlog = '-'
+
+"""
+Disposes database engines inherited from the master after each fork, so workers never share pooled connections with their parent or siblings. In remote judging mode each worker also starts listening for judge workers right away, so they are connected before the first submission arrives.
+Inputs: server (gunicorn Arbiter), worker (gunicorn Worker)
+Outputs: None
+Contributors: Jay Patel, Daniel Neugent
+"""
+def post_fork(server, worker):
+    from app import app
+    from leetle import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's connections alone and just drops them from this pool
+            engine.dispose(close=False)
+        if app.config['JUDGE_MODE'] == 'remote':
+            from leetle.dispatch import get_dispatcher
+            get_dispatcher()
@@ -0,0 +1,48 @@
+"""
+This package holds the Leetle backend. create_app builds a configured Flask application, binds the shared database extension to it, and registers one blueprint per feature area, so tests and tools can build isolated instances instead of importing a global app.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import os
+
+from flask import Flask
+
+from .config import get_engine_options, load_config
+from .database import db
+
+"""
+Creates and configures a Leetle application instance. Values in `config` override the environment-derived defaults, and engine options are computed for the final database URI unless given explicitly.
+Inputs: config (dictionary of Flask config keys, optional)
+Outputs: Configured Flask application instance
+Contributors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, Arnav Jain
+"""
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(load_config())
+    if config:
+        app.config.update(config)
+    app.config.setdefault('TESTCASE_BLOB_DIR', os.path.join(app.instance_path, 'testcases'))
+    app.config.setdefault('JUDGE_DISPATCH_ADDRESS', 'unix:' + os.path.join(app.instance_path, 'judge-{pid}.sock'))
+    app.config.setdefault('PROFILING_DIR', os.path.join(app.instance_path, 'profiles'))
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(app.config['DB_PROFILE'], app.config['SQLALCHEMY_DATABASE_URI'])
+
+    if app.config['PROXY_FIX_X_FOR']:
+        # Behind a reverse proxy the socket peer is the proxy, so take the client address from X-Forwarded-For
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+    from flask_compress import Compress
+    from flask_cors import CORS
+    # The browser must be able to read the primary pin to send it back (see database.mark_primary_sticky)
+    from .database import PRIMARY_STICKY_HEADER
+    CORS(app, expose_headers=[PRIMARY_STICKY_HEADER])
+    Compress(app)
+    db.init_app(app)
+
+    from . import admin, auth, feedback, hints, leaderboard, profiling, seed, submit
+    profiling.init_app(app)
+    auth.init_app(app)
+    for module in (auth, submit, leaderboard, admin, hints, feedback):
+        app.register_blueprint(module.bp)
+    app.cli.add_command(seed.cli)
+    return app
@@ -0,0 +1,304 @@
+"""
+This file provides the administrative API for managing problems and users and for viewing platform analytics.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request, send_from_directory
+from werkzeug.exceptions import NotFound
+
+from .auth import admin_required
+from .comparators import validate_comparator
+from .database import db
+from .models import Problem, Submission, User, UserStats
+from .testcases import encode_test_cases, set_test_cases
+
+bp = Blueprint('admin', __name__)
+
+"""
+Retrieves a list of all problems with their metadata and success rates for administrative review.
+Inputs: None (Requires Admin Token)
+Outputs: JSON response (list of problems)
+Contributors: Daniel Neugent, Brett Balquist
+"""
+@bp.route('/api/admin/problems', methods=['GET'])
+@admin_required
+def get_admin_problems():
+    """Get all problems for admin management"""
+    problems = Problem.query.all()
+    problems_data = []
+
+    # Submission stats for every problem in one grouped query
+    submission_counts = {
+        problem_id: (total, int(correct or 0))
+        for problem_id, total, correct in db.session.query(
+            Submission.problem_id,
+            db.func.count(Submission.id),
+            db.func.sum(db.case((Submission.is_correct == True, 1), else_=0))
+        ).group_by(Submission.problem_id)
+    }
+
+    for problem in problems:
+        total_subs, correct_subs = submission_counts.get(problem.id, (0, 0))
+        success_rate = (correct_subs / total_subs * 100) if total_subs > 0 else 0
+
+        problems_data.append({
+            'id': problem.id,
+            'title': problem.title,
+            'difficulty': problem.difficulty,
+            'is_active': problem.is_active,
+            'created_at': problem.created_at.isoformat(),
+            'total_attempts': total_subs,
+            'success_rate': round(success_rate, 1)
+        })
+
+    return jsonify({'problems': problems_data}), 200
+
+"""
+Allows an admin to create a new coding problem with description and test cases.
+Inputs: JSON payload (title, description, difficulty, test_cases, optional comparator)
+Outputs: JSON response (success message, problem_id)
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@bp.route('/api/admin/problems', methods=['POST'])
+@admin_required
+def create_problem():
+    """Create a new problem"""
+    data = request.get_json()
+
+    if not data or not data.get('title') or not data.get('description') or not data.get('difficulty'):
+        return jsonify({'error': 'Missing required fields'}), 400
+
+    # Validate difficulty
+    if data['difficulty'] not in ['Easy', 'Medium', 'Hard']:
+        return jsonify({'error': 'Invalid difficulty level'}), 400
+
+    # Validate test cases
+    if not data.get('test_cases') or not isinstance(data['test_cases'], list):
+        return jsonify({'error': 'Test cases must be provided as array'}), 400
+
+    for test_case in data['test_cases']:
+        if 'input' not in test_case or 'output' not in test_case:
+            return jsonify({'error': 'Each test case must have input and output'}), 400
+
+    try:
+        comparator = validate_comparator(data.get('comparator'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    problem = Problem(
+        title=data['title'],
+        description=data['description'],
+        difficulty=data['difficulty'],
+        input_example=data.get('input_example', ''),
+        output_example=data.get('output_example', ''),
+        comparator=comparator,
+        **encode_test_cases(data['test_cases'])
+    )
+
+    try:
+        db.session.add(problem)
+        db.session.commit()
+        return jsonify({
+            'message': 'Problem created successfully',
+            'problem_id': problem.id
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create problem'}), 500
+
+"""
+Updates the details of an existing problem identified by its ID.
+Inputs: problem_id (integer), JSON payload (fields to update)
+Outputs: JSON response (success message) or error
+Contributors: Jay Patel, Brett Balquist
+"""
+@bp.route('/api/admin/problems/<int:problem_id>', methods=['PUT'])
+@admin_required
+def update_problem(problem_id):
+    """Update an existing problem"""
+    problem = Problem.query.get(problem_id)
+    if not problem:
+        return jsonify({'error': 'Problem not found'}), 404
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    # Update allowed fields
+    allowed_fields = ['title', 'description', 'difficulty', 'input_example', 'output_example', 'is_active']
+    for field in allowed_fields:
+        if field in data:
+            if field == 'difficulty' and data[field] not in ['Easy', 'Medium', 'Hard']:
+                return jsonify({'error': 'Invalid difficulty level'}), 400
+            setattr(problem, field, data[field])
+
+    if 'comparator' in data:
+        try:
+            problem.comparator = validate_comparator(data['comparator'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    # Update test cases if provided
+    if 'test_cases' in data and isinstance(data['test_cases'], list):
+        set_test_cases(problem, data['test_cases'])
+
+    try:
+        db.session.commit()
+        return jsonify({'message': 'Problem updated successfully'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update problem'}), 500
+
+"""
+Deletes a specific problem from the database.
+Inputs: problem_id (integer)
+Outputs: JSON response (success message) or error
+Contributors: Arnav Jain, Daniel Neugent
+"""
+@bp.route('/api/admin/problems/<int:problem_id>', methods=['DELETE'])
+@admin_required
+def delete_problem(problem_id):
+    """Delete a problem"""
+    problem = Problem.query.get(problem_id)
+    if not problem:
+        return jsonify({'error': 'Problem not found'}), 404
+
+    try:
+        db.session.delete(problem)
+        db.session.commit()
+        return jsonify({'message': 'Problem deleted successfully'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to delete problem'}), 500
+
+"""
+Retrieves a list of all registered users and their basic statistics for admin management.
+Inputs: None (Requires Admin Token)
+Outputs: JSON response (list of users)
+Contributors: Tej Gumaste, Jay Patel
+"""
+@bp.route('/api/admin/users')
+@admin_required
+def get_admin_users():
+    """Get users for admin management"""
+    users = db.session.query(User, UserStats).outerjoin(UserStats, UserStats.user_id == User.id).order_by(User.id)
+    users_data = []
+
+    for user, stats in users:
+        users_data.append({
+            'id': user.id,
+            'email': user.email,
+            'role': user.role,
+            'current_streak': user.current_streak,
+            'total_solutions': user.total_solutions,
+            'success_rate': round(stats.success_rate, 1) if stats else 0,
+            'created_at': user.created_at.isoformat()
+        })
+
+    return jsonify({'users': users_data}), 200
+
+"""
+Aggregates and returns platform-wide analytics such as total submissions and difficulty breakdowns.
+Inputs: None (Requires Admin Token)
+Outputs: JSON response (overview stats, difficulty breakdown)
+Contributors: Brett Balquist, Arnav Jain, Daniel Neugent
+"""
+@bp.route('/api/admin/analytics')
+@admin_required
+def get_admin_analytics():
+    """Get platform analytics"""
+    # Overall stats
+    total_users = User.query.count()
+    total_problems = Problem.query.count()
+    total_submissions = Submission.query.count()
+    total_correct = Submission.query.filter_by(is_correct=True).count()
+    overall_success_rate = (total_correct / total_submissions * 100) if total_submissions > 0 else 0
+
+    # Daily active users (last 30 days)
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    daily_active = db.session.query(Submission.user_id).filter(
+        Submission.submitted_at >= thirty_days_ago
+    ).distinct().count()
+
+    # Problem difficulty breakdown, grouped by the database
+    problem_counts = dict(db.session.query(Problem.difficulty, db.func.count(Problem.id)).group_by(Problem.difficulty))
+    submission_counts = {
+        difficulty: (total, int(correct or 0))
+        for difficulty, total, correct in db.session.query(
+            Problem.difficulty,
+            db.func.count(Submission.id),
+            db.func.sum(db.case((Submission.is_correct == True, 1), else_=0))
+        ).join(Problem, Submission.problem_id == Problem.id).group_by(Problem.difficulty)
+    }
+    difficulty_stats = {}
+    for difficulty in ['Easy', 'Medium', 'Hard']:
+        total, correct = submission_counts.get(difficulty, (0, 0))
+        difficulty_stats[difficulty] = {
+            'count': problem_counts.get(difficulty, 0),
+            'attempts': total,
+            'success_rate': round((correct / total * 100) if total > 0 else 0, 1)
+        }
+
+    return jsonify({
+        'overview': {
+            'total_users': total_users,
+            'total_problems': total_problems,
+            'total_submissions': total_submissions,
+            'overall_success_rate': round(overall_success_rate, 1),
+            'daily_active_users': daily_active
+        },
+        'difficulty_breakdown': difficulty_stats
+    }), 200
+
+"""
+Returns this worker's code execution scheduler state: slots in use, queue length, admission counters and recent queue and run time percentiles. In remote judging mode it also lists the judge workers connected to this process.
+Inputs: None (Requires Admin Token)
+Outputs: JSON response (scheduler snapshot, plus 'workers' in remote mode)
+Contributors: Jay Patel, Tej Gumaste
+"""
+@bp.route('/api/admin/judge')
+@admin_required
+def get_judge_metrics():
+    """Get code execution scheduler metrics"""
+    from .scheduler import get_scheduler
+    metrics = get_scheduler().snapshot()
+    if current_app.config['JUDGE_MODE'] == 'remote':
+        from .dispatch import get_dispatcher
+        metrics['workers'] = get_dispatcher().snapshot()
+    return jsonify(metrics), 200
+
+"""
+Returns this worker's request profiling data: per-endpoint wall, CPU and SQL time percentiles and query counts over recent requests, and the most recent slow requests with their slowest statements and stack dump names.
+Inputs: None (Requires Admin Token)
+Outputs: JSON response (profiler snapshot, or enabled: false when profiling is off)
+Contributors: Jay Patel, Tej Gumaste
+"""
+@bp.route('/api/admin/profiling')
+@admin_required
+def get_profiling():
+    """Get request profiling metrics"""
+    from .profiling import get_profiler
+    profiler = get_profiler()
+    if profiler is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(profiler.snapshot()), 200
+
+"""
+Downloads the collapsed stack samples of a slow request, ready for flamegraph.pl or speedscope.
+Inputs: name (stack dump file name from the profiling snapshot) (Requires Admin Token)
+Outputs: Plain text response (one 'frame;frame;frame count' line per stack) or 404
+Contributors: Jay Patel, Tej Gumaste
+"""
+@bp.route('/api/admin/profiling/stacks/<name>')
+@admin_required
+def get_profiling_stacks(name):
+    """Download a slow request's stack samples"""
+    from .profiling import DUMP_NAME, get_profiler
+    profiler = get_profiler()
+    if profiler is None or profiler.dump_dir is None or not DUMP_NAME.match(name):
+        return jsonify({'error': 'Stack dump not found'}), 404
+    try:
+        return send_from_directory(profiler.dump_dir, name, mimetype='text/plain')
+    except NotFound:
+        return jsonify({'error': 'Stack dump not found'}), 404
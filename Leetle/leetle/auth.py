@@ -0,0 +1,550 @@
+"""
+This file handles authentication: issuing and verifying JSON Web Tokens, rotating refresh tokens, rate limiting credential endpoints, and hashing passwords off the request thread. PyJWT and the process pool are imported on first use.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .database import db
+from .models import RefreshToken, User
+
+bp = Blueprint('auth', __name__)
+
+# JWT Helper Functions
+"""
+Creates a short-lived JSON Web Token carrying the user's role, so authorization checks need no database lookup. Access tokens are not checked against token_version: revoking a user's tokens stops refreshes at once, and access tokens already issued stay valid until they expire, at most JWT_ACCESS_TOKEN_EXPIRE_MINUTES later.
+Inputs: user (User object)
+Outputs: encoded_token (string)
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def generate_access_token(user):
+    payload = {
+        'user_id': user.id,
+        'role': user.role,
+        'exp': datetime.now(timezone.utc) + timedelta(minutes=current_app.config['JWT_ACCESS_TOKEN_EXPIRE_MINUTES']),
+        'iat': datetime.now(timezone.utc),
+        'type': 'access'
+    }
+    import jwt
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+"""
+Creates a long-lived JSON Web Token used to obtain new access tokens without re-login, and stages its RefreshToken row on the session for the caller to commit.
+Inputs: user (User object), family_id (string, optional; a new family is started when omitted)
+Outputs: encoded_token (string)
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def generate_refresh_token(user, family_id=None):
+    jti = secrets.token_hex(16)
+    family_id = family_id or secrets.token_hex(16)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=current_app.config['JWT_REFRESH_TOKEN_EXPIRE_DAYS'])
+    db.session.add(RefreshToken(jti=jti, family_id=family_id, user_id=user.id,
+                                expires_at=expires_at.replace(tzinfo=None)))
+    payload = {
+        'user_id': user.id,
+        'ver': user.token_version,
+        'jti': jti,
+        'fam': family_id,
+        'exp': expires_at,
+        'iat': datetime.now(timezone.utc),
+        'type': 'refresh'
+    }
+    import jwt
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+# Recently revoked refresh token ids mapped to their family, so replays are rejected without a lookup
+revoked_refresh_jtis = OrderedDict()
+revoked_refresh_jtis_lock = threading.Lock()
+last_refresh_token_purge = 0.0
+
+"""
+Revokes every refresh token in a family and remembers the presented token id as revoked in this process.
+Inputs: family_id (string), jti (string)
+Outputs: None (Commits the revocation)
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def revoke_refresh_family(family_id, jti):
+    RefreshToken.query.filter_by(family_id=family_id, revoked=False).update({'revoked': True})
+    db.session.commit()
+    max_size = current_app.config['REVOKED_REFRESH_CACHE_SIZE']
+    with revoked_refresh_jtis_lock:
+        revoked_refresh_jtis[jti] = family_id
+        revoked_refresh_jtis.move_to_end(jti)
+        while len(revoked_refresh_jtis) > max_size:
+            revoked_refresh_jtis.popitem(last=False)
+
+"""
+Deletes expired refresh token rows in bounded batches so the table only holds live tokens.
+Inputs: batch_size (integer), max_batches (integer, optional)
+Outputs: deleted (integer count of removed rows)
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def purge_expired_refresh_tokens(batch_size=1000, max_batches=None):
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        expired = [row.jti for row in db.session.query(RefreshToken.jti)
+                   .filter(RefreshToken.expires_at < datetime.utcnow()).limit(batch_size)]
+        if not expired:
+            break
+        RefreshToken.query.filter(RefreshToken.jti.in_(expired)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(expired)
+        batches += 1
+    return deleted
+
+"""
+Revokes every session of a user: bumps token_version, so refresh tokens issued before now are rejected, and marks the user's refresh token rows revoked. Access tokens already issued expire on their own (see generate_access_token).
+Inputs: user (User object)
+Outputs: None (Commits the revocation and reloads the user)
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def revoke_user_tokens(user):
+    User.query.filter_by(id=user.id).update({'token_version': User.token_version + 1}, synchronize_session=False)
+    RefreshToken.query.filter_by(user_id=user.id, revoked=False).update({'revoked': True}, synchronize_session=False)
+    db.session.commit()
+    db.session.refresh(user)
+
+# Verified token payloads keyed by SHA-256 digest of the token, in least-recently-used order
+verified_token_cache = OrderedDict()
+verified_token_cache_lock = threading.Lock()
+
+"""
+Decodes and validates the signature and expiration of a JSON Web Token. Verified payloads are kept in a bounded LRU until their exp, so repeated requests with the same token skip the HMAC check.
+Inputs: token (string)
+Outputs: payload (dictionary) or None
+Contributors: Brett Balquist, Jay Patel, Daniel Neugent
+"""
+def verify_token(token):
+    digest = hashlib.sha256(token.encode()).digest()
+    with verified_token_cache_lock:
+        payload = verified_token_cache.get(digest)
+        if payload is not None:
+            if payload['exp'] > time.time():
+                verified_token_cache.move_to_end(digest)
+                return payload
+            del verified_token_cache[digest]
+
+    import jwt
+    try:
+        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+    with verified_token_cache_lock:
+        verified_token_cache[digest] = payload
+        if len(verified_token_cache) > current_app.config['JWT_VERIFY_CACHE_SIZE']:
+            verified_token_cache.popitem(last=False)
+    return payload
+
+"""
+Decorator that ensures a valid access token is present in the request headers before allowing access to a route.
+Inputs: f (function)
+Outputs: decorated_function (function)
+Contributors: Tej Gumaste, Daniel Neugent, Arnav Jain, Brett Balquist, Jay Patel
+"""
+def token_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Missing or invalid authorization header'}), 401
+
+        token = auth_header.split(' ')[1]
+        payload = verify_token(token)
+
+        if not payload or payload.get('type') != 'access':
+            return jsonify({'error': 'Invalid or expired token'}), 401
+
+        # Add user_id and role claim to request context
+        request.user_id = payload['user_id']
+        request.user_role = payload.get('role')
+        return f(*args, **kwargs)
+    return decorated_function
+
+"""
+Decorator that restricts access to a route to users with the 'admin' role only.
+Inputs: f (function)
+Outputs: decorated_function (function)
+Contributors: Jay Patel, Brett Balquist
+"""
+def admin_required(f):
+    @wraps(f)
+    @token_required
+    def decorated_function(*args, **kwargs):
+        role = request.user_role
+        if role is None:
+            # Tokens issued before role claims existed still need a lookup
+            user = User.query.get(request.user_id)
+            role = user.role if user else None
+        if role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+"""
+Token-bucket rate limiter keyed by an arbitrary string such as a client IP or an email address. Each key holds up to `capacity` tokens that refill continuously at `refill_per_second`, and the number of tracked keys is bounded.
+Inputs: capacity (integer), refill_per_second (float), max_keys (integer)
+Outputs: TokenBucketLimiter instance
+Contributors: Arnav Jain, Tej Gumaste
+"""
+class TokenBucketLimiter:
+    def __init__(self, capacity, refill_per_second, max_keys=100000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()  # key -> (tokens, last_refill)
+        self.lock = threading.Lock()
+
+    # Takes one token for the key. Returns 0 when allowed, otherwise the seconds until a token is available.
+    def consume(self, key):
+        now = time.monotonic()
+        with self.lock:
+            tokens, last_refill = self.buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last_refill) * self.refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / self.refill_per_second
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return retry_after
+
+"""
+Creates the per-application authentication state: the login rate limiters and the password hashing queue slots, sized from the app's config.
+Inputs: app (Flask application)
+Outputs: None (Stores the state in app.extensions['leetle_auth'])
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def init_app(app):
+    app.extensions['leetle_auth'] = {
+        'login_ip_limiter': TokenBucketLimiter(app.config['AUTH_RATE_LIMIT_IP_BURST'], app.config['AUTH_RATE_LIMIT_IP_PER_MINUTE'] / 60.0),
+        'login_email_limiter': TokenBucketLimiter(app.config['AUTH_RATE_LIMIT_EMAIL_BURST'], app.config['AUTH_RATE_LIMIT_EMAIL_PER_MINUTE'] / 60.0),
+        'password_hash_slots': threading.BoundedSemaphore(app.config['PASSWORD_HASH_QUEUE_DEPTH']),
+    }
+
+"""
+Checks the given limiter keys in order and builds a 429 response with Retry-After for the first one that is exhausted.
+Inputs: checks (list of (TokenBucketLimiter, key) pairs)
+Outputs: Flask response tuple or None when the request is allowed
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def rate_limit_response(checks):
+    for limiter, key in checks:
+        retry_after = limiter.consume(key)
+        if retry_after:
+            return jsonify({'error': 'Too many attempts, please try again later'}), 429, {'Retry-After': str(int(retry_after) + 1)}
+    return None
+
+"""
+Raised when the password hashing pool already has its maximum number of queued jobs.
+Inputs: None
+Outputs: PasswordHashingOverloaded exception
+Contributors: Arnav Jain, Tej Gumaste
+"""
+class PasswordHashingOverloaded(Exception):
+    pass
+
+password_hash_executor = None
+password_hash_executor_pid = None
+
+"""
+Runs a password hashing function on a bounded process pool so slow KDFs do not pin request threads. The pool is created lazily in each worker process, and jobs beyond the queue depth are shed immediately.
+Inputs: fn (function), args (arguments for fn)
+Outputs: The return value of fn
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def run_password_job(fn, *args):
+    global password_hash_executor, password_hash_executor_pid
+    password_hash_slots = current_app.extensions['leetle_auth']['password_hash_slots']
+    if not password_hash_slots.acquire(blocking=False):
+        raise PasswordHashingOverloaded()
+    try:
+        if current_app.config['PASSWORD_HASH_WORKERS'] <= 0:
+            return fn(*args)
+        # A pool inherited across fork is unusable, so each worker process builds its own. Forking a threaded worker can
+        # copy a lock another thread holds, so pool processes come from a forkserver (or spawn) instead
+        if password_hash_executor is None or password_hash_executor_pid != os.getpid():
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            password_hash_executor = ProcessPoolExecutor(max_workers=current_app.config['PASSWORD_HASH_WORKERS'],
+                                                         mp_context=multiprocessing.get_context(method))
+            password_hash_executor_pid = os.getpid()
+        return password_hash_executor.submit(fn, *args).result()
+    finally:
+        password_hash_slots.release()
+
+"""
+Builds the 503 response returned when password hashing is shedding load.
+Inputs: None
+Outputs: Flask response tuple
+Contributors: Arnav Jain, Tej Gumaste
+"""
+def hashing_overloaded_response():
+    return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
+
+"""
+Registers a new user account after validating email format and password strength.
+Inputs: JSON payload (email, password)
+Outputs: JSON response (success message, tokens, user info) or error
+Contributors: Daniel Neugent, Arnav Jain
+"""
+# Authentication Routes
+@bp.route('/auth/signup', methods=['POST'])
+def signup():
+    data = request.get_json()
+
+    if not data or not data.get('email') or not data.get('password'):
+        return jsonify({'error': 'Email and password are required'}), 400
+
+    email = data['email'].lower().strip()
+    password = data['password']
+
+    # Validate email format (basic)
+    if '@' not in email or '.' not in email:
+        return jsonify({'error': 'Invalid email format'}), 400
+
+    # Check password strength
+    if len(password) < 6:
+        return jsonify({'error': 'Password must be at least 6 characters long'}), 400
+
+    limiters = current_app.extensions['leetle_auth']
+    limited = rate_limit_response([(limiters['login_ip_limiter'], request.remote_addr)])
+    if limited:
+        return limited
+
+    # Check if user already exists
+    existing_user = User.query.filter_by(email=email).first()
+    if existing_user:
+        return jsonify({'error': 'User with this email already exists'}), 409
+
+    # Create new user
+    try:
+        password_hash = run_password_job(generate_password_hash, password)
+    except PasswordHashingOverloaded:
+        return hashing_overloaded_response()
+    new_user = User(email=email, password_hash=password_hash)
+
+    try:
+        db.session.add(new_user)
+        db.session.commit()
+
+        # Generate tokens
+        access_token = generate_access_token(new_user)
+        refresh_token = generate_refresh_token(new_user)
+        db.session.commit()
+
+        return jsonify({
+            'message': 'User created successfully',
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'user': {
+                'id': new_user.id,
+                'email': new_user.email
+            }
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create user'}), 500
+
+"""
+Authenticates a user by verifying credentials and returning access and refresh tokens.
+Inputs: JSON payload (email, password)
+Outputs: JSON response (tokens, user info) or error
+Contributors: Daniel Neugent, Arnav Jain
+"""
+@bp.route('/auth/login', methods=['POST'])
+def login():
+    data = request.get_json()
+
+    if not data or not data.get('email') or not data.get('password'):
+        return jsonify({'error': 'Email and password are required'}), 400
+
+    email = data['email'].lower().strip()
+    password = data['password']
+
+    # Reject abusive traffic before doing any hashing work
+    limiters = current_app.extensions['leetle_auth']
+    limited = rate_limit_response([(limiters['login_ip_limiter'], request.remote_addr),
+                                   (limiters['login_email_limiter'], email)])
+    if limited:
+        return limited
+
+    # Find user
+    user = User.query.filter_by(email=email).first()
+    try:
+        if not user or not run_password_job(check_password_hash, user.password_hash, password):
+            return jsonify({'error': 'Invalid email or password'}), 401
+    except PasswordHashingOverloaded:
+        return hashing_overloaded_response()
+
+    # Generate tokens
+    access_token = generate_access_token(user)
+    refresh_token = generate_refresh_token(user)
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Login successful',
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'user': {
+            'id': user.id,
+            'email': user.email
+        }
+    }), 200
+
+"""
+Rotates a valid refresh token: the presented token is marked used and a new access token and refresh token in the same family are returned. Presenting a token that was already rotated or revoked revokes its whole family.
+Inputs: JSON payload (refresh_token)
+Outputs: JSON response (new access_token, refresh_token) or error
+Contributors: Tej Gumaste, Brett Balquist
+"""
+@bp.route('/auth/refresh', methods=['POST'])
+def refresh_token():
+    global last_refresh_token_purge
+    data = request.get_json()
+
+    if not data or not data.get('refresh_token'):
+        return jsonify({'error': 'Refresh token is required'}), 400
+
+    refresh_token = data['refresh_token']
+    payload = verify_token(refresh_token)
+
+    if not payload or payload.get('type') != 'refresh' or 'jti' not in payload:
+        return jsonify({'error': 'Invalid refresh token'}), 401
+
+    jti = payload['jti']
+    with revoked_refresh_jtis_lock:
+        replayed = jti in revoked_refresh_jtis
+    if replayed:
+        revoke_refresh_family(payload['fam'], jti)
+        return jsonify({'error': 'Refresh token has been revoked'}), 401
+
+    # One primary-key lookup fetches both the token row and its user
+    row = db.session.query(RefreshToken, User).join(User, RefreshToken.user_id == User.id)\
+                    .filter(RefreshToken.jti == jti).first()
+    if not row:
+        return jsonify({'error': 'Invalid refresh token'}), 401
+    stored_token, user = row
+
+    # Bumping token_version revokes every refresh token issued before it
+    if payload.get('ver', 0) != user.token_version:
+        return jsonify({'error': 'Refresh token has been revoked'}), 401
+
+    # Conditional update so two concurrent refreshes cannot both rotate the same token
+    rotated = RefreshToken.query.filter_by(jti=jti, revoked=False)\
+                          .update({'revoked': True}, synchronize_session=False)
+    if not rotated:
+        # A rotated token came back, so it has leaked: revoke the family
+        db.session.rollback()
+        revoke_refresh_family(stored_token.family_id, jti)
+        return jsonify({'error': 'Refresh token has been revoked'}), 401
+
+    new_access_token = generate_access_token(user)
+    new_refresh_token = generate_refresh_token(user, family_id=stored_token.family_id)
+    db.session.commit()
+
+    if time.time() - last_refresh_token_purge > current_app.config['REFRESH_TOKEN_PURGE_INTERVAL']:
+        last_refresh_token_purge = time.time()
+        purge_expired_refresh_tokens(max_batches=1)
+
+    return jsonify({
+        'access_token': new_access_token,
+        'refresh_token': new_refresh_token
+    }), 200
+
+"""
+Revokes the refresh token family of the presented token so the session cannot be refreshed again.
+Inputs: JSON payload (refresh_token)
+Outputs: JSON response (success message) or error
+Contributors: Tej Gumaste, Brett Balquist
+"""
+@bp.route('/auth/logout', methods=['POST'])
+def logout():
+    data = request.get_json()
+
+    if not data or not data.get('refresh_token'):
+        return jsonify({'error': 'Refresh token is required'}), 400
+
+    payload = verify_token(data['refresh_token'])
+    if not payload or payload.get('type') != 'refresh' or 'jti' not in payload:
+        return jsonify({'error': 'Invalid refresh token'}), 401
+
+    revoke_refresh_family(payload['fam'], payload['jti'])
+    return jsonify({'message': 'Logged out successfully'}), 200
+
+"""
+Signs the current user out everywhere by revoking all of their refresh tokens.
+Inputs: Authorization header (access token)
+Outputs: JSON response (success message) or error
+Contributors: Arnav Jain, Tej Gumaste
+"""
+@bp.route('/auth/logout-all', methods=['POST'])
+@token_required
+def logout_all():
+    user = db.session.get(User, request.user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    revoke_user_tokens(user)
+    return jsonify({'message': 'Logged out of all sessions'}), 200
+
+"""
+Changes the current user's password after checking the current one, revokes every existing session, and returns a fresh token pair for the caller.
+Inputs: Authorization header (access token), JSON payload (current_password, new_password)
+Outputs: JSON response (tokens) or error
+Contributors: Arnav Jain, Tej Gumaste
+"""
+@bp.route('/auth/password', methods=['POST'])
+@token_required
+def change_password():
+    data = request.get_json()
+
+    if not data or not data.get('current_password') or not data.get('new_password'):
+        return jsonify({'error': 'Current and new passwords are required'}), 400
+
+    if len(data['new_password']) < 6:
+        return jsonify({'error': 'Password must be at least 6 characters long'}), 400
+
+    user = db.session.get(User, request.user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    limiters = current_app.extensions['leetle_auth']
+    limited = rate_limit_response([(limiters['login_ip_limiter'], request.remote_addr),
+                                   (limiters['login_email_limiter'], user.email)])
+    if limited:
+        return limited
+
+    try:
+        if not run_password_job(check_password_hash, user.password_hash, data['current_password']):
+            return jsonify({'error': 'Current password is incorrect'}), 401
+        user.password_hash = run_password_job(generate_password_hash, data['new_password'])
+    except PasswordHashingOverloaded:
+        return hashing_overloaded_response()
+
+    revoke_user_tokens(user)
+    access_token = generate_access_token(user)
+    refresh_token = generate_refresh_token(user)
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Password changed successfully',
+        'access_token': access_token,
+        'refresh_token': refresh_token
+    }), 200
@@ -0,0 +1,85 @@
+"""
+This file implements a content-addressed blob store on local disk. Each blob is saved once under the SHA-256 of its bytes, so problems with identical test cases share one file, and blobs no problem references can be swept away.
+Authors: Daniel Neugent and Jay Patel
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+"""
+Content-addressed store rooted at a directory. Blobs are laid out as <root>/<first two hex digits>/<remaining digits> and are immutable once written.
+Inputs: root (string directory path)
+Outputs: BlobStore instance
+Contributors: Daniel Neugent, Jay Patel
+"""
+class BlobStore:
+    def __init__(self, root):
+        self.root = root
+
+    # Returns the file path for a digest.
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    # Writes the bytes if no blob with the same digest exists and returns the digest. The write goes through a temporary file and a rename so readers never see a partial blob. Reusing an existing blob refreshes its modification time, so a sweep cannot remove it before the caller's row is committed.
+    def put(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+                return digest
+            except FileNotFoundError:
+                pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return digest
+
+    # Returns True when the blob is present.
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    # Returns a blob's bytes. Raises FileNotFoundError for unknown digests.
+    def read_bytes(self, digest):
+        with open(self.path(digest), 'rb') as f:
+            return f.read()
+
+    # Decodes a blob as UTF-8 text.
+    def read_text(self, digest):
+        return self.read_bytes(digest).decode('utf-8')
+
+    # Yields the digest of every stored blob, skipping temporary files of writes in progress.
+    def digests(self):
+        if not os.path.isdir(self.root):
+            return
+        for prefix in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if not name.startswith('.'):
+                    yield prefix + name
+
+    # Deletes the blobs whose digests are not in keep and that were last written or reused more than grace_seconds ago, so a blob put for a row that is not committed yet survives. Returns the number of blobs removed.
+    def sweep(self, keep, grace_seconds=3600):
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        for digest in list(self.digests()):
+            if digest in keep:
+                continue
+            path = self.path(digest)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
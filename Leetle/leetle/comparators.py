@@ -0,0 +1,222 @@
+"""
+This file defines the output comparators used to judge submissions. A problem names its comparator with a spec such as 'exact', 'tokens', 'float:1e-6', 'unordered_lines' or 'json'. Each comparator is fed the program's stdout in chunks as it arrives and reports a mismatch as soon as one is certain, so the judge can stop a wrong answer without waiting for it to finish.
+Authors: Daniel Neugent and Tej Gumaste
+"""
+import json
+import math
+from collections import Counter
+
+# Comparator classes by name, filled in by register_comparator
+COMPARATORS = {}
+DEFAULT_COMPARATOR = 'exact'
+
+"""
+Class decorator that registers a comparator under a name usable in problem specs.
+Inputs: name (string)
+Outputs: decorator returning the class unchanged
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+def register_comparator(name):
+    def decorator(cls):
+        COMPARATORS[name] = cls
+        return cls
+    return decorator
+
+"""
+Creates a comparator for one test case from a problem's comparator spec ('name' or 'name:argument').
+Inputs: spec (string or None for the default), expected (string expected output)
+Outputs: comparator instance
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+def create_comparator(spec, expected):
+    name, _, argument = (spec or DEFAULT_COMPARATOR).partition(':')
+    if name not in COMPARATORS:
+        raise ValueError(f"Unknown comparator '{name}'")
+    return COMPARATORS[name](expected, argument or None)
+
+"""
+Checks a comparator spec given by an admin or a definition file.
+Inputs: spec (string or None)
+Outputs: spec (string or None), unchanged; raises ValueError when the name or argument is invalid
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+def validate_comparator(spec):
+    if spec is not None and not isinstance(spec, str):
+        raise ValueError('Comparator must be a string')
+    create_comparator(spec, '')
+    return spec or None
+
+"""
+Compares whole output with surrounding whitespace ignored, matching the judge's original stripped string comparison. Whitespace is held back until the next non-whitespace byte shows it was not trailing.
+Inputs: expected (string), argument (unused)
+Outputs: ExactComparator instance
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@register_comparator('exact')
+class ExactComparator:
+    def __init__(self, expected, argument=None):
+        self.expected = expected.strip().encode('utf-8')
+        self.position = 0
+        self.started = False
+        self.pending = b''
+        self.ok = True
+
+    # Compares the next chunk against the expected output at the current position; returns False once the output has diverged.
+    def feed(self, chunk):
+        if not self.ok:
+            return False
+        if not self.started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return True
+            self.started = True
+        data = self.pending + chunk if self.pending else chunk
+        body = data.rstrip()
+        self.pending = data[len(body):]
+        end = self.position + len(body)
+        # A slice past the end is shorter than body, so extra output is a mismatch too
+        if self.expected[self.position:end] != body:
+            self.ok = False
+        self.position = end
+        return self.ok
+
+    # Returns True when the complete output matched.
+    def finish(self):
+        return self.ok and self.position == len(self.expected)
+
+"""
+Compares whitespace-separated tokens, so spacing and line breaks do not matter. Subclasses override match and match_prefix to change how single tokens compare.
+Inputs: expected (string), argument (unused)
+Outputs: TokenComparator instance
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@register_comparator('tokens')
+class TokenComparator:
+    def __init__(self, expected, argument=None):
+        self.expected = expected.encode('utf-8').split()
+        self.index = 0
+        self.partial = b''
+        self.ok = True
+
+    # Returns True when an output token matches an expected token.
+    def match(self, actual, expected):
+        return actual == expected
+
+    # Returns True when an incomplete output token can still match the expected token.
+    def match_prefix(self, partial, expected):
+        return expected.startswith(partial)
+
+    # Checks one complete token against the next expected token.
+    def accept(self, token):
+        if self.index >= len(self.expected) or not self.match(token, self.expected[self.index]):
+            self.ok = False
+        self.index += 1
+        return self.ok
+
+    # Checks every token completed by the chunk and the prefix of the token still being written.
+    def feed(self, chunk):
+        if not self.ok:
+            return False
+        data = self.partial + chunk if self.partial else chunk
+        tokens = data.split()
+        self.partial = tokens.pop() if tokens and not data[-1:].isspace() else b''
+        for token in tokens:
+            if not self.accept(token):
+                return False
+        if self.partial and (self.index >= len(self.expected)
+                             or not self.match_prefix(self.partial, self.expected[self.index])):
+            self.ok = False
+        return self.ok
+
+    # Returns True when every expected token was matched and nothing followed.
+    def finish(self):
+        if self.ok and self.partial:
+            self.accept(self.partial)
+            self.partial = b''
+        return self.ok and self.index == len(self.expected)
+
+"""
+Compares tokens, treating numeric tokens as equal when they are within an absolute or relative tolerance. The tolerance is the spec argument, e.g. 'float:1e-4'.
+Inputs: expected (string), argument (string tolerance, default 1e-6)
+Outputs: FloatComparator instance
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@register_comparator('float')
+class FloatComparator(TokenComparator):
+    def __init__(self, expected, argument=None):
+        super().__init__(expected)
+        self.tolerance = float(argument) if argument else 1e-6
+        if not self.tolerance >= 0:
+            raise ValueError('Float comparator tolerance must be a non-negative number')
+
+    def match(self, actual, expected):
+        if actual == expected:
+            return True
+        try:
+            return math.isclose(float(actual), float(expected), rel_tol=self.tolerance, abs_tol=self.tolerance)
+        except ValueError:
+            return False
+
+    # A number is only comparable once it is complete
+    def match_prefix(self, partial, expected):
+        return True
+
+"""
+Compares the output as a multiset of lines in any order, ignoring surrounding whitespace and blank lines. A line that is not expected, or is repeated too often, fails immediately.
+Inputs: expected (string), argument (unused)
+Outputs: UnorderedLinesComparator instance
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@register_comparator('unordered_lines')
+class UnorderedLinesComparator:
+    def __init__(self, expected, argument=None):
+        self.remaining = Counter(line.strip() for line in expected.encode('utf-8').splitlines() if line.strip())
+        self.partial = b''
+        self.ok = True
+
+    # Removes one output line from the expected lines still outstanding.
+    def accept(self, line):
+        line = line.strip()
+        if line:
+            if self.remaining[line] <= 0:
+                self.ok = False
+            self.remaining[line] -= 1
+        return self.ok
+
+    def feed(self, chunk):
+        if not self.ok:
+            return False
+        lines = (self.partial + chunk).split(b'\n')
+        self.partial = lines.pop()
+        for line in lines:
+            if not self.accept(line):
+                return False
+        return True
+
+    def finish(self):
+        if self.ok and self.partial:
+            self.accept(self.partial)
+            self.partial = b''
+        return self.ok and not any(self.remaining.values())
+
+"""
+Compares the output and the expected output as JSON values, so key order and formatting do not matter. JSON can only be judged once complete, so this comparator never stops a run early.
+Inputs: expected (string), argument (unused)
+Outputs: JSONComparator instance
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@register_comparator('json')
+class JSONComparator:
+    def __init__(self, expected, argument=None):
+        self.expected = expected
+        self.chunks = []
+
+    def feed(self, chunk):
+        self.chunks.append(chunk)
+        return True
+
+    def finish(self):
+        try:
+            return json.loads(b''.join(self.chunks)) == json.loads(self.expected)
+        except ValueError:
+            return False
@@ -0,0 +1,208 @@
+"""
+This file holds the configuration for the Leetle backend: storage profiles, database URI normalization, engine pool options, and the settings every application instance starts from.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+"""
+Returns how many CPUs this process may actually use: LEETLE_CPU_COUNT when set, otherwise the smaller of the CPUs in its affinity mask and its cgroup CPU quota rounded up. os.cpu_count() reports every core on the host, which overcounts in containers.
+Inputs: LEETLE_CPU_COUNT environment variable (optional)
+Outputs: cpus (integer, at least 1)
+Contributors: Jay Patel, Daniel Neugent
+"""
+def available_cpus():
+    if os.getenv('LEETLE_CPU_COUNT'):
+        return max(1, int(os.getenv('LEETLE_CPU_COUNT')))
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 cpu.max holds "<quota> <period>" or "max <period>"; v1 splits them across two files
+    quota = period = None
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = f.read().strip()
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = f.read().strip()
+        except OSError:
+            pass
+    if quota not in (None, 'max', '-1') and period:
+        cpus = min(cpus, -(-int(quota) // int(period)))
+    return max(1, cpus)
+
+"""
+Storage profiles for the database engine. The default profile keeps SQLite's stock settings, while the production profile turns on WAL journaling, per-connection pragmas, a busy timeout and a bounded connection pool so concurrent gunicorn workers stop failing with "database is locked".
+Inputs: LEETLE_DB_PROFILE environment variable ('default' or 'production')
+Outputs: SQLite pragmas and SQLAlchemy engine options for the selected profile
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+DB_PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {},
+    },
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,  # negative values are KiB, so ~64 MB
+            'mmap_size': 268435456,  # 256 MB
+            'busy_timeout': 5000,  # milliseconds
+            'temp_store': 'MEMORY',
+        },
+        'engine_options': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'connect_args': {'timeout': 5, 'check_same_thread': False},
+        },
+    },
+}
+
+"""
+Normalizes the configured database URI, rewriting the legacy postgres:// scheme issued by Render and Heroku to the postgresql:// scheme SQLAlchemy expects.
+Inputs: database_uri (string)
+Outputs: database_uri (string)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def normalize_database_uri(database_uri):
+    if database_uri.startswith('postgres://'):
+        return 'postgresql://' + database_uri[len('postgres://'):]
+    return database_uri
+
+"""
+Builds SQLAlchemy engine options for the configured backend. SQLite uses the storage profile, client/server databases such as PostgreSQL get a pre-pinged, recycled pool, and LEETLE_DB_POOL_* variables override the pool settings for either.
+Inputs: profile (string), database_uri (string), env (mapping of environment variables)
+Outputs: engine_options (dictionary)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def get_engine_options(profile, database_uri, env=os.environ):
+    if database_uri.startswith('sqlite'):
+        options = dict(DB_PROFILES[profile]['engine_options'])
+        # In-memory SQLite uses a singleton pool that rejects sizing arguments
+        if ':memory:' in database_uri:
+            for key in ('pool_size', 'max_overflow', 'pool_timeout'):
+                options.pop(key, None)
+            return options
+    else:
+        options = {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,  # seconds, below typical server idle timeouts
+        }
+
+    overrides = {
+        'pool_size': ('LEETLE_DB_POOL_SIZE', int),
+        'max_overflow': ('LEETLE_DB_MAX_OVERFLOW', int),
+        'pool_timeout': ('LEETLE_DB_POOL_TIMEOUT', int),
+        'pool_recycle': ('LEETLE_DB_POOL_RECYCLE', int),
+        'pool_pre_ping': ('LEETLE_DB_POOL_PRE_PING', lambda value: value.lower() in ('1', 'true', 'yes')),
+    }
+    for option, (variable, cast) in overrides.items():
+        if env.get(variable):
+            options[option] = cast(env[variable])
+    return options
+
+"""
+Builds the default configuration for an application instance from the environment. Engine options are derived from the database URI by create_app, so a caller overriding the URI gets matching pool settings.
+Inputs: Environment variables (.env)
+Outputs: config (dictionary of Flask config keys)
+Contributors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, Arnav Jain
+"""
+def load_config():
+    config = {
+        'SECRET_KEY': os.getenv('SECRET_KEY', 'leetlenew-secret-key-change-in-production'),
+        'JSON_SORT_KEYS': False,
+        'SQLALCHEMY_DATABASE_URI': normalize_database_uri(os.getenv('DATABASE_URL', 'sqlite:///leetle.db')),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'DB_PROFILE': os.getenv('LEETLE_DB_PROFILE', 'default'),
+        'DB_NATIVE_JSON': os.getenv('LEETLE_DB_NATIVE_JSON', 'false').lower() in ('1', 'true', 'yes'),
+        'DB_REPLICA_STICKY_SECONDS': int(os.getenv('LEETLE_DB_REPLICA_STICKY_SECONDS', '30')),
+        'DB_WRITE_RETRIES': 5,
+        'DB_WRITE_RETRY_BASE_DELAY': 0.05,  # seconds, doubled on each retry
+        'HINT_DAILY_LIMIT': 3,
+        'JWT_ACCESS_TOKEN_EXPIRE_MINUTES': 15,
+        'JWT_REFRESH_TOKEN_EXPIRE_DAYS': 7,
+        'JWT_VERIFY_CACHE_SIZE': 4096,
+        'REVOKED_REFRESH_CACHE_SIZE': 10000,
+        'REFRESH_TOKEN_PURGE_INTERVAL': 3600,  # seconds between opportunistic purges per process
+        'PASSWORD_HASH_WORKERS': int(os.getenv('LEETLE_PASSWORD_HASH_WORKERS', str(min(2, available_cpus())))),  # 0 hashes inline
+        'PASSWORD_HASH_QUEUE_DEPTH': int(os.getenv('LEETLE_PASSWORD_HASH_QUEUE_DEPTH', '16')),
+        # Proxies in front of the app that append to X-Forwarded-For (1 on Render); the per-IP limits key on the client
+        # address they report. 0 trusts no header and uses the socket peer address
+        'PROXY_FIX_X_FOR': int(os.getenv('LEETLE_PROXY_FIX_X_FOR', '0')),
+        'AUTH_RATE_LIMIT_IP_BURST': int(os.getenv('LEETLE_AUTH_RATE_LIMIT_IP_BURST', '20')),
+        'AUTH_RATE_LIMIT_IP_PER_MINUTE': int(os.getenv('LEETLE_AUTH_RATE_LIMIT_IP_PER_MINUTE', '20')),
+        'AUTH_RATE_LIMIT_EMAIL_BURST': int(os.getenv('LEETLE_AUTH_RATE_LIMIT_EMAIL_BURST', '5')),
+        'AUTH_RATE_LIMIT_EMAIL_PER_MINUTE': int(os.getenv('LEETLE_AUTH_RATE_LIMIT_EMAIL_PER_MINUTE', '2')),
+        'TESTCASE_INLINE_MAX_BYTES': int(os.getenv('LEETLE_TESTCASE_INLINE_MAX_BYTES', '16384')),  # larger sets go to the blob store
+        'TESTCASE_CACHE_MAX_BYTES': int(os.getenv('LEETLE_TESTCASE_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        # A run is killed once its stdout exceeds expected length * factor + slack bytes
+        'JUDGE_OUTPUT_LIMIT_FACTOR': int(os.getenv('LEETLE_JUDGE_OUTPUT_LIMIT_FACTOR', '4')),
+        'JUDGE_OUTPUT_SLACK_BYTES': int(os.getenv('LEETLE_JUDGE_OUTPUT_SLACK_BYTES', '65536')),
+        # 'process' runs code as a plain child process; 'namespaces' isolates it (see leetle/sandbox.py)
+        'JUDGE_SANDBOX': os.getenv('LEETLE_JUDGE_SANDBOX', 'process'),
+        'JUDGE_MEMORY_LIMIT_MB': int(os.getenv('LEETLE_JUDGE_MEMORY_LIMIT_MB', '256')),
+        'JUDGE_CPU_LIMIT': float(os.getenv('LEETLE_JUDGE_CPU_LIMIT', '1.0')),  # cores per run
+        'JUDGE_PIDS_LIMIT': int(os.getenv('LEETLE_JUDGE_PIDS_LIMIT', '128')),
+        'JUDGE_CPU_TIME_LIMIT': int(os.getenv('LEETLE_JUDGE_CPU_TIME_LIMIT', '10')),  # seconds
+        # Extra host paths (colon-separated, globs allowed) that namespaces-sandboxed runs can read, e.g. a runtime under /opt
+        'JUDGE_SANDBOX_READ_ONLY_PATHS': tuple(path for path in os.getenv('LEETLE_JUDGE_SANDBOX_READ_ONLY_PATHS', '').split(':')
+                                               if path),
+        # Admission control per worker process (see leetle/scheduler.py); gunicorn.conf.py divides the cores between workers
+        'JUDGE_MAX_CONCURRENT': max(1, int(os.getenv('LEETLE_JUDGE_MAX_CONCURRENT', str(available_cpus())))),
+        'JUDGE_MAX_PER_USER': int(os.getenv('LEETLE_JUDGE_MAX_PER_USER', '2')),
+        'JUDGE_QUEUE_TIMEOUT': float(os.getenv('LEETLE_JUDGE_QUEUE_TIMEOUT', '20')),  # seconds
+    }
+    # Languages judged on warm runners instead of a fresh process per test case (see leetle/runners/), e.g. 'python,javascript,java'
+    config['JUDGE_WARM_RUNNERS'] = tuple(name.strip() for name in os.getenv('LEETLE_JUDGE_WARM_RUNNERS', '').split(',')
+                                         if name.strip())
+    config['JUDGE_WARM_POOL_SIZE'] = int(os.getenv('LEETLE_JUDGE_WARM_POOL_SIZE', '2'))  # idle runners per language and process
+    config['JUDGE_RUNNER_MAX_JOBS'] = int(os.getenv('LEETLE_JUDGE_RUNNER_MAX_JOBS', '200'))  # test cases before a runner recycles
+    config['JUDGE_QUEUE_DEPTH'] = int(os.getenv('LEETLE_JUDGE_QUEUE_DEPTH', str(config['JUDGE_MAX_CONCURRENT'] * 4)))
+    # 'local' judges in the web process; 'remote' sends submissions to python -m leetle.worker processes (see leetle/dispatch.py)
+    config['JUDGE_MODE'] = os.getenv('LEETLE_JUDGE_MODE', 'local')
+    config['JUDGE_HEARTBEAT_INTERVAL'] = float(os.getenv('LEETLE_JUDGE_HEARTBEAT_INTERVAL', '2'))  # seconds
+    config['JUDGE_HEARTBEAT_TIMEOUT'] = float(os.getenv('LEETLE_JUDGE_HEARTBEAT_TIMEOUT', '6'))  # seconds
+    config['JUDGE_WORKER_WAIT'] = float(os.getenv('LEETLE_JUDGE_WORKER_WAIT', '5'))  # seconds to wait for a worker to connect
+    config['JUDGE_JOB_TIMEOUT'] = float(os.getenv('LEETLE_JUDGE_JOB_TIMEOUT', '120'))  # seconds
+    # Key dispatchers and judge workers authenticate each other with (see leetle/protocol.py); derived from SECRET_KEY if unset
+    config['JUDGE_SECRET'] = os.getenv('LEETLE_JUDGE_SECRET')
+    # unix:/path, host:port or host:first-last (one port per web process; no host means loopback), with {pid} replaced per
+    # web process; defaults to <instance>/judge-{pid}.sock, resolved by create_app
+    if os.getenv('LEETLE_JUDGE_DISPATCH_ADDRESS'):
+        config['JUDGE_DISPATCH_ADDRESS'] = os.getenv('LEETLE_JUDGE_DISPATCH_ADDRESS')
+    # Delegated cgroup v2 directory for per-run memory, CPU and process limits in the namespaces sandbox
+    if os.getenv('LEETLE_JUDGE_CGROUP_ROOT'):
+        config['JUDGE_CGROUP_ROOT'] = os.getenv('LEETLE_JUDGE_CGROUP_ROOT')
+    # Submission workspaces; defaults to /dev/shm when writable (see judge.get_scratch_root)
+    if os.getenv('LEETLE_JUDGE_SCRATCH_DIR'):
+        config['JUDGE_SCRATCH_DIR'] = os.getenv('LEETLE_JUDGE_SCRATCH_DIR')
+    # Defaults to <instance>/testcases, resolved by create_app
+    if os.getenv('LEETLE_TESTCASE_BLOB_DIR'):
+        config['TESTCASE_BLOB_DIR'] = os.getenv('LEETLE_TESTCASE_BLOB_DIR')
+    # Opt-in per-request profiling (see leetle/profiling.py): Server-Timing headers and /api/admin/profiling
+    config['PROFILING_ENABLED'] = os.getenv('LEETLE_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+    config['PROFILING_SLOW_MS'] = float(os.getenv('LEETLE_PROFILING_SLOW_MS', '500'))  # slower requests are logged
+    # Sample in-flight request stacks and dump slow requests as collapsed stacks for flame graphs
+    config['PROFILING_SAMPLER'] = os.getenv('LEETLE_PROFILING_SAMPLER', 'false').lower() in ('1', 'true', 'yes')
+    config['PROFILING_SAMPLE_INTERVAL_MS'] = float(os.getenv('LEETLE_PROFILING_SAMPLE_INTERVAL_MS', '5'))
+    config['PROFILING_MAX_DUMPS'] = int(os.getenv('LEETLE_PROFILING_MAX_DUMPS', '200'))  # oldest stack dumps are deleted
+    # Defaults to <instance>/profiles, resolved by create_app
+    if os.getenv('LEETLE_PROFILING_DIR'):
+        config['PROFILING_DIR'] = os.getenv('LEETLE_PROFILING_DIR')
+    # Optional read replica for read-heavy endpoints, e.g. a streaming replica or a SQLite file copy
+    if os.getenv('DATABASE_REPLICA_URL'):
+        config['SQLALCHEMY_BINDS'] = {'replica': normalize_database_uri(os.getenv('DATABASE_REPLICA_URL'))}
+    return config
@@ -0,0 +1,195 @@
+"""
+This file owns the shared SQLAlchemy extension and the storage helpers built on it: read replica routing, SQLite connection pragmas, write retries, the portable JSON column type, and in-place schema upgrades.
+Authors: Daniel Neugent, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import json
+import os
+import random
+import sqlite3
+import time
+from functools import wraps
+
+from flask import after_this_request, current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from .config import DB_PROFILES
+
+"""
+Session that sends queries from read-only endpoints to the 'replica' bind when one is configured. Anything that flushes, and any request by a user who wrote recently, stays on the primary so users always read their own writes.
+Inputs: Flask g.use_replica flag set by the read_replica decorator
+Outputs: SQLAlchemy engine for each statement
+Contributors: Daniel Neugent, Jay Patel
+"""
+class RoutingSession(FlaskSQLAlchemySession):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('use_replica'):
+            engines = self._db.engines
+            if 'replica' in engines:
+                return engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+# Bound to an application by create_app
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Response header carrying a signed, time-limited pin to the primary; clients send it back on later requests
+PRIMARY_STICKY_HEADER = 'X-Leetle-Read-Primary'
+
+"""
+Returns the serializer that signs primary pins with the app's secret key.
+Inputs: None
+Outputs: itsdangerous URLSafeTimedSerializer
+Contributors: Daniel Neugent, Jay Patel
+"""
+def primary_sticky_serializer():
+    from itsdangerous import URLSafeTimedSerializer
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='leetle-read-primary')
+
+"""
+Pins a user's reads to the primary database for a short window after they write, so replica lag never hides their own submission. The pin travels with the client as a signed header on the response, so it holds whichever worker or instance serves the next request.
+Inputs: user_id (integer)
+Outputs: None (Adds the header to the current response)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def mark_primary_sticky(user_id):
+    token = primary_sticky_serializer().dumps(user_id)
+
+    @after_this_request
+    def add_primary_sticky_header(response):
+        response.headers[PRIMARY_STICKY_HEADER] = token
+        return response
+
+"""
+Returns whether the request carries a valid, unexpired primary pin. Authenticated requests only honour a pin issued to the same user.
+Inputs: user_id (integer or None)
+Outputs: pinned (boolean)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def is_primary_sticky(user_id):
+    token = request.headers.get(PRIMARY_STICKY_HEADER)
+    if not token:
+        return False
+    from itsdangerous import BadData
+    try:
+        pinned_user_id = primary_sticky_serializer().loads(token, max_age=current_app.config['DB_REPLICA_STICKY_SECONDS'])
+    except BadData:
+        return False
+    return user_id is None or pinned_user_id == user_id
+
+"""
+Decorator that routes a read-only endpoint to the replica bind unless the request carries a primary pin. Must be applied inside token_required when the route is authenticated.
+Inputs: f (function)
+Outputs: decorated_function (function)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def read_replica(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_replica = not is_primary_sticky(getattr(request, 'user_id', None))
+        return f(*args, **kwargs)
+    return decorated_function
+
+"""
+Applies the active storage profile's pragmas to every new SQLite connection, whichever Flask app owns the engine. Connections opened outside an app context use the profile named by LEETLE_DB_PROFILE.
+Inputs: dbapi_connection (DB-API connection), connection_record (pool record)
+Outputs: None
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    if has_app_context():
+        profile = current_app.config.get('DB_PROFILE', 'default')
+    else:
+        profile = os.getenv('LEETLE_DB_PROFILE', 'default')
+    pragmas = DB_PROFILES.get(profile, DB_PROFILES['default'])['pragmas']
+    if not pragmas:
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+"""
+Runs a unit of database work and commits it, retrying with exponential backoff and jitter when SQLite reports that the database is locked.
+Inputs: unit_of_work (callable that stages changes on db.session)
+Outputs: The return value of unit_of_work
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+def commit_with_retry(unit_of_work):
+    retries = current_app.config['DB_WRITE_RETRIES']
+    base_delay = current_app.config['DB_WRITE_RETRY_BASE_DELAY']
+    for attempt in range(retries + 1):
+        try:
+            result = unit_of_work()
+            db.session.commit()
+            return result
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt >= retries or 'database is locked' not in str(e):
+                raise
+            time.sleep(base_delay * (2 ** attempt) * (1 + random.random()))
+
+"""
+Column type for JSON documents that the application reads and writes as JSON strings. It is stored as TEXT by default, and as native JSONB on PostgreSQL when DB_NATIVE_JSON is enabled, converting at the boundary so callers keep using json.loads and json.dumps.
+Inputs: JSON string (bind), stored JSON value (result)
+Outputs: Stored JSON value (bind), JSON string (result)
+Contributors: Daniel Neugent, Jay Patel
+"""
+class JSONText(db.TypeDecorator):
+    impl = db.Text
+    cache_ok = True
+
+    def _uses_native_json(self, dialect):
+        return dialect.name == 'postgresql' and current_app.config['DB_NATIVE_JSON']
+
+    def load_dialect_impl(self, dialect):
+        if self._uses_native_json(dialect):
+            # The PostgreSQL dialect is only imported when it is actually in use
+            from sqlalchemy.dialects.postgresql import JSONB
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(db.Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and self._uses_native_json(dialect):
+            return json.loads(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and not isinstance(value, str):
+            return json.dumps(value)
+        return value
+
+"""
+Adds columns and indexes introduced after a database was first created, since db.create_all only creates missing tables. Each entry is applied once and the function is safe to run on every start.
+Inputs: None (uses the current app's engine)
+Outputs: None
+Contributors: Daniel Neugent, Arnav Jain
+"""
+SCHEMA_UPGRADES = [
+    ('user', 'token_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('problem', 'content_hash', 'VARCHAR(64)'),
+    ('problem', 'test_cases_hash', 'VARCHAR(64)'),
+    ('problem', 'version', 'INTEGER NOT NULL DEFAULT 1'),
+    ('problem', 'comparator', 'VARCHAR(64)'),
+    ('achievement', 'content_hash', 'VARCHAR(64)'),
+    ('user_hint_usage', 'day', 'DATE'),
+]
+
+def upgrade_schema():
+    inspector = db.inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    with db.engine.begin() as conn:
+        for table, column, ddl in SCHEMA_UPGRADES:
+            if table not in tables:
+                continue
+            if column not in {c['name'] for c in inspector.get_columns(table)}:
+                conn.execute(db.text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+        for table in db.metadata.sorted_tables:
+            if table.name in tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
@@ -0,0 +1,243 @@
+"""
+This file generates large synthetic datasets for scaling tests and load testing: users with stats, streaks and achievements, millions of submissions, and hint usage, with realistic skew (a few very active users, most nearly idle). The same seed and reference time always produce the same rows. Rows are built in memory and written with batched Core inserts, so a million submissions take seconds rather than the minutes ORM objects would.
+Authors: Jay Patel and Daniel Neugent
+"""
+import json
+import math
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from flask import current_app
+
+from .database import db
+from .models import Achievement, Problem, Submission, User, UserAchievement, UserHintQuota, UserHintUsage, UserStats
+
+LANGUAGES = ('python', 'javascript', 'java')
+# Share of users preferring each language
+LANGUAGE_WEIGHTS = (0.55, 0.3, 0.15)
+# Chance that a submission is in the user's preferred language
+PREFERRED_LANGUAGE_RATE = 0.8
+# Exponent of the Zipf distribution of activity between users
+ACTIVITY_SKEW = 1.1
+# Share of users who ever reveal hints, and of reveals that are full solutions
+HINT_USER_RATE = 0.4
+FULL_HINT_RATE = 0.3
+# Submitted code is not judged, so a few short bodies per language keep rows realistic in size
+CODE_SAMPLES = {
+    'python': ('n = int(input())\nprint(n * 2)\n', 'import sys\nprint(sys.stdin.read()[::-1])\n'),
+    'javascript': ("const s = require('fs').readFileSync(0, 'utf8');\nconsole.log(s.trim());\n",),
+    'java': ('public class Main { public static void main(String[] a) { System.out.println(0); } }\n',),
+}
+
+"""
+Writes rows to a model's table in batches through Core inserts.
+Inputs: model (db.Model class), rows (iterable of column dictionaries), batch_size (integer)
+Outputs: count (integer number of rows written)
+Contributors: Jay Patel, Daniel Neugent
+"""
+def insert_batches(model, rows, batch_size):
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(model.__table__.insert(), batch)
+            db.session.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(model.__table__.insert(), batch)
+        db.session.commit()
+        count += len(batch)
+    return count
+
+"""
+Computes the current and longest runs of consecutive days in a set of dates, the way calculate_user_streak counts them: the current run ends today.
+Inputs: days (set of dates), today (date)
+Outputs: current (integer), longest (integer)
+Contributors: Jay Patel, Daniel Neugent
+"""
+def streaks(days, today):
+    longest = run = 0
+    previous = None
+    for day in sorted(days):
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    current = 0
+    day = today
+    while day in days:
+        current += 1
+        day -= timedelta(days=1)
+    return current, longest
+
+"""
+Adds synthetic problems until the database has at least `count`, so generated submissions have problems to reference.
+Inputs: count (integer), rng (random.Random)
+Outputs: problem_ids (list of integers)
+Contributors: Jay Patel, Daniel Neugent
+"""
+def ensure_problems(count, rng):
+    existing = db.session.query(Problem.id).count()
+    difficulties = ('Easy', 'Medium', 'Hard')
+    insert_batches(Problem, ({
+        'title': f'Synthetic Problem {i + 1}',
+        'description': 'Print the input number doubled.',
+        'difficulty': rng.choice(difficulties),
+        'input_example': '2',
+        'output_example': '4',
+        'test_cases': json.dumps([{'input': str(n), 'output': str(n * 2)} for n in range(3)]),
+        'version': 1,
+        'hint_text': 'Read the number and multiply it by two.',
+        'full_solution': 'print(int(input()) * 2)',
+        'created_at': datetime(2024, 1, 1),
+        'is_active': True,
+    } for i in range(existing, count)), 500)
+    return [row[0] for row in db.session.query(Problem.id).order_by(Problem.id)]
+
+"""
+Generates a synthetic dataset on top of whatever the database already holds. Activity follows a Zipf distribution over users, each user has a preferred language and a skill level that sets how often they are correct, and submissions are spread over the last `days` days. Users' streaks, totals, UserStats rows, achievements (by the same criteria check_and_award_achievements uses) and daily hint quotas are derived from the generated rows, so every endpoint sees consistent data.
+Inputs: users (integer), submissions (integer), problems (minimum problem count), days (integer), seed (integer), now (datetime the data is generated relative to, default now), batch_size (integer rows per insert), password_hash (string stored for every user; the default matches no password)
+Outputs: counts (dictionary of rows written per table)
+Contributors: Jay Patel, Daniel Neugent
+"""
+def generate_dataset(users=1000, submissions=100000, problems=50, days=90, seed=0, now=None, batch_size=10000,
+                     password_hash='!'):
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    today = now.date()
+    counts = {}
+
+    problem_ids = ensure_problems(problems, rng)
+    first_user = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+    counts['users'] = insert_batches(User, ({
+        'email': f'synthetic{first_user + i}-{seed}@leetle.com',
+        'password_hash': password_hash,
+        'role': 'user',
+        'created_at': now - timedelta(days=days + rng.randint(0, 365)),
+        'current_streak': 0, 'longest_streak': 0, 'total_solutions': 0,
+        'token_version': 0,
+    } for i in range(users)), batch_size)
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.id >= first_user).order_by(User.id)]
+
+    # Rank 1 is the most active user; ranks are shuffled so activity does not follow id order
+    ranks = list(range(1, len(user_ids) + 1))
+    rng.shuffle(ranks)
+    activity = [1.0 / rank ** ACTIVITY_SKEW for rank in ranks]
+    skill = [rng.betavariate(2, 2) for _ in user_ids]
+    preferred = rng.choices(LANGUAGES, LANGUAGE_WEIGHTS, k=len(user_ids))
+
+    attempts = Counter()
+    correct = Counter()
+    languages = defaultdict(Counter)
+    attempted = defaultdict(set)
+    solved_days = defaultdict(set)
+
+    def submission_rows():
+        cumulative = list(accumulate(activity))
+        for index in rng.choices(range(len(user_ids)), cum_weights=cumulative, k=submissions):
+            user_id = user_ids[index]
+            language = preferred[index] if rng.random() < PREFERRED_LANGUAGE_RATE else rng.choice(LANGUAGES)
+            problem_id = rng.choice(problem_ids)
+            is_correct = rng.random() < skill[index]
+            # Recent days are busier, as on a growing site
+            submitted_at = now - timedelta(days=days * rng.random() ** 1.5, seconds=rng.randint(0, 3600))
+            attempts[user_id] += 1
+            languages[user_id][language] += 1
+            attempted[user_id].add(problem_id)
+            if is_correct:
+                correct[user_id] += 1
+                solved_days[user_id].add(submitted_at.date())
+            yield {'user_id': user_id, 'problem_id': problem_id, 'language': language,
+                   'code': rng.choice(CODE_SAMPLES[language]), 'exec_time': round(rng.uniform(0.01, 0.5), 4),
+                   'is_correct': is_correct, 'submitted_at': submitted_at}
+
+    counts['submissions'] = insert_batches(Submission, submission_rows(), batch_size)
+
+    # Derived per-user columns, written in one executemany per batch
+    user_updates = []
+    for user_id in user_ids:
+        current, longest = streaks(solved_days[user_id], today)
+        last_day = max(solved_days[user_id]) if solved_days[user_id] else None
+        user_updates.append({'b_id': user_id, 'current_streak': current, 'longest_streak': longest,
+                             'total_solutions': correct[user_id], 'last_submission_date': last_day})
+    update = (User.__table__.update().where(User.__table__.c.id == db.bindparam('b_id'))
+              .values(current_streak=db.bindparam('current_streak'), longest_streak=db.bindparam('longest_streak'),
+                      total_solutions=db.bindparam('total_solutions'),
+                      last_submission_date=db.bindparam('last_submission_date')))
+    for start in range(0, len(user_updates), batch_size):
+        db.session.execute(update, user_updates[start:start + batch_size])
+        db.session.commit()
+
+    counts['user_stats'] = insert_batches(UserStats, ({
+        'user_id': user_id,
+        'total_attempts': attempts[user_id],
+        'total_correct': correct[user_id],
+        'success_rate': correct[user_id] / attempts[user_id] * 100,
+        'favorite_language': languages[user_id].most_common(1)[0][0],
+        'problems_attempted': len(attempted[user_id]),
+        'updated_at': now,
+    } for user_id in user_ids if attempts[user_id]), batch_size)
+
+    counts['user_achievements'] = insert_batches(UserAchievement,
+                                                 achievement_rows(user_ids, user_updates, attempts, correct, now, rng),
+                                                 batch_size)
+    hint_usage, quotas = hint_rows(user_ids, activity, problem_ids, days, now, rng,
+                                   current_app.config['HINT_DAILY_LIMIT'])
+    counts['user_hint_usage'] = insert_batches(UserHintUsage, hint_usage, batch_size)
+    counts['user_hint_quotas'] = insert_batches(UserHintQuota, quotas, batch_size)
+    return counts
+
+"""
+Awards each active achievement to the users whose generated stats meet its criteria, as check_and_award_achievements would have.
+Inputs: user_ids (list), user_updates (list of derived user columns, in user_ids order), attempts, correct (Counters by user id), now (datetime), rng (random.Random)
+Outputs: Iterator of UserAchievement column dictionaries
+Contributors: Jay Patel, Daniel Neugent
+"""
+def achievement_rows(user_ids, user_updates, attempts, correct, now, rng):
+    achievements = [(achievement.id, json.loads(achievement.criteria))
+                    for achievement in Achievement.query.filter_by(is_active=True).all()]
+    for user_id, derived in zip(user_ids, user_updates):
+        if not attempts[user_id]:
+            continue
+        success_rate = correct[user_id] / attempts[user_id] * 100
+        for achievement_id, criteria in achievements:
+            if derived['longest_streak'] < criteria.get('min_streak', 0):
+                continue
+            if correct[user_id] < criteria.get('total_solutions', 0):
+                continue
+            if success_rate < criteria.get('success_rate', 0):
+                continue
+            yield {'user_id': user_id, 'achievement_id': achievement_id,
+                   'earned_at': now - timedelta(days=rng.uniform(0, 60))}
+
+"""
+Generates hint reveals for a share of users, more for more active users, charging daily quotas the way the hints API does: partial costs 1, full costs 2, and reveals past HINT_DAILY_LIMIT or of a problem already hinted that day are dropped.
+Inputs: user_ids (list), activity (list of weights), problem_ids (list), days (integer), now (datetime), rng (random.Random), daily_limit (integer)
+Outputs: usage (list of UserHintUsage rows), quotas (list of UserHintQuota rows)
+Contributors: Jay Patel, Daniel Neugent
+"""
+def hint_rows(user_ids, activity, problem_ids, days, now, rng, daily_limit=3):
+    usage = []
+    used = Counter()
+    revealed = set()
+    top = max(activity) if activity else 1.0
+    for user_id, weight in zip(user_ids, activity):
+        if rng.random() >= HINT_USER_RATE:
+            continue
+        for _ in range(1 + int(math.log1p(20 * weight / top) * 5 * rng.random())):
+            used_at = now - timedelta(days=rng.uniform(0, days))
+            level = 'full' if rng.random() < FULL_HINT_RATE else 'partial'
+            problem_id = rng.choice(problem_ids)
+            key = (user_id, used_at.date())
+            cost = 2 if level == 'full' else 1
+            if used[key] + cost > daily_limit or (user_id, problem_id, used_at.date()) in revealed:
+                continue
+            used[key] += cost
+            revealed.add((user_id, problem_id, used_at.date()))
+            usage.append({'user_id': user_id, 'problem_id': problem_id, 'hint_level': level,
+                          'day': used_at.date(), 'used_at': used_at})
+    quotas = [{'user_id': user_id, 'day': day, 'used': charged} for (user_id, day), charged in used.items()]
+    return usage, quotas
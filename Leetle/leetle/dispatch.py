@@ -0,0 +1,254 @@
+"""
+This file is the web tier's side of remote judging. With JUDGE_MODE=remote, each web process listens on JUDGE_DISPATCH_ADDRESS, judge workers (python -m leetle.worker) connect, prove they hold the shared judge key (see protocol.py) and register their capacity, and submissions are sent to the least-loaded live worker. Workers that stop sending heartbeats or drop their connection are removed, and their jobs are dispatched again to another worker. A job that outlives JUDGE_JOB_TIMEOUT fails on its own without affecting the worker's other jobs.
+Authors: Jay Patel and Tej Gumaste
+"""
+import atexit
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+
+from flask import current_app
+
+from .protocol import (HANDSHAKE_TIMEOUT, encode_cases, encode_message, judge_secret, listen, make_nonce, parse_address,
+                       read_message, sign_nonce, verify_nonce)
+
+# A child of the application's 'leetle' logger, usable from the dispatcher's threads without an app context
+logger = logging.getLogger(__name__)
+
+"""
+Raised when no judge worker can take a job, or a job failed on every attempt.
+Inputs: message (string)
+Outputs: JudgeUnavailable exception
+Contributors: Jay Patel, Tej Gumaste
+"""
+class JudgeUnavailable(Exception):
+    pass
+
+"""
+A registered judge worker connection and the jobs it is running for this dispatcher.
+Inputs: sock (connected socket), worker_id (string), capacity (integer)
+Outputs: WorkerConnection instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class WorkerConnection:
+    def __init__(self, sock, worker_id, capacity):
+        self.sock = sock
+        self.worker_id = worker_id
+        self.capacity = max(1, capacity)
+        self.jobs = {}
+        # Jobs the worker reports running, including those from other web processes
+        self.reported_active = 0
+        self.last_seen = time.monotonic()
+        self.send_lock = threading.Lock()
+
+    # Fraction of the worker's capacity in use, as far as this dispatcher knows.
+    def load(self):
+        return max(self.reported_active, len(self.jobs)) / self.capacity
+
+    def send(self, message):
+        with self.send_lock:
+            self.sock.sendall(encode_message(message))
+
+"""
+One judging request. The done event is set when a result arrives or when its worker is lost, in which case result stays None and the job is sent again.
+Inputs: job_id (string), message (dictionary sent to the worker)
+Outputs: Job instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class Job:
+    def __init__(self, job_id, message):
+        self.job_id = job_id
+        self.message = message
+        self.done = threading.Event()
+        self.result = None
+
+"""
+Accepts authenticated judge workers, tracks their heartbeats and load, and runs jobs on them.
+Inputs: address (string; a port range binds its first free port), secret (bytes shared with the workers), heartbeat_timeout (seconds without a message before a worker is dropped), worker_wait (seconds to wait for a worker to register), job_timeout (seconds), max_attempts (integer)
+Outputs: Dispatcher instance (call start() to begin accepting workers; address is then the one actually bound)
+Contributors: Jay Patel, Tej Gumaste
+"""
+class Dispatcher:
+    def __init__(self, address, secret, heartbeat_timeout=6.0, worker_wait=5.0, job_timeout=120.0, max_attempts=2):
+        self.address = address
+        self.secret = secret
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_wait = worker_wait
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.workers = []
+        self.condition = threading.Condition()
+        self.job_ids = itertools.count(1)
+        self.listener = None
+        self.stopped = False
+
+    # Starts listening and the accept and heartbeat threads.
+    def start(self):
+        self.listener, self.address = listen(self.address)
+        threading.Thread(target=self.accept_loop, name='leetle-dispatch-accept', daemon=True).start()
+        threading.Thread(target=self.monitor_loop, name='leetle-dispatch-monitor', daemon=True).start()
+        return self
+
+    # Stops accepting workers, drops the registered ones and removes a Unix socket file.
+    def stop(self):
+        self.stopped = True
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        with self.condition:
+            workers = list(self.workers)
+        for worker in workers:
+            self.drop_worker(worker)
+        family, sockaddr = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(sockaddr):
+            os.unlink(sockaddr)
+
+    def accept_loop(self):
+        while not self.stopped:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.worker_loop, args=(sock,), name='leetle-dispatch-worker', daemon=True).start()
+
+    # Authenticates a worker and reads its registration, then its heartbeats and results until the connection ends.
+    def worker_loop(self, sock):
+        stream = sock.makefile('rb')
+        worker = None
+        try:
+            sock.settimeout(HANDSHAKE_TIMEOUT)
+            nonce = make_nonce()
+            sock.sendall(encode_message({'type': 'challenge', 'nonce': nonce}))
+            message = read_message(stream)
+            if not message or message.get('type') != 'register':
+                return
+            if not verify_nonce(self.secret, 'worker', nonce, message.get('auth')):
+                logger.warning('Rejected a judge worker that failed authentication')
+                return
+            sock.sendall(encode_message({'type': 'welcome',
+                                         'auth': sign_nonce(self.secret, 'dispatcher', str(message.get('nonce')))}))
+            sock.settimeout(None)
+            worker = WorkerConnection(sock, message.get('worker_id', 'unknown'), int(message.get('capacity', 1)))
+            with self.condition:
+                self.workers.append(worker)
+                self.condition.notify_all()
+
+            while True:
+                message = read_message(stream)
+                if message is None:
+                    break
+                worker.last_seen = time.monotonic()
+                if message.get('type') == 'heartbeat':
+                    worker.reported_active = int(message.get('active', 0))
+                elif message.get('type') == 'result':
+                    with self.condition:
+                        job = worker.jobs.pop(message.get('job_id'), None)
+                    if job is not None:
+                        job.result = (bool(message['is_valid']), float(message['execution_time']))
+                        job.done.set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+            if worker is not None:
+                self.drop_worker(worker)
+            else:
+                sock.close()
+
+    # Drops workers whose heartbeats have stopped, e.g. a hung or partitioned process whose socket is still open.
+    def monitor_loop(self):
+        while not self.stopped:
+            time.sleep(self.heartbeat_timeout / 3)
+            cutoff = time.monotonic() - self.heartbeat_timeout
+            with self.condition:
+                silent = [worker for worker in self.workers if worker.last_seen < cutoff]
+            for worker in silent:
+                logger.warning('Judge worker %s missed its heartbeats; dropping it', worker.worker_id)
+                self.drop_worker(worker)
+
+    # Removes a worker and wakes the requests waiting on its jobs so they can be sent elsewhere.
+    def drop_worker(self, worker):
+        with self.condition:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            jobs = list(worker.jobs.values())
+            worker.jobs.clear()
+        try:
+            worker.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        worker.sock.close()
+        for job in jobs:
+            job.done.set()
+
+    # Assigns a job to the least-loaded worker, waiting up to worker_wait for one to register.
+    def assign(self, job):
+        deadline = time.monotonic() + self.worker_wait
+        with self.condition:
+            while not self.workers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise JudgeUnavailable('No judge workers are connected')
+                self.condition.wait(remaining)
+            worker = min(self.workers, key=lambda w: w.load())
+            worker.jobs[job.job_id] = job
+        try:
+            worker.send(job.message)
+        except OSError:
+            self.drop_worker(worker)
+        return worker
+
+    # Judges prepared test cases on a worker, sending the job again if its worker is lost. A job that times out fails alone: its worker keeps its other jobs, which are still live, and a late result is ignored.
+    def run(self, language, code, cases, comparator=None):
+        job = Job(f'{os.getpid()}-{next(self.job_ids)}', None)
+        job.message = {'type': 'job', 'job_id': job.job_id, 'language': language, 'code': code,
+                       'cases': encode_cases(cases), 'comparator': comparator}
+        for _ in range(self.max_attempts):
+            job.done.clear()
+            worker = self.assign(job)
+            if not job.done.wait(self.job_timeout):
+                with self.condition:
+                    worker.jobs.pop(job.job_id, None)
+                if job.result is None:
+                    raise JudgeUnavailable(f'Judging timed out after {self.job_timeout:g} seconds')
+            if job.result is not None:
+                return job.result
+        raise JudgeUnavailable('Judging failed on every attempt')
+
+    # Returns the registered workers and their load, for monitoring.
+    def snapshot(self):
+        with self.condition:
+            return [{'worker_id': w.worker_id, 'capacity': w.capacity, 'active': w.reported_active,
+                     'jobs': len(w.jobs), 'last_seen_seconds': round(time.monotonic() - w.last_seen, 3)}
+                    for w in self.workers]
+
+# The running dispatcher of this process; a dispatcher inherited across fork has no threads and is replaced
+dispatcher = None
+dispatcher_pid = None
+dispatcher_lock = threading.Lock()
+
+"""
+Returns this process's dispatcher, starting it on first use. '{pid}' in JUDGE_DISPATCH_ADDRESS is replaced with the process id, so every web process gets its own socket; with a TCP port range each process takes its own port.
+Inputs: None (uses current_app.config)
+Outputs: Dispatcher instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+def get_dispatcher():
+    global dispatcher, dispatcher_pid
+    with dispatcher_lock:
+        if dispatcher is None or dispatcher_pid != os.getpid():
+            config = current_app.config
+            dispatcher = Dispatcher(
+                config['JUDGE_DISPATCH_ADDRESS'].format(pid=os.getpid()),
+                judge_secret(config),
+                heartbeat_timeout=config['JUDGE_HEARTBEAT_TIMEOUT'],
+                worker_wait=config['JUDGE_WORKER_WAIT'],
+                job_timeout=config['JUDGE_JOB_TIMEOUT'],
+            ).start()
+            dispatcher_pid = os.getpid()
+            atexit.register(dispatcher.stop)
+        return dispatcher
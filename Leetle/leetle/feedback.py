@@ -0,0 +1,47 @@
+"""
+This file accepts platform feedback ratings and comments.
+Authors: Arnav Jain and Brett Balquist
+"""
+from flask import Blueprint, jsonify, request
+
+from .database import db
+from .models import FeedbackSubmission
+
+bp = Blueprint('feedback', __name__)
+
+"""
+Accepts and stores user feedback ratings and comments about the platform.
+Inputs: JSON payload (rating, feedback_text)
+Outputs: JSON response (success message)
+Contributors: Arnav Jain, Brett Balquist
+"""
+@bp.route('/api/feedback/submit', methods=['POST'])
+def submit_feedback():
+    """Submit user feedback (anonymous OK)"""
+    data = request.get_json()
+
+    if not data or not data.get('rating') or not data.get('feedback_text'):
+        return jsonify({'error': 'Rating and feedback text are required'}), 400
+
+    rating = data['rating']
+    feedback_text = data['feedback_text']
+
+    if not isinstance(rating, int) or rating < 1 or rating > 5:
+        return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+
+    # Get user_id from token if authenticated, otherwise None
+    user_id = getattr(request, 'user_id', None)
+
+    feedback = FeedbackSubmission(
+        user_id=user_id,
+        rating=rating,
+        feedback_text=feedback_text
+    )
+
+    try:
+        db.session.add(feedback)
+        db.session.commit()
+        return jsonify({'message': 'Feedback submitted successfully'}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to submit feedback'}), 500
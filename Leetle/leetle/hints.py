@@ -0,0 +1,175 @@
+"""
+This file serves problem hints and enforces each user's daily hint quota.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request
+
+from .auth import token_required
+from .database import db
+from .models import Problem, UserHintQuota, UserHintUsage
+
+bp = Blueprint('hints', __name__)
+
+"""
+Returns the insert construct of the current database's dialect, which supports ON CONFLICT clauses.
+Inputs: None
+Outputs: insert function (sqlalchemy.dialects.postgresql.insert or sqlalchemy.dialects.sqlite.insert)
+Contributors: Brett Balquist, Arnav Jain
+"""
+def dialect_insert():
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+"""
+Atomically charges hint usage against the user's daily quota. The insert-or-increment only applies while the new total stays within the limit, so checking and charging are one statement.
+Inputs: user_id (integer), cost (integer)
+Outputs: The user's new daily usage (integer), or None if the charge would exceed the limit
+Contributors: Brett Balquist, Arnav Jain
+"""
+def charge_hint_quota(user_id, cost):
+    limit = current_app.config['HINT_DAILY_LIMIT']
+    if cost > limit:
+        return None
+    stmt = dialect_insert()(UserHintQuota).values(user_id=user_id, day=datetime.now().date(), used=cost)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'day'],
+        set_={'used': UserHintQuota.used + cost},
+        where=UserHintQuota.used + cost <= limit
+    ).returning(UserHintQuota.used)
+    return db.session.execute(stmt).scalar()
+
+"""
+Records today's reveal of a hint level for a problem and returns what it costs: partial costs 1, full costs 2, and upgrading a revealed partial to full costs 1. The row is claimed with an insert that skips on the (user, problem, day) unique key, or with an update that only applies to a partial row, so of two concurrent reveals only one is recorded and charged. The caller charges the quota and rolls back when that fails.
+Inputs: user_id (integer), problem_id (integer), hint_level (string)
+Outputs: cost (integer), or None if that level was already revealed today
+Contributors: Brett Balquist, Arnav Jain
+"""
+def claim_hint_reveal(user_id, problem_id, hint_level):
+    day = datetime.now().date()
+    stmt = dialect_insert()(UserHintUsage).values(user_id=user_id, problem_id=problem_id, day=day,
+                                                  hint_level=hint_level, used_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_nothing(index_elements=['user_id', 'problem_id', 'day']).returning(UserHintUsage.id)
+    if db.session.execute(stmt).scalar() is not None:
+        return 2 if hint_level == 'full' else 1
+    if hint_level != 'full':
+        return None
+    upgraded = db.session.execute(
+        db.update(UserHintUsage)
+        .where(UserHintUsage.user_id == user_id, UserHintUsage.problem_id == problem_id,
+               UserHintUsage.day == day, UserHintUsage.hint_level == 'partial')
+        .values(hint_level='full')
+        .execution_options(synchronize_session=False))
+    return 1 if upgraded.rowcount else None
+
+"""
+Returns how many hint charges the user has spent today.
+Inputs: user_id (integer)
+Outputs: used (integer)
+Contributors: Brett Balquist, Arnav Jain
+"""
+def get_hint_usage_today(user_id):
+    used = db.session.query(UserHintQuota.used).filter_by(user_id=user_id, day=datetime.now().date()).scalar()
+    return used or 0
+
+"""
+Checks the availability of hints for a specific problem and the user's daily hint usage.
+Inputs: problem_id (integer), User ID (from token)
+Outputs: JSON response (hint availability, usage counts)
+Contributors: Daniel Neugent, Brett Balquist
+"""
+@bp.route('/api/hints/<int:problem_id>')
+@token_required
+def get_hints(problem_id):
+    """Get hints for a problem with daily usage limits"""
+    user_id = request.user_id
+    problem = Problem.query.get(problem_id)
+    if not problem:
+        return jsonify({'error': 'Problem not found'}), 404
+
+    # Check daily hint usage (max 3 charges per day total)
+    limit = current_app.config['HINT_DAILY_LIMIT']
+    today_hint_usage = get_hint_usage_today(user_id)
+
+    if today_hint_usage >= limit:
+        return jsonify({'error': f'Daily hint limit reached ({limit} hints per day)'}), 429
+
+    # Get existing hint usage for this problem today
+    problem_hint_usage = UserHintUsage.query.filter_by(user_id=user_id, problem_id=problem_id,
+                                                       day=datetime.now().date()).first()
+
+    hints = {}
+    if problem.hint_text:
+        hints['partial'] = problem.hint_text
+    if problem.full_solution:
+        hints['full'] = problem.full_solution
+
+    response = {
+        'hints_available': bool(hints),
+        'daily_usage': today_hint_usage,
+        'max_daily_usage': limit,
+        'problem_hinted_today': problem_hint_usage is not None
+    }
+
+    if hints:
+        if problem_hint_usage and problem_hint_usage.hint_level == 'partial':
+            response['hints'] = hints  # Already used partial, show all
+        elif not problem_hint_usage:
+            response['hints'] = {'partial': hints.get('partial', 'No hint available')}
+        else:
+            response['hints'] = hints
+
+    return jsonify(response), 200
+
+"""
+Reveals a specific hint level (partial or full) for a problem, charging the user's daily quota: partial costs 1, full costs 2, and upgrading a revealed partial to full costs 1.
+Inputs: problem_id (integer), hint_level (string), User ID (from token)
+Outputs: JSON response (hint text, cost info) or error
+Contributors: Daniel Neugent, Tej Gumaste, Jay Patel
+"""
+@bp.route('/api/hints/<int:problem_id>/<hint_level>', methods=['POST'])
+@token_required
+def reveal_hint(problem_id, hint_level):
+    """Reveal a specific hint level for a problem"""
+    if hint_level not in ['partial', 'full']:
+        return jsonify({'error': 'Invalid hint level'}), 400
+
+    user_id = request.user_id
+    problem = Problem.query.get(problem_id)
+    if not problem:
+        return jsonify({'error': 'Problem not found'}), 404
+
+    # Claiming today's row for this problem and charging the quota commit together or not at all
+    cost = claim_hint_reveal(user_id, problem_id, hint_level)
+    if cost is None:
+        db.session.rollback()
+        if hint_level == 'full':
+            return jsonify({'error': 'Full solution already revealed'}), 400
+        return jsonify({'error': 'Hint already revealed'}), 400
+
+    if hint_level == 'full':
+        hint = problem.full_solution or 'No full solution available'
+        if cost == 1:
+            # Already paid partial cost (1 usage), reveal full for 1 more
+            limit_error = 'Cannot reveal full solution - daily hint limit reached'
+        else:
+            limit_error = 'Not enough hint usage remaining for full solution'
+    else:
+        hint = problem.hint_text or 'No hint available'
+        limit_error = f"Daily hint limit reached ({current_app.config['HINT_DAILY_LIMIT']} hints per day)"
+
+    daily_usage = charge_hint_quota(user_id, cost)
+    if daily_usage is None:
+        db.session.rollback()
+        return jsonify({'error': limit_error}), 429
+    db.session.commit()
+
+    return jsonify({
+        'hint': hint,
+        'daily_usage': daily_usage,
+        'cost': cost
+    }), 200
@@ -0,0 +1,320 @@
+"""
+This file executes submitted code and checks it against a problem's test cases. It is imported on the first submission rather than at startup, so web workers that never judge code do not pay for it.
+Authors: Daniel Neugent, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+
+from flask import current_app
+
+from .comparators import create_comparator
+from .runners import RunnerError, RunnerUnsupported, get_runner_pool
+from .sandbox import get_sandbox
+from .testcases import get_prepared_test_cases
+
+"""
+Kills a child started by stream_process together with anything it spawned, since all of them share its process group.
+Inputs: proc (subprocess.Popen)
+Outputs: None
+Contributors: Tej Gumaste, Jay Patel
+"""
+def kill_process_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+"""
+Runs a command with the given stdin and collects its output, feeding stdout to a comparator as it arrives. Reading happens while the child runs, so the child is killed the moment the comparator reports a mismatch or stdout grows past output_limit, instead of running to completion or the timeout. The child leads its own process group so that killing it also stops any processes it started, which would otherwise hold the pipes open.
+Inputs: args (list of strings), input_data (bytes), timeout (seconds), comparator (optional comparator instance), output_limit (optional maximum stdout bytes), cwd (optional working directory)
+Outputs: stdout (bytes), stderr (bytes), stopped (None, 'mismatch' or 'output_limit'); raises subprocess.TimeoutExpired
+Contributors: Tej Gumaste, Jay Patel
+"""
+def stream_process(args, input_data, timeout, comparator=None, output_limit=None, cwd=None):
+    deadline = time.monotonic() + timeout
+    proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            cwd=cwd, start_new_session=True)
+    stdout, stderr = [], []
+    stdout_bytes = 0
+    stopped = None
+    try:
+        with selectors.DefaultSelector() as selector:
+            if input_data:
+                selector.register(proc.stdin, selectors.EVENT_WRITE)
+            else:
+                proc.stdin.close()
+            selector.register(proc.stdout, selectors.EVENT_READ)
+            selector.register(proc.stderr, selectors.EVENT_READ)
+            view = memoryview(input_data)
+            written = 0
+
+            while selector.get_map() and stopped is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(args, timeout)
+                for key, _ in selector.select(remaining):
+                    pipe = key.fileobj
+                    if pipe is proc.stdin:
+                        try:
+                            written += os.write(pipe.fileno(), view[written:written + 65536])
+                        except BrokenPipeError:
+                            written = len(view)
+                        if written >= len(view):
+                            selector.unregister(pipe)
+                            pipe.close()
+                        continue
+                    chunk = os.read(pipe.fileno(), 65536)
+                    if not chunk:
+                        selector.unregister(pipe)
+                        continue
+                    if pipe is proc.stderr:
+                        stderr.append(chunk)
+                        continue
+                    stdout.append(chunk)
+                    stdout_bytes += len(chunk)
+                    if output_limit is not None and stdout_bytes > output_limit:
+                        stopped = 'output_limit'
+                        break
+                    if comparator is not None and not comparator.feed(chunk):
+                        stopped = 'mismatch'
+                        break
+
+        if stopped is not None:
+            kill_process_group(proc)
+        proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    finally:
+        # Also reaps anything the program left running in the background
+        kill_process_group(proc)
+        if proc.poll() is None:
+            proc.wait()
+        for pipe in (proc.stdin, proc.stdout, proc.stderr):
+            pipe.close()
+
+    return b''.join(stdout), b''.join(stderr), stopped
+
+# Source file name per language; Java requires the public class Main to live in Main.java
+SOURCE_FILES = {'python': 'main.py', 'javascript': 'main.js', 'java': 'Main.java'}
+
+"""
+Returns the directory that holds submission workspaces: JUDGE_SCRATCH_DIR when set, otherwise the RAM-backed /dev/shm when it is writable, otherwise the system temp directory.
+Inputs: None (uses current_app.config)
+Outputs: path (string)
+Contributors: Tej Gumaste, Jay Patel
+"""
+def get_scratch_root():
+    root = current_app.config.get('JUDGE_SCRATCH_DIR')
+    if root:
+        os.makedirs(root, exist_ok=True)
+        return root
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+"""
+A submission built in its workspace, ready to be run once per test case.
+Inputs: workspace (directory path)
+Outputs: BuiltProgram instance (command is None and error is set when the code could not be built; runner is set while test cases run on a warm runner)
+Contributors: Tej Gumaste, Jay Patel
+"""
+class BuiltProgram:
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.source = None
+        self.command = None
+        self.runner_pool = None
+        self.runner = None
+        self.runner_source = None
+        self.error = None
+        self.build_time = 0.0
+
+    # Takes a warm runner from the pool for the following test cases and copies the workspace into the runner's own, the only one it can see. Without a runner, they run cold.
+    def take_runner(self):
+        try:
+            self.runner = self.runner_pool.checkout()
+        except (RunnerError, OSError) as e:
+            current_app.logger.warning('Warm runner did not start, running cold: %s', e)
+            self.runner_pool = None
+            return
+        self.runner_source = self.source
+        if self.runner.workspace is not None:
+            shutil.copytree(self.workspace, self.runner.workspace, dirs_exist_ok=True)
+            self.runner_source = os.path.join(self.runner.workspace, os.path.basename(self.source))
+
+    # Stops the program's runner; runners are never shared with another submission.
+    def release_runner(self):
+        if self.runner is not None:
+            self.runner.close()
+            self.runner = None
+
+    # Runs the program once against one input (see run_program), on a warm runner when there is one. A runner that recycled itself or died is replaced, and a program the runner cannot emulate runs cold from then on.
+    def run(self, input_data, comparator=None, output_limit=None):
+        if self.runner is not None and self.runner.closed:
+            self.runner = None
+            if self.runner_pool is not None:
+                self.take_runner()
+        if self.runner is not None:
+            try:
+                return run_program(self.command, input_data, comparator, output_limit, cwd=self.workspace,
+                                   runner=self.runner, source=self.runner_source)
+            except RunnerUnsupported:
+                self.release_runner()
+                self.runner_pool = None
+        return run_program(self.command, input_data, comparator, output_limit, cwd=self.workspace)
+
+"""
+Context manager that sets up one submission's workspace: a private scratch directory holding the source file and, for Java, the compiled classes. The code is written and compiled once per submission rather than once per test case, runs use the directory as their working directory, and the whole tree is removed on exit. When the language is listed in JUDGE_WARM_RUNNERS, the submission also takes a warm runner from the language's pool (see runners/).
+Inputs: language (string), code (string)
+Outputs: Yields a BuiltProgram
+Contributors: Tej Gumaste, Arnav Jain, Jay Patel
+"""
+@contextmanager
+def build_program(language, code):
+    if language not in SOURCE_FILES:
+        raise ValueError("Unsupported language")
+    program = BuiltProgram(tempfile.mkdtemp(prefix='leetle-', dir=get_scratch_root()))
+    with ExitStack() as stack:
+        # Runs last, after any runner using the workspace has stopped
+        stack.callback(shutil.rmtree, program.workspace, ignore_errors=True)
+        source = program.source = os.path.join(program.workspace, SOURCE_FILES[language])
+        with open(source, 'w') as f:
+            f.write(code)
+
+        if language == 'python':
+            program.command = ['python3', source]
+        elif language == 'javascript':
+            program.command = ['node', source]
+        else:
+            # Compile inside the sandbox too, since javac runs annotation processors and reads user input
+            start_time = time.time()
+            try:
+                javac = ['javac', '-d', program.workspace, source]
+                with get_sandbox().launch(javac, workspace=program.workspace) as run:
+                    compile_result = subprocess.run(run.args, cwd=program.workspace, capture_output=True, text=True,
+                                                    timeout=30)
+                if compile_result.returncode == 0:
+                    program.command = ['java', '-cp', program.workspace, 'Main']
+                else:
+                    program.error = f"Compilation Error: {compile_result.stderr.strip()}"
+            except subprocess.TimeoutExpired:
+                program.error = "Error: Compilation timed out (30 seconds)"
+            except FileNotFoundError:
+                program.error = "Error: Java compiler not found. Please install it."
+            program.build_time = time.time() - start_time
+
+        if program.command is not None and language in current_app.config['JUDGE_WARM_RUNNERS']:
+            program.runner_pool = get_runner_pool(language)
+            if program.runner_pool is not None:
+                start_time = time.time()
+                program.take_runner()
+                stack.callback(program.release_runner)
+                program.build_time += time.time() - start_time
+        yield program
+
+"""
+Runs a built program once in the configured sandbox (see sandbox.py), or on its warm runner when one is given. When a comparator is given, stdout is checked as it streams and a wrong answer is stopped early.
+Inputs: command (list of strings), input_data (bytes or string), comparator (optional comparator instance), output_limit (optional maximum stdout bytes), cwd (optional working directory), runner (optional runners.RunnerProcess), source (program source path for the runner)
+Outputs: output (string), execution_time (float), completed (boolean, True when the program ran to the end without errors or stderr output)
+Contributors: Tej Gumaste, Arnav Jain, Jay Patel
+"""
+def run_program(command, input_data, comparator=None, output_limit=None, cwd=None, runner=None, source=None):
+    execution_time = 0.0
+    output = ""
+    completed = False
+    # Prepared test cases arrive as bytes; encode anything else once here
+    if isinstance(input_data, str):
+        input_data = input_data.encode('utf-8')
+
+    try:
+        start_time = time.time()
+        if runner is not None:
+            stdout, stderr, stopped = runner.run(source, input_data, 30, comparator, output_limit)
+            oom_killed = runner.oom_killed()
+        else:
+            with get_sandbox().launch(command, workspace=cwd) as run:
+                stdout, stderr, stopped = stream_process(run.args, input_data, 30, comparator, output_limit, cwd)
+            oom_killed = run.oom_killed
+        if oom_killed:
+            output = "Error: Memory limit exceeded"
+        elif stopped == 'output_limit':
+            output = "Error: Output limit exceeded"
+        else:
+            output = stdout.decode('utf-8', errors='replace').strip()
+            if stderr:
+                output += f"\nSTDERR: {stderr.decode('utf-8', errors='replace').strip()}"
+            completed = not stderr and stopped is None
+        execution_time = time.time() - start_time
+
+    except RunnerUnsupported:
+        raise
+    except subprocess.TimeoutExpired:
+        output = "Error: Code execution timed out (30 seconds)"
+        execution_time = 30.0
+    except FileNotFoundError:
+        output = f"Error: {os.path.basename(command[0]).capitalize()} interpreter not found. Please install it."
+        execution_time = 30.0
+    except Exception as e:
+        output = f"Error: {str(e)}"
+        execution_time = 30.0
+
+    return output, execution_time, completed
+
+"""
+Builds and runs user-submitted code once against a single input, for callers that judge one case at a time.
+Inputs: language (string), code (string), input_data (bytes or string), comparator (optional comparator instance), output_limit (optional maximum stdout bytes)
+Outputs: output (string), execution_time (float), completed (boolean)
+Contributors: Tej Gumaste, Arnav Jain, Jay Patel
+"""
+def run_code_in_docker(language, code, input_data, comparator=None, output_limit=None):
+    with build_program(language, code) as program:
+        if program.command is None:
+            return program.error, program.build_time, False
+        output, execution_time, completed = program.run(input_data, comparator, output_limit)
+        return output, program.build_time + execution_time, completed
+
+"""
+Runs code against prepared test cases in this process, building it once, comparing with the given comparator and stopping at the first failing case. Judge workers call this for the jobs they receive.
+Inputs: language (string), code (string), cases (sequence of (input bytes, expected output string) pairs), comparator_spec (string or None)
+Outputs: is_valid (boolean), total_execution_time (float)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def judge_cases(language, code, cases, comparator_spec=None):
+    # Inputs are pre-encoded and expected outputs pre-stripped
+    total_time = 0.0
+    limit_factor = current_app.config['JUDGE_OUTPUT_LIMIT_FACTOR']
+    limit_slack = current_app.config['JUDGE_OUTPUT_SLACK_BYTES']
+
+    with build_program(language, code) as program:
+        total_time += program.build_time
+        if program.command is None:
+            return False, total_time
+
+        for input_data, expected_output in cases:
+            comparator = create_comparator(comparator_spec, expected_output)
+            # Generous enough for whitespace and number formatting, small enough that runaway output is cut off
+            output_limit = len(expected_output) * limit_factor + limit_slack
+            output, time_taken, completed = program.run(input_data, comparator, output_limit)
+            total_time += time_taken
+
+            if not completed or not comparator.finish():
+                return False, total_time
+
+    return True, total_time
+
+"""
+Runs the user's submitted code against all defined test cases for a specific problem to verify correctness. With JUDGE_MODE=remote the work is sent to a judge worker (see dispatch.py); otherwise it runs in this process.
+Inputs: problem (Problem object), language (string), code (string)
+Outputs: is_valid (boolean), total_execution_time (float); raises dispatch.JudgeUnavailable when no worker can judge it
+Contributors: Daniel Neugent, Jay Patel
+"""
+def validate_submission(problem, language, code):
+    cases = get_prepared_test_cases(problem)
+    if current_app.config['JUDGE_MODE'] == 'remote':
+        from .dispatch import get_dispatcher
+        return get_dispatcher().run(language, code, cases, problem.comparator)
+    return judge_cases(language, code, cases, problem.comparator)
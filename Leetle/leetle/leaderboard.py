@@ -0,0 +1,176 @@
+"""
+This file serves the leaderboard, per-user statistics, and the achievement catalogue.
+Authors: Brett Balquist, Tej Gumaste, Jay Patel, Arnav Jain, and Daniel Neugent
+"""
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request
+
+from .auth import token_required
+from .database import db, read_replica
+from .models import Achievement, Submission, User, UserAchievement, UserStats
+
+bp = Blueprint('leaderboard', __name__)
+
+"""
+Retrieves a ranked list of users based on streaks and success rates, filtered by time period.
+Inputs: Query parameters (period, limit)
+Outputs: JSON response (leaderboard list, current user rank)
+Contributors: Brett Balquist, Tej Gumaste, Daniel Neugent
+"""
+@bp.route('/api/leaderboard')
+@token_required
+@read_replica
+def get_leaderboard():
+    """Get leaderboard data with rankings by streaks and accuracy"""
+    period = request.args.get('period', 'all-time')  # daily, weekly, all-time
+    limit = request.args.get('limit', 50, type=int)
+
+    # Calculate ranking score: streak + (success_rate / 10), ranked and cut in the database
+    score = User.current_streak + UserStats.success_rate / 10.0
+    query = db.session.query(User, UserStats).join(UserStats)
+
+    # Apply time filters
+    if period == 'daily':
+        # Users with submissions today
+        today = datetime.now().date()
+        query = query.filter(db.exists().where(Submission.user_id == User.id, Submission.submitted_at >= today))
+    elif period == 'weekly':
+        # Users with submissions in last 7 days
+        week_ago = datetime.now() - timedelta(days=7)
+        query = query.filter(db.exists().where(Submission.user_id == User.id, Submission.submitted_at >= week_ago))
+
+    leaderboard = []
+    for user, stats in query.order_by(score.desc(), User.id).limit(limit):
+        leaderboard.append({
+            'id': user.id,
+            'email': user.email,
+            'current_streak': user.current_streak,
+            'longest_streak': user.longest_streak,
+            'total_solutions': user.total_solutions,
+            'success_rate': round(stats.success_rate, 1),
+            'score': round(user.current_streak + (stats.success_rate / 10.0), 2)
+        })
+
+    # Add ranking positions
+    for i, entry in enumerate(leaderboard, 1):
+        entry['rank'] = i
+
+    # Highlight current user position
+    current_user_id = request.user_id
+    current_user_rank = None
+    for entry in leaderboard:
+        if entry['id'] == current_user_id:
+            current_user_rank = entry['rank']
+            break
+
+    return jsonify({
+        'leaderboard': leaderboard,
+        'current_user_rank': current_user_rank,
+        'period': period
+    }), 200
+
+"""
+Fetches detailed statistics, achievements, and language usage data for a specific user.
+Inputs: user_id (integer)
+Outputs: JSON response (stats, achievements, language breakdown)
+Contributors: Jay Patel, Arnav Jain
+"""
+@bp.route('/api/user/stats/<int:user_id>')
+@token_required
+@read_replica
+def get_user_stats(user_id):
+    """Get detailed statistics for a user"""
+    user = db.session.get(User, user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    stats = UserStats.query.filter_by(user_id=user_id).first()
+
+    # If no stats record exists yet (new user), use default values
+    if not stats:
+        default_stats = {
+            'total_attempts': 0,
+            'total_correct': 0,
+            'success_rate': 0.0,
+            'favorite_language': 'python',
+            'problems_attempted': 0
+        }
+    else:
+        default_stats = {
+            'total_attempts': stats.total_attempts,
+            'total_correct': stats.total_correct,
+            'success_rate': round(stats.success_rate, 1),
+            'favorite_language': stats.favorite_language,
+            'problems_attempted': stats.problems_attempted
+        }
+
+    # Get user achievements, joined in one query
+    achievements = []
+    user_achievements = db.session.query(UserAchievement.earned_at, Achievement)\
+                                  .join(Achievement).filter(UserAchievement.user_id == user_id).all()
+    for earned_at, achievement in user_achievements:
+        achievements.append({
+            'id': achievement.id,
+            'name': achievement.name,
+            'description': achievement.description,
+            'icon': achievement.icon,
+            'earned_at': earned_at.isoformat()
+        })
+
+    # Language usage statistics, counted by the database
+    language_stats = {}
+    language_rows = db.session.query(
+        Submission.language,
+        db.func.count(Submission.id),
+        db.func.sum(db.case((Submission.is_correct == True, 1), else_=0))
+    ).filter(Submission.user_id == user_id).group_by(Submission.language).all()
+    for lang, attempts, correct in language_rows:
+        language_stats[lang] = {'attempts': attempts, 'correct': int(correct or 0)}
+
+    return jsonify({
+        'user': {
+            'id': user.id,
+            'email': user.email,
+            'created_at': user.created_at.isoformat()
+        },
+        'stats': {
+            'current_streak': user.current_streak,
+            'longest_streak': user.longest_streak,
+            'total_solutions': user.total_solutions,
+            'total_attempts': default_stats['total_attempts'],
+            'success_rate': default_stats['success_rate'],
+            'favorite_language': default_stats['favorite_language'],
+            'problems_attempted': default_stats['problems_attempted']
+        },
+        'achievements': achievements,
+        'language_stats': language_stats
+    }), 200
+
+"""
+Returns a list of all available achievements and indicates which ones the current user has earned.
+Inputs: User ID (from token)
+Outputs: JSON response (list of achievements)
+Contributors: Tej Gumaste, Jay Patel
+"""
+@bp.route('/api/achievements')
+@token_required
+@read_replica
+def get_achievements():
+    """Get all available achievements and user progress"""
+    achievements = Achievement.query.filter_by(is_active=True).all()
+    user_achievements = UserAchievement.query.filter_by(user_id=request.user_id).all()
+    earned_ids = [ua.achievement_id for ua in user_achievements]
+
+    achievements_data = []
+    for achievement in achievements:
+        achievements_data.append({
+            'id': achievement.id,
+            'name': achievement.name,
+            'description': achievement.description,
+            'icon': achievement.icon,
+            'points': achievement.points,
+            'earned': achievement.id in earned_ids
+        })
+
+    return jsonify({'achievements': achievements_data}), 200
@@ -0,0 +1,179 @@
+"""
+This file defines the database models for problems, submissions, users, achievements, statistics, hint usage, refresh tokens, and feedback.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+from datetime import datetime
+
+from .database import JSONText, db
+
+"""
+Database model representing a coding challenge, including its description, test cases, and solution data.
+Inputs: title, description, difficulty, examples, test cases
+Outputs: Problem database object
+Contributors: Daniel Neugent, Jay Patel
+"""
+class Problem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    difficulty = db.Column(db.String(10), nullable=False, default='Medium')  # Easy, Medium, Hard
+    input_example = db.Column(db.Text, nullable=False)
+    output_example = db.Column(db.Text, nullable=False)
+    # Loaded only when accessed, since it can be large; read through testcases.load_test_cases
+    test_cases = db.deferred(db.Column(JSONText, nullable=False))  # JSON string
+    test_cases_hash = db.Column(db.String(64), nullable=True)  # Blob store digest when stored externally
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Bumped whenever test cases change
+    comparator = db.Column(db.String(64), nullable=True)  # Output comparator spec, e.g. 'float:1e-6'; exact when empty
+    hint_text = db.Column(db.Text, nullable=True)  # Partial hint
+    full_solution = db.Column(db.Text, nullable=True)  # Full solution
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    is_active = db.Column(db.Boolean, default=True)
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the imported definition
+
+"""
+Database model recording a user's code attempt for a specific problem, including execution time and correctness.
+Inputs: user_id, problem_id, language, code, execution status
+Outputs: Submission database object
+Contributors: Tej Gumaste, Arnav Jain
+"""
+class Submission(db.Model):
+    # Per-user history (stats, streaks) and recent activity (leaderboard periods) are the hot lookups;
+    # per-problem success counts are read from the second index alone
+    __table_args__ = (db.Index('ix_submission_user_submitted', 'user_id', 'submitted_at'),
+                      db.Index('ix_submission_problem_correct', 'problem_id', 'is_correct'))
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    problem_id = db.Column(db.Integer, db.ForeignKey('problem.id'), nullable=False)
+    language = db.Column(db.String(10), nullable=False)  # 'python', 'javascript', 'java'
+    code = db.Column(db.Text, nullable=False)  # Store the actual code
+    exec_time = db.Column(db.Float, nullable=False)  # in seconds
+    is_correct = db.Column(db.Boolean, default=False)
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    user = db.relationship('User', backref='submissions')
+    problem = db.relationship('Problem', backref='submissions')
+
+"""
+Database model managing user authentication credentials, roles, and aggregate streak information.
+Inputs: email, password hash, role
+Outputs: User database object
+Contributors: Brett Balquist, Daniel Neugent
+"""
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes exceed 128 chars
+    role = db.Column(db.String(20), default='user')  # 'user', 'admin'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    current_streak = db.Column(db.Integer, default=0)
+    longest_streak = db.Column(db.Integer, default=0)
+    total_solutions = db.Column(db.Integer, default=0)
+    last_submission_date = db.Column(db.Date, nullable=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bump to revoke issued tokens
+
+"""
+Database model defining the available gamification rewards, including criteria for earning them and point values.
+Inputs: name, description, criteria JSON, icon, points
+Outputs: Achievement database object
+Contributors: Jay Patel, Tej Gumaste
+"""
+class Achievement(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    criteria = db.Column(JSONText, nullable=False)  # JSON string describing criteria
+    icon = db.Column(db.String(50), nullable=False)  # Icon identifier
+    points = db.Column(db.Integer, default=0)
+    is_active = db.Column(db.Boolean, default=True)
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the imported definition
+
+"""
+Association model linking users to the specific achievements they have earned and the timestamp of earning.
+Inputs: user_id, achievement_id
+Outputs: UserAchievement database object
+Contributors: Arnav Jain, Brett Balquist
+"""
+class UserAchievement(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    achievement_id = db.Column(db.Integer, db.ForeignKey('achievement.id'), nullable=False)
+    earned_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User', backref='achievements')
+    achievement = db.relationship('Achievement', backref='users')
+
+"""
+Database model tracking detailed performance metrics for a user, such as total attempts and success rates.
+Inputs: user_id, statistical counters
+Outputs: UserStats database object
+Contributors: Daniel Neugent, Jay Patel, Tej Gumaste
+"""
+class UserStats(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    total_attempts = db.Column(db.Integer, default=0)
+    total_correct = db.Column(db.Integer, default=0)
+    success_rate = db.Column(db.Float, default=0.0)
+    favorite_language = db.Column(db.String(10), default='python')
+    problems_attempted = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User', backref='stats')
+
+"""
+Database model tracking which hints a user has revealed for specific problems to enforce daily limits. Each user has at most one row per problem and day, so a reveal claims its row with a single conflict-aware insert.
+Inputs: user_id, problem_id, hint_level, day
+Outputs: UserHintUsage database object
+Contributors: Brett Balquist, Arnav Jain
+"""
+class UserHintUsage(db.Model):
+    __table_args__ = (db.Index('ix_user_hint_usage_user_used', 'user_id', 'used_at'),
+                      db.Index('ux_user_hint_usage_user_problem_day', 'user_id', 'problem_id', 'day', unique=True))
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    problem_id = db.Column(db.Integer, db.ForeignKey('problem.id'), nullable=False)
+    hint_level = db.Column(db.String(10), nullable=False)  # 'partial', 'full'
+    day = db.Column(db.Date, nullable=True, default=lambda: datetime.now().date())  # Quota day, as in UserHintQuota
+    used_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User', backref='hint_usage')
+    problem = db.relationship('Problem', backref='hint_usage')
+
+"""
+Database model holding each user's hint charges for one day. It is charged with a single conditional upsert so concurrent reveals can never exceed the daily limit.
+Inputs: user_id, day, used
+Outputs: UserHintQuota database object
+Contributors: Brett Balquist, Arnav Jain
+"""
+class UserHintQuota(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    used = db.Column(db.Integer, nullable=False, default=0)
+
+"""
+Database model tracking issued refresh tokens by their JWT id so they can be rotated and revoked. Tokens rotated from the same login share a family, and reusing an already-rotated token revokes the whole family.
+Inputs: jti, family_id, user_id, expires_at
+Outputs: RefreshToken database object
+Contributors: Arnav Jain, Tej Gumaste
+"""
+class RefreshToken(db.Model):
+    jti = db.Column(db.String(32), primary_key=True)
+    family_id = db.Column(db.String(32), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked = db.Column(db.Boolean, nullable=False, default=False)
+
+"""
+Database model storing anonymous or signed user feedback and ratings regarding the platform.
+Inputs: user_id (optional), rating, feedback text
+Outputs: FeedbackSubmission database object
+Contributors: Tej Gumaste, Daniel Neugent
+"""
+class FeedbackSubmission(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # Optional for anonymous
+    rating = db.Column(db.Integer, nullable=False)  # 1-5 scale
+    feedback_text = db.Column(db.Text, nullable=False)
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,299 @@
+"""
+This file provides opt-in per-request profiling. When PROFILING_ENABLED is set, every request records its wall time, the CPU time of the thread that served it, the number of SQL statements it ran, their total time and the slowest of them. The figures are returned in a Server-Timing header, so browser developer tools show them per request, and recent requests are aggregated per endpoint for the admin profiling endpoint. With PROFILING_SAMPLER also set, a background thread samples the stacks of in-flight requests, and requests slower than PROFILING_SLOW_MS have their samples written as collapsed stacks that flamegraph.pl, speedscope and similar tools read directly. When disabled nothing is registered, so there is no overhead. SQL time covers statement execution, not fetching rows afterwards; SQLite produces rows as they are fetched, so there a large result's cost shows up in the stacks and CPU time rather than in SQL time.
+Authors: Jay Patel and Tej Gumaste
+"""
+import heapq
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from .database import db
+from .scheduler import percentile
+
+# Slowest statements kept per request, and characters kept of each
+TOP_STATEMENTS = 5
+STATEMENT_PREVIEW_CHARS = 500
+# Stack dumps are named <milliseconds>-<pid>-<sequence>-<endpoint>.folded
+DUMP_NAME = re.compile(r'^\d+-\d+-\d+-[\w.]+\.folded$')
+
+"""
+Measurements for one request: started when the request begins and filled in by the engine event handlers.
+Inputs: None
+Outputs: RequestProfile instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.thread_time()
+        self.thread_id = threading.get_ident()
+        self.queries = 0
+        self.sql_time = 0.0
+        # Min-heap of (seconds, sequence, statement), so the fastest kept statement is dropped first
+        self.slowest = []
+
+    # Adds one executed statement and keeps it if it is among the slowest.
+    def add_statement(self, statement, duration):
+        self.queries += 1
+        self.sql_time += duration
+        entry = (duration, self.queries, statement[:STATEMENT_PREVIEW_CHARS])
+        if len(self.slowest) < TOP_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+"""
+Collects finished request profiles for one worker process: a bounded window per endpoint for percentiles, the most recent slow requests, and, in sampler mode, stack samples of requests in flight.
+Inputs: slow_ms (float), sample_interval (seconds), dump_dir (string or None to disable stack dumps), max_dumps (integer), window (samples kept per endpoint)
+Outputs: RequestProfiler instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class RequestProfiler:
+    def __init__(self, slow_ms, sample_interval, dump_dir, max_dumps, window=500):
+        self.slow_ms = slow_ms
+        self.sample_interval = sample_interval
+        self.dump_dir = dump_dir
+        self.max_dumps = max_dumps
+        self.lock = threading.Lock()
+        # Signalled when a request starts, so an idle sampler thread sleeps instead of polling
+        self.wake = threading.Condition(self.lock)
+        self.dump_sequence = itertools.count(1)
+        self.endpoints = defaultdict(lambda: {'count': 0, 'wall': deque(maxlen=window), 'cpu': deque(maxlen=window),
+                                              'sql': deque(maxlen=window), 'queries': deque(maxlen=window)})
+        self.slow_requests = deque(maxlen=50)
+        self.dumps = deque()
+        # Stack sample counters of in-flight requests by thread id, filled by the sampler thread
+        self.active = {}
+        self.sampler = None
+        self.sampler_pid = None
+
+    # Starts the sampler thread in this process if sampling is on and it is not running; a forked worker starts its own.
+    def ensure_sampler(self):
+        if self.dump_dir is None or (self.sampler is not None and self.sampler_pid == os.getpid()):
+            return
+        with self.lock:
+            if self.sampler is None or self.sampler_pid != os.getpid():
+                self.active = {}
+                self.sampler_pid = os.getpid()
+                self.sampler = threading.Thread(target=self.sample_loop, name='leetle-profiler', daemon=True)
+                self.sampler.start()
+
+    # Records the stack of every in-flight request thread once per interval, waiting while there are none.
+    def sample_loop(self):
+        while True:
+            with self.lock:
+                while not self.active:
+                    self.wake.wait()
+            time.sleep(self.sample_interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, samples in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[collapse_stack(frame)] += 1
+
+    # Begins stack sampling for the calling request's thread.
+    def start_sampling(self, profile):
+        if self.dump_dir is not None:
+            self.ensure_sampler()
+            with self.lock:
+                self.active[profile.thread_id] = Counter()
+                self.wake.notify()
+
+    # Ends stack sampling for a request and returns its samples.
+    def stop_sampling(self, profile):
+        if self.dump_dir is None:
+            return None
+        with self.lock:
+            return self.active.pop(profile.thread_id, None)
+
+    # Adds a finished request to the per-endpoint window and, if it was slow, to the slow request log with its stack dump.
+    def record(self, endpoint, method, status, profile, wall, cpu, samples):
+        slow = wall * 1000 >= self.slow_ms
+        dump = self.write_dump(endpoint, samples) if slow and samples else None
+        with self.lock:
+            stats = self.endpoints[endpoint]
+            stats['count'] += 1
+            stats['wall'].append(wall)
+            stats['cpu'].append(cpu)
+            stats['sql'].append(profile.sql_time)
+            stats['queries'].append(profile.queries)
+            if slow:
+                self.slow_requests.append({
+                    'endpoint': endpoint,
+                    'method': method,
+                    'status': status,
+                    'at': time.time(),
+                    'wall_ms': round(wall * 1000, 2),
+                    'cpu_ms': round(cpu * 1000, 2),
+                    'sql_ms': round(profile.sql_time * 1000, 2),
+                    'queries': profile.queries,
+                    'slowest_statements': [{'ms': round(duration * 1000, 3), 'statement': statement}
+                                           for duration, _, statement in sorted(profile.slowest, reverse=True)],
+                    'stacks': dump,
+                })
+
+    # Writes a request's stack samples in collapsed format and removes the oldest dumps beyond max_dumps.
+    def write_dump(self, endpoint, samples):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        label = re.sub(r'[^\w.]', '_', endpoint)
+        name = f'{int(time.time() * 1000)}-{os.getpid()}-{next(self.dump_sequence)}-{label}.folded'
+        with open(os.path.join(self.dump_dir, name), 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+        with self.lock:
+            self.dumps.append(name)
+            expired = [self.dumps.popleft() for _ in range(max(0, len(self.dumps) - self.max_dumps))]
+        for old in expired:
+            try:
+                os.unlink(os.path.join(self.dump_dir, old))
+            except FileNotFoundError:
+                pass
+        return name
+
+    # Returns per-endpoint percentiles over the recent window and the slow request log, newest first.
+    def snapshot(self):
+        with self.lock:
+            endpoints = {}
+            for endpoint, stats in self.endpoints.items():
+                wall, cpu, sql, queries = (list(stats[key]) for key in ('wall', 'cpu', 'sql', 'queries'))
+                endpoints[endpoint] = {
+                    'count': stats['count'],
+                    'wall_ms': {'p50': to_ms(percentile(wall, 50)), 'p95': to_ms(percentile(wall, 95)), 'max': to_ms(max(wall))},
+                    'cpu_ms': {'p50': to_ms(percentile(cpu, 50)), 'p95': to_ms(percentile(cpu, 95))},
+                    'sql_ms': {'p50': to_ms(percentile(sql, 50)), 'p95': to_ms(percentile(sql, 95))},
+                    'queries': {'avg': round(sum(queries) / len(queries), 2), 'max': max(queries)},
+                }
+            return {
+                'enabled': True,
+                'slow_ms': self.slow_ms,
+                'sampler': self.dump_dir is not None,
+                'endpoints': endpoints,
+                'slow_requests': list(reversed(self.slow_requests)),
+            }
+
+"""
+Converts seconds to milliseconds rounded for display, passing None through.
+Inputs: seconds (float or None)
+Outputs: milliseconds (float or None)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def to_ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+"""
+Formats a frame and its callers as one collapsed stack line, outermost frame first, as flame graph tools expect.
+Inputs: frame (Python frame object)
+Outputs: stack (string of 'function (file:line)' entries joined by ';')
+Contributors: Jay Patel, Tej Gumaste
+"""
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+"""
+Returns the profile of the request being served on this thread, or None outside a profiled request.
+Inputs: None
+Outputs: RequestProfile or None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def current_profile():
+    if not has_request_context():
+        return None
+    return g.get('leetle_profile')
+
+"""
+Engine event handler that notes when a statement starts on its execution context, which is discarded with the statement even when it fails.
+Inputs: SQLAlchemy before_cursor_execute arguments
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.leetle_query_start = time.perf_counter()
+
+"""
+Engine event handler that adds a finished statement to the current request's profile.
+Inputs: SQLAlchemy after_cursor_execute arguments
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'leetle_query_start', None)
+    profile = current_profile()
+    if profile is not None and started is not None:
+        profile.add_statement(statement, time.perf_counter() - started)
+
+"""
+Request hook that starts profiling a request.
+Inputs: None
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def start_request_profile():
+    g.leetle_profile = RequestProfile()
+    current_app.extensions['leetle_profiler'].start_sampling(g.leetle_profile)
+
+"""
+Request hook that finishes profiling a request, records it and adds the Server-Timing header.
+Inputs: response (Flask response)
+Outputs: response (Flask response)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def finish_request_profile(response):
+    profile = g.pop('leetle_profile', None)
+    if profile is None:
+        return response
+    profiler = current_app.extensions['leetle_profiler']
+    samples = profiler.stop_sampling(profile)
+    wall = time.perf_counter() - profile.started
+    cpu = time.thread_time() - profile.cpu_started
+    profiler.record(request.endpoint or 'unmatched', request.method, response.status_code, profile, wall, cpu, samples)
+    response.headers.add('Server-Timing', ', '.join([
+        f'total;dur={wall * 1000:.2f}',
+        f'cpu;dur={cpu * 1000:.2f}',
+        f'db;dur={profile.sql_time * 1000:.2f};desc="{profile.queries} queries"',
+    ]))
+    return response
+
+"""
+Enables request profiling on an application when PROFILING_ENABLED is set: creates the profiler, registers the request hooks and attaches the statement timers to each of the app's database engines. Must run after db.init_app.
+Inputs: app (Flask application)
+Outputs: None (Stores the profiler in app.extensions['leetle_profiler'])
+Contributors: Jay Patel, Tej Gumaste
+"""
+def init_app(app):
+    if not app.config['PROFILING_ENABLED']:
+        return
+    app.extensions['leetle_profiler'] = RequestProfiler(
+        slow_ms=app.config['PROFILING_SLOW_MS'],
+        sample_interval=app.config['PROFILING_SAMPLE_INTERVAL_MS'] / 1000,
+        dump_dir=app.config['PROFILING_DIR'] if app.config['PROFILING_SAMPLER'] else None,
+        max_dumps=app.config['PROFILING_MAX_DUMPS'],
+    )
+    app.before_request(start_request_profile)
+    app.after_request(finish_request_profile)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+"""
+Returns the request profiler of the current application, or None when profiling is disabled.
+Inputs: None (uses current_app)
+Outputs: RequestProfiler or None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def get_profiler():
+    return current_app.extensions.get('leetle_profiler')
@@ -0,0 +1,176 @@
+"""
+This file defines the judge job protocol: newline-delimited JSON messages exchanged between the web tier's dispatcher and judge workers, and between the judge and its warm language runners. Test inputs are bytes and travel base64-encoded. Addresses are 'unix:/path/to.sock', 'host:port' or 'host:first-last', a range of ports from which each web process takes one; a TCP address without a host binds and connects on loopback only.
+
+Dispatchers and judge workers authenticate each other before any job is sent, with HMAC-SHA256 over a fresh nonce from each side and a key shared through JUDGE_SECRET (or derived from SECRET_KEY):
+
+    dispatcher -> worker      {"type": "challenge", "nonce": <hex>}
+    worker     -> dispatcher  {"type": "register", "worker_id": ..., "capacity": ..., "nonce": <hex>,
+                               "auth": HMAC(key, "worker:" + dispatcher nonce)}
+    dispatcher -> worker      {"type": "welcome", "auth": HMAC(key, "dispatcher:" + worker nonce)}
+
+Authors: Jay Patel and Tej Gumaste
+"""
+import base64
+import errno
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+
+# Seconds either side waits for the other's handshake message before giving up on the connection
+HANDSHAKE_TIMEOUT = 5
+
+"""
+Splits an address into a socket family and a socket address.
+Inputs: address (string)
+Outputs: family (socket.AF_UNIX or socket.AF_INET), sockaddr (path string or (host, port) tuple); raises ValueError when malformed
+Contributors: Jay Patel, Tej Gumaste
+"""
+def parse_address(address):
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, separator, port = address.rpartition(':')
+    if not separator or not port.isdigit():
+        raise ValueError(f"Invalid judge address '{address}'; use unix:/path or host:port")
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+"""
+Expands a 'host:first-last' port range into one address per port. Other addresses are returned unchanged.
+Inputs: address (string)
+Outputs: addresses (list of strings); raises ValueError when the range is malformed
+Contributors: Jay Patel, Tej Gumaste
+"""
+def expand_address(address):
+    if address.startswith('unix:'):
+        return [address]
+    host, separator, ports = address.rpartition(':')
+    first, dash, last = ports.partition('-')
+    if not separator or not dash:
+        return [address]
+    if not first.isdigit() or not last.isdigit() or int(first) > int(last):
+        raise ValueError(f"Invalid judge port range '{address}'; use host:first-last")
+    return [f'{host}:{port}' for port in range(int(first), int(last) + 1)]
+
+"""
+Opens a listening socket on an address, replacing a stale Unix socket file left by a previous process. For a port range, the first free port is taken, so each web process of a multi-process server gets its own.
+Inputs: address (string), backlog (integer)
+Outputs: (listening socket, address actually bound); raises OSError when every port is in use
+Contributors: Jay Patel, Tej Gumaste
+"""
+def listen(address, backlog=64):
+    for candidate in expand_address(address):
+        family, sockaddr = parse_address(candidate)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(sockaddr):
+                os.unlink(sockaddr)
+        else:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(sockaddr)
+        except OSError as e:
+            sock.close()
+            if e.errno == errno.EADDRINUSE and family == socket.AF_INET:
+                continue
+            raise
+        sock.listen(backlog)
+        return sock, candidate
+    raise OSError(errno.EADDRINUSE, f"Every port of judge address '{address}' is in use; give each web process its own "
+                                    "with a range such as 127.0.0.1:7100-7115")
+
+"""
+Connects to an address.
+Inputs: address (string), timeout (optional seconds for the connection attempt)
+Outputs: connected socket (blocking)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def connect(address, timeout=None):
+    family, sockaddr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(sockaddr)
+    except OSError:
+        sock.close()
+        raise
+    sock.settimeout(None)
+    return sock
+
+"""
+Returns the key dispatchers and workers authenticate each other with: JUDGE_SECRET when set, otherwise one derived from SECRET_KEY, so processes of one deployment agree without extra configuration.
+Inputs: config (application config)
+Outputs: key (bytes)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def judge_secret(config):
+    if config.get('JUDGE_SECRET'):
+        return config['JUDGE_SECRET'].encode('utf-8')
+    return hmac.new(config['SECRET_KEY'].encode('utf-8'), b'leetle-judge-protocol', hashlib.sha256).digest()
+
+"""
+Creates a fresh handshake nonce.
+Inputs: None
+Outputs: nonce (hex string)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def make_nonce():
+    return secrets.token_hex(16)
+
+"""
+Proves knowledge of the shared key for the other side's nonce. The role is part of the signed text, so a reply can never be reflected back as the other side's proof.
+Inputs: key (bytes), role ('worker' or 'dispatcher'), nonce (hex string)
+Outputs: proof (hex string)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def sign_nonce(key, role, nonce):
+    return hmac.new(key, f'{role}:{nonce}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+"""
+Checks a handshake proof in constant time.
+Inputs: key (bytes), role ('worker' or 'dispatcher'), nonce (hex string), proof (string or None)
+Outputs: valid (boolean)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def verify_nonce(key, role, nonce, proof):
+    return isinstance(proof, str) and hmac.compare_digest(sign_nonce(key, role, nonce), proof)
+
+"""
+Serializes one message as a line of compact JSON.
+Inputs: message (dictionary)
+Outputs: bytes ending in a newline
+Contributors: Jay Patel, Tej Gumaste
+"""
+def encode_message(message):
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+"""
+Reads one message from a binary stream, such as socket.makefile('rb') or a process's stdout.
+Inputs: stream (binary file object)
+Outputs: message (dictionary), or None at end of stream
+Contributors: Jay Patel, Tej Gumaste
+"""
+def read_message(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+"""
+Converts prepared test cases into their wire form.
+Inputs: cases (sequence of (input bytes, expected output string) pairs)
+Outputs: list of [base64 input, expected output] pairs
+Contributors: Jay Patel, Tej Gumaste
+"""
+def encode_cases(cases):
+    return [[base64.b64encode(input_data).decode('ascii'), expected] for input_data, expected in cases]
+
+"""
+Converts test cases from their wire form back into prepared test cases.
+Inputs: cases (list of [base64 input, expected output] pairs)
+Outputs: tuple of (input bytes, expected output string) pairs
+Contributors: Jay Patel, Tej Gumaste
+"""
+def decode_cases(cases):
+    return tuple((base64.b64decode(input_data), expected) for input_data, expected in cases)
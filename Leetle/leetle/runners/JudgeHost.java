@@ -0,0 +1,574 @@
+/*
+ * This file is the JVM warm runner. The judge starts it ahead of time, inside the sandbox, and hands it one compiled
+ * Java submission, whose test cases then run without paying JVM startup each time. It needs no build step; the java
+ * launcher compiles it in memory as it starts:
+ *
+ *     java -Xmx128m -XX:+UseSerialGC JudgeHost.java --max-jobs 200 --recycle-heap-mb 64
+ *
+ * Each test case loads the submission's classes, from the directory holding the source named in the run request,
+ * in a fresh classloader, so static fields start from their initial values every time. Main.main runs on its own
+ * thread with System.in, System.out and System.err redirected to the case's input and output. The time limit and
+ * the judge's kill message interrupt that thread, and any write it makes afterwards throws, so a looping printer
+ * stops at once. A case that ignores the interruption, or leaves threads running, cannot be reclaimed inside the
+ * JVM, so the runner reports it and recycles. It also recycles after --max-jobs cases, after an OutOfMemoryError,
+ * or once the heap still in use has grown past --recycle-heap-mb; the judge continues on a fresh runner.
+ *
+ * A program whose classes call System.exit, Runtime.halt or replace the standard streams themselves would act on
+ * the runner rather than on its case, so it gets an 'unsupported' result and the judge runs it as a plain java
+ * process instead. Requests and results are newline-delimited JSON on stdin and stdout, in the format documented in
+ * leetle/runners/__init__.py.
+ * Authors: Jay Patel and Tej Gumaste
+ */
+import java.io.BufferedReader;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.FileDescriptor;
+import java.io.FileInputStream;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.ArrayDeque;
+import java.util.Base64;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.stream.Stream;
+
+public final class JudgeHost {
+    // Bytes of stderr kept for the result
+    private static final int STDERR_LIMIT = 65536;
+    // Buffered stdout is sent to the judge once it reaches this size, and otherwise at every poll
+    private static final int OUTPUT_CHUNK = 8192;
+    private static final long POLL_MILLIS = 20;
+    // How long an interrupted case gets to unwind before the runner gives up on it and recycles
+    private static final long STOP_GRACE_MILLIS = 200;
+    // Constant pool names that would act on the runner instead of the case
+    private static final String[] UNSUPPORTED_NAMES = {"exit", "halt", "setIn", "setOut", "setErr",
+                                                       "addShutdownHook", "setSecurityManager"};
+    // Loaded once here instead of by every test case
+    private static final String[] PRELOADED_CLASSES = {"java.util.Scanner", "java.io.BufferedReader",
+            "java.io.InputStreamReader", "java.util.StringTokenizer", "java.util.HashMap", "java.util.ArrayList",
+            "java.util.Arrays", "java.util.ArrayDeque", "java.util.PriorityQueue", "java.util.TreeMap",
+            "java.util.regex.Pattern", "java.util.stream.Collectors", "java.math.BigInteger"};
+    private static final Map<String, Object> END_OF_INPUT = new LinkedHashMap<>();
+
+    private static final PrintStream PROTOCOL = new PrintStream(new FileOutputStream(FileDescriptor.out), false,
+                                                                StandardCharsets.UTF_8);
+    private static final BlockingQueue<Map<String, Object>> CONTROL = new LinkedBlockingQueue<>();
+    private static final PrintStream DISCARD = new PrintStream(OutputStream.nullOutputStream());
+
+    private static int maxJobs = 200;
+    private static long recycleHeapBytes = 128L * 1024 * 1024;
+    private static int jobs = 0;
+
+    /*
+     * Thrown out of a stopped case's writes to unwind it; never reported as a program error.
+     */
+    private static final class CaseStopped extends Error {
+        CaseStopped() {
+            super(null, null, false, false);
+        }
+    }
+
+    /*
+     * A case's stdout: counts bytes against the output limit and sends them to the judge in chunks, so the judge
+     * can compare output as it arrives.
+     * Inputs: limit (maximum bytes, or -1 for none)
+     * Outputs: CaseOutput instance
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    private static final class CaseOutput extends OutputStream {
+        private final long limit;
+        private final ByteArrayOutputStream pending = new ByteArrayOutputStream();
+        private long written = 0;
+        private String stopStatus = null;
+
+        CaseOutput(long limit) {
+            this.limit = limit;
+        }
+
+        @Override
+        public void write(int b) {
+            write(new byte[]{(byte) b}, 0, 1);
+        }
+
+        @Override
+        public synchronized void write(byte[] data, int offset, int length) {
+            if (stopStatus != null) {
+                throw new CaseStopped();
+            }
+            written += length;
+            if (limit >= 0 && written > limit) {
+                stopStatus = "output_limit";
+                throw new CaseStopped();
+            }
+            pending.write(data, offset, length);
+            if (pending.size() >= OUTPUT_CHUNK) {
+                flush();
+            }
+        }
+
+        @Override
+        public synchronized void flush() {
+            if (pending.size() > 0) {
+                Map<String, Object> message = new LinkedHashMap<>();
+                message.put("type", "output");
+                message.put("data", Base64.getEncoder().encodeToString(pending.toByteArray()));
+                send(message);
+                pending.reset();
+            }
+        }
+
+        // Makes every later write throw, keeping the first reason the case was stopped.
+        synchronized String stop(String status) {
+            if (stopStatus == null) {
+                stopStatus = status;
+            }
+            return stopStatus;
+        }
+
+        synchronized String stopStatus() {
+            return stopStatus;
+        }
+    }
+
+    /*
+     * A case's stderr, keeping only the first STDERR_LIMIT bytes.
+     * Inputs: None
+     * Outputs: CaseErrors instance
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    private static final class CaseErrors extends OutputStream {
+        private final ByteArrayOutputStream kept = new ByteArrayOutputStream();
+
+        @Override
+        public void write(int b) {
+            write(new byte[]{(byte) b}, 0, 1);
+        }
+
+        @Override
+        public synchronized void write(byte[] data, int offset, int length) {
+            kept.write(data, offset, Math.min(length, Math.max(0, STDERR_LIMIT - kept.size())));
+        }
+
+        synchronized byte[] toByteArray() {
+            return kept.toByteArray();
+        }
+    }
+
+    /*
+     * Writes one message to the judge.
+     * Inputs: message (map of string keys to strings, numbers, booleans or null)
+     * Outputs: None
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    private static void send(Map<String, Object> message) {
+        StringBuilder line = new StringBuilder("{");
+        for (Map.Entry<String, Object> entry : message.entrySet()) {
+            if (line.length() > 1) {
+                line.append(',');
+            }
+            appendJsonString(line, entry.getKey());
+            line.append(':');
+            Object value = entry.getValue();
+            if (value instanceof String) {
+                appendJsonString(line, (String) value);
+            } else {
+                line.append(value);
+            }
+        }
+        line.append("}\n");
+        synchronized (PROTOCOL) {
+            PROTOCOL.print(line);
+            PROTOCOL.flush();
+        }
+    }
+
+    private static void appendJsonString(StringBuilder out, String value) {
+        out.append('"');
+        for (int i = 0; i < value.length(); i++) {
+            char c = value.charAt(i);
+            if (c == '"' || c == '\\') {
+                out.append('\\').append(c);
+            } else if (c < 0x20) {
+                out.append(String.format("\\u%04x", (int) c));
+            } else {
+                out.append(c);
+            }
+        }
+        out.append('"');
+    }
+
+    /*
+     * Parses one request from the judge. Requests are flat JSON objects, so nested values are not supported.
+     * Inputs: line (string)
+     * Outputs: message (map of string keys to String, Double, Boolean or null values)
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    static Map<String, Object> parseMessage(String line) {
+        JsonReader reader = new JsonReader(line);
+        Map<String, Object> message = new LinkedHashMap<>();
+        reader.expect('{');
+        if (!reader.consume('}')) {
+            do {
+                String key = reader.readString();
+                reader.expect(':');
+                message.put(key, reader.readValue());
+            } while (reader.consume(','));
+            reader.expect('}');
+        }
+        return message;
+    }
+
+    private static final class JsonReader {
+        private final String text;
+        private int position = 0;
+
+        JsonReader(String text) {
+            this.text = text;
+        }
+
+        private void skipWhitespace() {
+            while (position < text.length() && Character.isWhitespace(text.charAt(position))) {
+                position++;
+            }
+        }
+
+        boolean consume(char c) {
+            skipWhitespace();
+            if (position < text.length() && text.charAt(position) == c) {
+                position++;
+                return true;
+            }
+            return false;
+        }
+
+        void expect(char c) {
+            if (!consume(c)) {
+                throw new IllegalArgumentException("Expected '" + c + "' at " + position);
+            }
+        }
+
+        Object readValue() {
+            skipWhitespace();
+            if (text.startsWith("null", position)) {
+                position += 4;
+                return null;
+            }
+            if (text.startsWith("true", position)) {
+                position += 4;
+                return Boolean.TRUE;
+            }
+            if (text.startsWith("false", position)) {
+                position += 5;
+                return Boolean.FALSE;
+            }
+            if (position < text.length() && text.charAt(position) == '"') {
+                return readString();
+            }
+            int start = position;
+            while (position < text.length() && "+-.eE0123456789".indexOf(text.charAt(position)) >= 0) {
+                position++;
+            }
+            return Double.parseDouble(text.substring(start, position));
+        }
+
+        String readString() {
+            expect('"');
+            StringBuilder value = new StringBuilder();
+            while (true) {
+                char c = text.charAt(position++);
+                if (c == '"') {
+                    return value.toString();
+                }
+                if (c != '\\') {
+                    value.append(c);
+                    continue;
+                }
+                char escaped = text.charAt(position++);
+                switch (escaped) {
+                    case 'b': value.append('\b'); break;
+                    case 'f': value.append('\f'); break;
+                    case 'n': value.append('\n'); break;
+                    case 'r': value.append('\r'); break;
+                    case 't': value.append('\t'); break;
+                    case 'u':
+                        value.append((char) Integer.parseInt(text.substring(position, position + 4), 16));
+                        position += 4;
+                        break;
+                    default: value.append(escaped);
+                }
+            }
+        }
+    }
+
+    /*
+     * Whether any compiled class in the submission names a method that would act on the runner itself. Looks for
+     * the names as whole UTF-8 constant pool entries, so it can only err towards running the program cold.
+     * Inputs: classDir (directory of .class files)
+     * Outputs: true when the program must run as a plain process
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    static boolean needsPlainProcess(Path classDir) throws IOException {
+        try (Stream<Path> files = Files.list(classDir)) {
+            for (Path file : (Iterable<Path>) files.filter(f -> f.toString().endsWith(".class"))::iterator) {
+                byte[] bytes = Files.readAllBytes(file);
+                for (String name : UNSUPPORTED_NAMES) {
+                    if (containsConstant(bytes, name)) {
+                        return true;
+                    }
+                }
+            }
+        }
+        return false;
+    }
+
+    private static boolean containsConstant(byte[] bytes, String name) {
+        byte[] entry = new byte[name.length() + 3];
+        entry[0] = 1;
+        entry[1] = (byte) (name.length() >> 8);
+        entry[2] = (byte) name.length();
+        System.arraycopy(name.getBytes(StandardCharsets.UTF_8), 0, entry, 3, name.length());
+        outer:
+        for (int i = 0; i + entry.length <= bytes.length; i++) {
+            for (int j = 0; j < entry.length; j++) {
+                if (bytes[i + j] != entry[j]) {
+                    continue outer;
+                }
+            }
+            return true;
+        }
+        return false;
+    }
+
+    /*
+     * Whether any thread the case started that would keep a plain JVM alive is still running.
+     * Inputs: group (the case's ThreadGroup)
+     * Outputs: boolean
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    private static boolean caseRunning(ThreadGroup group) {
+        Thread[] threads = new Thread[group.activeCount() + 8];
+        int count = group.enumerate(threads, true);
+        for (int i = 0; i < count; i++) {
+            if (threads[i].isAlive() && !threads[i].isDaemon()) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    private static void interruptAll(ThreadGroup group) {
+        Thread[] threads = new Thread[group.activeCount() + 8];
+        int count = group.enumerate(threads, true);
+        for (int i = 0; i < count; i++) {
+            threads[i].interrupt();
+        }
+    }
+
+    /*
+     * Runs one test case and reports its output and how it ended. The case is stopped when it exceeds the time
+     * limit, when its stdout exceeds output_limit, or when the judge sends a kill message because the output was
+     * wrong.
+     * Inputs: request (run message)
+     * Outputs: Whether the runner should now recycle itself (sends output and result messages)
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    private static boolean runCase(Map<String, Object> request, ArrayDeque<Map<String, Object>> pending)
+            throws Exception {
+        Path classDir = Paths.get((String) request.get("source")).toAbsolutePath().getParent();
+        double timeout = (Double) request.get("timeout");
+        Object outputLimit = request.get("output_limit");
+        Map<String, Object> result = new LinkedHashMap<>();
+        result.put("type", "result");
+        if (needsPlainProcess(classDir)) {
+            result.put("status", "unsupported");
+            result.put("returncode", 0);
+            result.put("stderr", "");
+            send(result);
+            return false;
+        }
+
+        byte[] input = Base64.getDecoder().decode((String) request.get("input"));
+        CaseOutput stdout = new CaseOutput(outputLimit == null ? -1 : ((Double) outputLimit).longValue());
+        CaseErrors stderr = new CaseErrors();
+        PrintStream caseOut = new PrintStream(stdout, false, StandardCharsets.UTF_8);
+        PrintStream caseErr = new PrintStream(stderr, true, StandardCharsets.UTF_8);
+        int[] returncode = {0};
+        boolean[] outOfMemory = {false};
+        boolean recycle = false;
+
+        URLClassLoader loader = new URLClassLoader(new URL[]{classDir.toUri().toURL()},
+                                                   ClassLoader.getPlatformClassLoader());
+        ThreadGroup group = new ThreadGroup("case-" + jobs);
+        Thread thread = new Thread(group, () -> {
+            try {
+                // Loading and initializing Main happens here, so static initializers count against the time limit
+                Method main = Class.forName("Main", true, loader).getMethod("main", String[].class);
+                if (!Modifier.isStatic(main.getModifiers())) {
+                    throw new NoSuchMethodException("Main.main is not static");
+                }
+                main.invoke(null, (Object) new String[0]);
+            } catch (Throwable e) {
+                Throwable cause = e instanceof InvocationTargetException ? e.getCause() : e;
+                if (cause instanceof ExceptionInInitializerError && cause.getCause() != null) {
+                    cause = cause.getCause();
+                }
+                if (cause instanceof CaseStopped) {
+                    return;
+                }
+                outOfMemory[0] = cause instanceof OutOfMemoryError;
+                returncode[0] = 1;
+                try {
+                    caseErr.print("Exception in thread \"main\" ");
+                    cause.printStackTrace(caseErr);
+                } catch (Throwable ignored) {
+                    // Nothing more can be reported from a thread that is out of memory
+                }
+            } finally {
+                try {
+                    caseOut.flush();
+                } catch (CaseStopped ignored) {
+                    // The remaining output belongs to a stopped case
+                }
+            }
+        }, "main");
+
+        System.setIn(new ByteArrayInputStream(input));
+        System.setOut(caseOut);
+        System.setErr(caseErr);
+        String status = null;
+        long deadline = System.nanoTime() + (long) (timeout * 1e9);
+        try {
+            thread.start();
+            while (status == null && caseRunning(group)) {
+                Map<String, Object> message = CONTROL.poll(POLL_MILLIS, TimeUnit.MILLISECONDS);
+                stdout.flush();
+                if (message == END_OF_INPUT) {
+                    // Stops the case and, once its result is sent, the runner
+                    status = "mismatch";
+                    pending.add(message);
+                } else if (message != null && "kill".equals(message.get("type"))) {
+                    status = "mismatch";
+                } else if (message != null) {
+                    pending.add(message);
+                }
+                if (status == null && System.nanoTime() > deadline) {
+                    status = "timeout";
+                }
+                if (status == null && stdout.stopStatus() != null) {
+                    status = stdout.stopStatus();
+                }
+            }
+            if (status == null) {
+                status = stdout.stopStatus();
+            }
+            if (status != null) {
+                status = stdout.stop(status);
+                interruptAll(group);
+                thread.join(STOP_GRACE_MILLIS);
+                // The JVM cannot force a thread to stop, so a case that ignores the interruption takes the runner with it
+                recycle = caseRunning(group);
+            }
+            stdout.flush();
+        } finally {
+            System.setIn(new ByteArrayInputStream(new byte[0]));
+            System.setOut(DISCARD);
+            System.setErr(DISCARD);
+            if (!caseRunning(group)) {
+                loader.close();
+            }
+        }
+
+        Runtime runtime = Runtime.getRuntime();
+        recycle = recycle || outOfMemory[0] || ++jobs >= maxJobs;
+        if (!recycle && runtime.totalMemory() - runtime.freeMemory() > recycleHeapBytes) {
+            System.gc();
+            recycle = runtime.totalMemory() - runtime.freeMemory() > recycleHeapBytes;
+        }
+        result.put("status", status == null ? "exited" : status);
+        result.put("returncode", returncode[0]);
+        result.put("stderr", Base64.getEncoder().encodeToString(stderr.toByteArray()));
+        result.put("recycle", recycle);
+        send(result);
+        return recycle;
+    }
+
+    /*
+     * Reads requests from the judge on a thread of its own, so a kill can arrive while a case runs.
+     * Inputs: None
+     * Outputs: None
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    private static void readControl() {
+        try (BufferedReader reader = new BufferedReader(new InputStreamReader(new FileInputStream(FileDescriptor.in),
+                                                                              StandardCharsets.UTF_8))) {
+            String line;
+            while ((line = reader.readLine()) != null) {
+                if (!line.isBlank()) {
+                    CONTROL.add(parseMessage(line));
+                }
+            }
+        } catch (IOException | RuntimeException e) {
+            // Treated as the judge going away
+        }
+        CONTROL.add(END_OF_INPUT);
+    }
+
+    /*
+     * Runner entry point: preloads common classes, reports ready and serves run requests until the judge closes
+     * stdin or the runner recycles.
+     * Inputs: args (command-line options)
+     * Outputs: None
+     * Contributors: Jay Patel, Tej Gumaste
+     */
+    public static void main(String[] args) throws Exception {
+        for (int i = 0; i + 1 < args.length; i += 2) {
+            if (args[i].equals("--max-jobs")) {
+                maxJobs = Integer.parseInt(args[i + 1]);
+            } else if (args[i].equals("--recycle-heap-mb")) {
+                recycleHeapBytes = Long.parseLong(args[i + 1]) * 1024 * 1024;
+            }
+        }
+        System.setOut(DISCARD);
+        System.setErr(DISCARD);
+        for (String name : PRELOADED_CLASSES) {
+            Class.forName(name);
+        }
+
+        Thread reader = new Thread(JudgeHost::readControl, "leetle-control");
+        reader.setDaemon(true);
+        reader.start();
+        Map<String, Object> ready = new LinkedHashMap<>();
+        ready.put("type", "ready");
+        ready.put("pid", ProcessHandle.current().pid());
+        send(ready);
+
+        ArrayDeque<Map<String, Object>> pending = new ArrayDeque<>();
+        while (true) {
+            Map<String, Object> message = pending.isEmpty() ? CONTROL.take() : pending.poll();
+            if (message == END_OF_INPUT) {
+                break;
+            }
+            // A kill that arrives after its case already ended is stale
+            if ("run".equals(message.get("type")) && runCase(message, pending)) {
+                break;
+            }
+        }
+        // Threads left behind by a stopped case must not keep the runner alive
+        Runtime.getRuntime().halt(0);
+    }
+}
@@ -0,0 +1,283 @@
+"""
+This package holds the judge's warm runners: long-running language processes that run test cases without paying interpreter startup each time. The judge talks to every runner the same way, with newline-delimited JSON on the runner's stdin and stdout (see protocol.py):
+
+    judge  -> runner  {"type": "run", "source": <path>, "input": <base64>, "timeout": <seconds>, "output_limit": <bytes>}
+    runner -> judge   {"type": "output", "data": <base64>}             zero or more, as stdout arrives
+    judge  -> runner  {"type": "kill"}                                  the output is already wrong
+    runner -> judge   {"type": "result", "status": "exited" | "timeout" | "output_limit" | "mismatch" | "unsupported",
+                       "returncode": <int>, "stderr": <base64>, "stdout": <base64, optional remainder>,
+                       "recycle": <optional bool, the runner exits after this result>}
+
+A runner first sends {"type": "ready"} once it has started. Runners are started through the sandbox like any judged program, so they get the same isolation and limits, and each one serves a single submission: a pool keeps a few started ahead of time so submissions do not wait for them, and a runner is discarded once its submission is judged.
+Authors: Jay Patel and Tej Gumaste
+"""
+import base64
+import json
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from flask import current_app
+
+from ..protocol import encode_message
+from ..sandbox import get_sandbox
+
+PYTHON_ZYGOTE = os.path.join(os.path.dirname(__file__), 'python_zygote.py')
+NODE_RUNNER = os.path.join(os.path.dirname(__file__), 'node_runner.js')
+JUDGE_HOST = os.path.join(os.path.dirname(__file__), 'JudgeHost.java')
+# Seconds a runner gets beyond a case's time limit to report it, before the runner itself is killed
+RUNNER_GRACE_SECONDS = 5
+
+"""
+Raised when a runner fails to start, exits, or breaks the protocol. The runner cannot be used afterwards.
+Inputs: message (string)
+Outputs: RunnerError exception
+Contributors: Jay Patel, Tej Gumaste
+"""
+class RunnerError(Exception):
+    pass
+
+"""
+Raised when a runner cannot emulate something a program uses, so the program has to run as a plain process.
+Inputs: message (string)
+Outputs: RunnerUnsupported exception
+Contributors: Jay Patel, Tej Gumaste
+"""
+class RunnerUnsupported(Exception):
+    pass
+
+"""
+A started warm runner process and the judge's end of its protocol.
+Inputs: args (list of strings, already wrapped by the sandbox), cwd (optional working directory), sandbox_run (optional SandboxRun the runner was launched in), cleanup (optional callable run after the runner is killed), start_timeout (seconds to wait for ready), workspace (optional directory the runner can read programs from; programs are copied into it)
+Outputs: RunnerProcess instance; raises RunnerError or OSError when the runner does not start
+Contributors: Jay Patel, Tej Gumaste
+"""
+class RunnerProcess:
+    def __init__(self, args, cwd=None, sandbox_run=None, cleanup=None, start_timeout=10, workspace=None):
+        self.sandbox_run = sandbox_run
+        self.workspace = workspace
+        self.cleanup = cleanup
+        self.proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     cwd=cwd, start_new_session=True)
+        self.buffer = bytearray()
+        self.closed = False
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.proc.stdout, selectors.EVENT_READ)
+        try:
+            message = self.receive(time.monotonic() + start_timeout)
+            if message.get('type') != 'ready':
+                raise RunnerError(f"Runner sent '{message.get('type')}' instead of ready")
+        except (RunnerError, subprocess.TimeoutExpired) as e:
+            self.close()
+            raise RunnerError(f'Runner did not start: {e}')
+
+    def send(self, message):
+        try:
+            self.proc.stdin.write(encode_message(message))
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            raise RunnerError('Runner is not running')
+
+    # Reads the next message, raising subprocess.TimeoutExpired at the deadline and RunnerError when the runner has exited.
+    def receive(self, deadline):
+        while True:
+            end = self.buffer.find(b'\n')
+            if end >= 0:
+                line = bytes(self.buffer[:end])
+                del self.buffer[:end + 1]
+                return json_message(line)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.proc.args, remaining)
+            if self.selector.select(remaining):
+                chunk = os.read(self.proc.stdout.fileno(), 1 << 20)
+                if not chunk:
+                    raise RunnerError(f'Runner exited with status {self.proc.wait()}')
+                self.buffer += chunk
+
+    # Runs one test case of the program at source with the same results as judge.stream_process: stdout, stderr and why the run was stopped early. A comparator mismatch tells the runner to kill the case. Raises subprocess.TimeoutExpired when the case times out and RunnerUnsupported when it must run as a plain process.
+    def run(self, source, input_data, timeout, comparator=None, output_limit=None):
+        self.send({'type': 'run', 'source': source, 'input': base64.b64encode(input_data).decode('ascii'),
+                   'timeout': timeout, 'output_limit': output_limit})
+        deadline = time.monotonic() + timeout + RUNNER_GRACE_SECONDS
+        stdout = []
+        stopped = None
+        try:
+            while True:
+                message = self.receive(deadline)
+                if message.get('type') == 'result':
+                    break
+                if message.get('type') != 'output':
+                    continue
+                chunk = base64.b64decode(message['data'])
+                stdout.append(chunk)
+                if stopped is None and comparator is not None and not comparator.feed(chunk):
+                    stopped = 'mismatch'
+                    self.send({'type': 'kill'})
+        except (RunnerError, subprocess.TimeoutExpired):
+            self.close()
+            raise
+        if message.get('recycle'):
+            self.close()
+        if message['status'] == 'unsupported':
+            raise RunnerUnsupported('The program needs features the runner does not provide')
+
+        # Runners that cannot stream return all of stdout with the result
+        remainder = base64.b64decode(message.get('stdout', ''))
+        if remainder:
+            stdout.append(remainder)
+            if stopped is None and comparator is not None and not comparator.feed(remainder):
+                stopped = 'mismatch'
+        if message['status'] == 'timeout':
+            raise subprocess.TimeoutExpired(self.proc.args, timeout)
+        if message['status'] == 'output_limit':
+            stopped = 'output_limit'
+        return b''.join(stdout), base64.b64decode(message.get('stderr', '')), stopped
+
+    # Whether the kernel has killed anything in the runner's cgroup for exceeding its memory limit.
+    def oom_killed(self):
+        return self.sandbox_run is not None and self.sandbox_run.read_usage().oom_killed
+
+    # Kills the runner and everything it started.
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.proc.wait()
+        self.selector.close()
+        for pipe in (self.proc.stdin, self.proc.stdout):
+            pipe.close()
+        if self.cleanup is not None:
+            self.cleanup()
+
+"""
+Decodes one protocol line, turning malformed output into a RunnerError.
+Inputs: line (bytes)
+Outputs: message (dictionary)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def json_message(line):
+    try:
+        message = json.loads(line)
+    except ValueError:
+        raise RunnerError('Runner sent a malformed message')
+    if not isinstance(message, dict):
+        raise RunnerError('Runner sent a malformed message')
+    return message
+
+"""
+Returns the command that starts a language's warm runner, or None when the language has none.
+Inputs: language (string), config (application config)
+Outputs: args (list of strings or None)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def runner_command(language, config):
+    if language == 'python':
+        return ['python3', PYTHON_ZYGOTE]
+    if language == 'javascript':
+        # The heap cap is the memory limit, and the runner recycles itself at half of it
+        return ['node', f"--max-old-space-size={config['JUDGE_MEMORY_LIMIT_MB']}", NODE_RUNNER,
+                '--max-jobs', str(config['JUDGE_RUNNER_MAX_JOBS']),
+                '--recycle-heap-mb', str(config['JUDGE_MEMORY_LIMIT_MB'] // 2)]
+    if language == 'java':
+        # The heap gets half the memory limit, leaving the rest to the JVM itself, and the runner recycles at half the heap
+        return ['java', f"-Xmx{config['JUDGE_MEMORY_LIMIT_MB'] // 2}m", '-XX:+UseSerialGC', JUDGE_HOST,
+                '--max-jobs', str(config['JUDGE_RUNNER_MAX_JOBS']),
+                '--recycle-heap-mb', str(config['JUDGE_MEMORY_LIMIT_MB'] // 4)]
+    return None
+
+"""
+Keeps started runners for one language ready, so a submission takes one without waiting for interpreter startup. Runners are handed out once and never returned; the pool starts replacements in the background.
+Inputs: app (Flask application), args (runner command), size (number of idle runners to keep), scratch_root (directory the runners' workspaces are created in)
+Outputs: RunnerPool instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class RunnerPool:
+    def __init__(self, app, args, size, scratch_root):
+        self.app = app
+        self.args = args
+        self.size = size
+        self.scratch_root = scratch_root
+        self.idle = deque()
+        self.lock = threading.Lock()
+        self.refilling = False
+
+    # Starts a runner in the sandbox with a workspace of its own, which is the only host directory it can see besides the runtimes and the runner scripts; the sandbox run ends and the workspace is removed when the runner is closed.
+    def start(self):
+        stack = ExitStack()
+        try:
+            workspace = tempfile.mkdtemp(prefix='leetle-runner-', dir=self.scratch_root)
+            stack.callback(shutil.rmtree, workspace, ignore_errors=True)
+            run = stack.enter_context(get_sandbox().launch(self.args, workspace=workspace,
+                                                           read_only=[os.path.dirname(__file__)]))
+            return RunnerProcess(run.args, cwd=workspace, sandbox_run=run, cleanup=stack.close, workspace=workspace)
+        except BaseException:
+            stack.close()
+            raise
+
+    # Hands out an idle runner, or starts one when none is ready, and tops the pool back up in the background.
+    def checkout(self):
+        runner = None
+        with self.lock:
+            while self.idle and runner is None:
+                candidate = self.idle.popleft()
+                if candidate.proc.poll() is None:
+                    runner = candidate
+                else:
+                    candidate.close()
+            if self.size > 0 and not self.refilling:
+                self.refilling = True
+                threading.Thread(target=self.refill, name='leetle-runner-pool', daemon=True).start()
+        return runner or self.start()
+
+    def refill(self):
+        try:
+            with self.app.app_context():
+                while True:
+                    with self.lock:
+                        if len(self.idle) >= self.size:
+                            return
+                    runner = self.start()
+                    with self.lock:
+                        self.idle.append(runner)
+        except (RunnerError, OSError) as e:
+            self.app.logger.warning('Could not start a warm runner: %s', e)
+        finally:
+            with self.lock:
+                self.refilling = False
+
+    # Stops the idle runners.
+    def close(self):
+        with self.lock:
+            runners, self.idle = list(self.idle), deque()
+        for runner in runners:
+            runner.close()
+
+"""
+Returns the runner pool for a language in the current application, creating it on first use.
+Inputs: language (string)
+Outputs: RunnerPool instance, or None when the language has no warm runner
+Contributors: Jay Patel, Tej Gumaste
+"""
+def get_runner_pool(language):
+    from ..judge import get_scratch_root
+    pools = current_app.extensions.setdefault('leetle_runner_pools', {})
+    if language not in pools:
+        args = runner_command(language, current_app.config)
+        pool = None
+        if args is not None:
+            pool = RunnerPool(current_app._get_current_object(), args, current_app.config['JUDGE_WARM_POOL_SIZE'],
+                              get_scratch_root())
+        pools.setdefault(language, pool)
+    return pools[language]
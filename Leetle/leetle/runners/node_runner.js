@@ -0,0 +1,453 @@
+/*
+ * This file is the Node.js warm runner. The judge starts it ahead of time, inside the sandbox, and hands it one
+ * JavaScript submission, whose test cases then run without paying Node startup each time:
+ *
+ *     node --max-old-space-size=256 node_runner.js --max-jobs 200 --recycle-heap-mb 128
+ *
+ * Each test case runs in a fresh vm context with its own globals, so nothing one case defines is seen by the next.
+ * The context provides what judged programs use: console, process (argv, env, exit, stdout, stderr, stdin events),
+ * require('fs').readFileSync for stdin, require('readline') line events and async iteration, timers, and pure
+ * built-in modules. A program that reaches for anything else gets an 'unsupported' result and the judge runs it as
+ * a plain node process instead. Synchronous code is stopped at the time limit by vm's timeout, and the heap is
+ * capped by --max-old-space-size. After --max-jobs cases, or once the heap has grown past --recycle-heap-mb, the
+ * runner reports that it is recycling and exits, and the judge continues on a fresh one.
+ *
+ * Requests and results are newline-delimited JSON on stdin and stdout, in the format documented in
+ * leetle/runners/__init__.py.
+ * Authors: Jay Patel and Tej Gumaste
+ */
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const util = require('util');
+const vm = require('vm');
+
+// Built-in modules without side effects outside the program, returned as they are
+const PURE_MODULES = new Set(['assert', 'buffer', 'crypto', 'events', 'string_decoder', 'util']);
+// Bytes of stderr kept for the result
+const STDERR_LIMIT = 65536;
+
+/*
+ * Returns the value of a command-line option.
+ * Inputs: name (string), fallback (value used when the option is absent)
+ * Outputs: value (string or fallback)
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+function option(name, fallback) {
+    const index = process.argv.indexOf(name);
+    return index >= 0 ? process.argv[index + 1] : fallback;
+}
+
+const MAX_JOBS = Number(option('--max-jobs', 200));
+const RECYCLE_HEAP_BYTES = Number(option('--recycle-heap-mb', 128)) * 1024 * 1024;
+
+// Thrown into the program to stop it; the judge never sees these as program errors
+class Unsupported extends Error {}
+class ExitSignal {
+    constructor(code) {
+        this.code = code;
+    }
+}
+class OutputLimitSignal {}
+
+/*
+ * Writes one message to the judge. stdout is a pipe that may be non-blocking, so short writes are retried.
+ * Inputs: message (object)
+ * Outputs: None
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+function send(message) {
+    let data = Buffer.from(JSON.stringify(message) + '\n');
+    while (data.length) {
+        try {
+            data = data.subarray(fs.writeSync(1, data));
+        } catch (error) {
+            if (error.code !== 'EAGAIN') {
+                throw error;
+            }
+        }
+    }
+}
+
+/*
+ * Wraps an object so that reading a property it does not provide marks the case unsupported.
+ * Inputs: job (Job), name (string used in the error), target (object)
+ * Outputs: Proxy
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+function guarded(job, name, target) {
+    return new Proxy(target, {
+        get(object, property) {
+            if (property in object || typeof property === 'symbol' || property === 'then') {
+                return object[property];
+            }
+            throw job.unsupported(`${name}.${String(property)}`);
+        },
+    });
+}
+
+/*
+ * Minimal event source for process.stdin and readline interfaces. Listeners are recorded and called once the
+ * program's main body has finished, the way input events arrive in a real process.
+ * Inputs: job (Job)
+ * Outputs: InputEvents instance
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+class InputEvents {
+    constructor(job) {
+        this.job = job;
+        this.listeners = [];
+    }
+
+    on(event, listener) {
+        this.listeners.push([event, listener]);
+        this.job.inputPending = true;
+        return this;
+    }
+
+    emit(event, ...args) {
+        for (const [name, listener] of this.listeners) {
+            if (name === event) {
+                this.job.invoke(listener, args);
+            }
+        }
+    }
+}
+
+/*
+ * One test case: its input, the output it has produced and how it ended.
+ * Inputs: message (run request)
+ * Outputs: Job instance
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+class Job {
+    constructor(message) {
+        this.input = Buffer.from(message.input, 'base64');
+        this.outputLimit = message.output_limit;
+        this.deadline = Date.now() + message.timeout * 1000;
+        this.stdout = [];
+        this.stdoutBytes = 0;
+        this.stderr = [];
+        this.stderrBytes = 0;
+        this.status = null;
+        this.returncode = 0;
+        this.timers = new Map();
+        this.nextTimer = 0;
+        this.inputPending = false;
+        this.context = null;
+    }
+
+    // Records output, stopping the program once stdout is over its limit.
+    write(stream, chunk) {
+        if (this.status) {
+            return;
+        }
+        const data = Buffer.isBuffer(chunk) || chunk instanceof Uint8Array ? Buffer.from(chunk) : Buffer.from(String(chunk));
+        if (stream === 'stdout') {
+            this.stdoutBytes += data.length;
+            if (this.outputLimit != null && this.stdoutBytes > this.outputLimit) {
+                this.status = 'output_limit';
+                throw new OutputLimitSignal();
+            }
+            this.stdout.push(data);
+        } else if (this.stderrBytes < STDERR_LIMIT) {
+            this.stderr.push(data.subarray(0, STDERR_LIMIT - this.stderrBytes));
+            this.stderrBytes += data.length;
+        }
+    }
+
+    // Marks the case as needing a real process and returns the error to throw into the program.
+    unsupported(feature) {
+        if (!this.status) {
+            this.status = 'unsupported';
+        }
+        return new Unsupported(`${feature} is not available in the warm runner`);
+    }
+
+    // Calls into the program with the time left for the case, turning how it stops into the case's status.
+    invoke(fn, args = []) {
+        if (this.status) {
+            return;
+        }
+        const remaining = this.deadline - Date.now();
+        if (remaining <= 0) {
+            this.status = 'timeout';
+            return;
+        }
+        this.context.__leetleCall = () => fn(...args);
+        try {
+            vm.runInContext('__leetleCall()', this.context, { timeout: remaining });
+        } catch (error) {
+            this.fail(error);
+        }
+    }
+
+    // Records a program's way of stopping: an exit, a signal from the runner or an uncaught error.
+    fail(error) {
+        if (this.status) {
+            return;
+        }
+        if (error instanceof ExitSignal) {
+            this.returncode = error.code;
+            this.status = 'exited';
+        } else if (error && error.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+            this.status = 'timeout';
+        } else if (!(error instanceof OutputLimitSignal) && !(error instanceof Unsupported)) {
+            this.write('stderr', `${error && error.stack ? error.stack : util.inspect(error)}\n`);
+            this.returncode = 1;
+            this.status = 'exited';
+        }
+    }
+
+    // Starts a timer owned by the case; its callback runs like any other call into the program.
+    timer(kind, fn, delay, args) {
+        const id = ++this.nextTimer;
+        const callback = () => {
+            if (kind !== 'interval') {
+                this.timers.delete(id);
+            }
+            this.invoke(fn, args);
+        };
+        const handle = kind === 'immediate' ? setImmediate(callback)
+            : kind === 'interval' ? setInterval(callback, delay) : setTimeout(callback, delay);
+        this.timers.set(id, [kind, handle]);
+        return id;
+    }
+
+    clearTimer(id) {
+        const entry = this.timers.get(id);
+        if (entry) {
+            const [kind, handle] = entry;
+            (kind === 'immediate' ? clearImmediate : kind === 'interval' ? clearInterval : clearTimeout)(handle);
+            this.timers.delete(id);
+        }
+    }
+
+    // Stops everything the case scheduled.
+    cancel() {
+        for (const id of [...this.timers.keys()]) {
+            this.clearTimer(id);
+        }
+    }
+}
+
+/*
+ * Builds the globals and module environment for one case.
+ * Inputs: job (Job), source (path to main.js)
+ * Outputs: { globals, require, module }
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+function createEnvironment(job, source) {
+    const write = (stream) => (chunk, encoding, callback) => {
+        job.write(stream, chunk);
+        const done = typeof encoding === 'function' ? encoding : callback;
+        if (typeof done === 'function') {
+            job.timer('immediate', done, 0, []);
+        }
+        return true;
+    };
+    const print = (stream) => (...args) => job.write(stream, util.format(...args) + '\n');
+    const stdin = new InputEvents(job);
+    stdin.encoding = null;
+    stdin.setEncoding = (encoding) => {
+        stdin.encoding = encoding;
+        return stdin;
+    };
+    stdin.resume = stdin.pause = () => stdin;
+    stdin.once = stdin.addListener = stdin.on;
+
+    const readInput = (encoding) => (encoding ? job.input.toString(encoding) : Buffer.from(job.input));
+    const fsShim = guarded(job, 'fs', {
+        readFileSync(file, options) {
+            const encoding = typeof options === 'string' ? options : options && options.encoding;
+            if (file === 0 || file === '/dev/stdin') {
+                return readInput(encoding);
+            }
+            return fs.readFileSync(path.resolve(path.dirname(source), String(file)), options);
+        },
+    });
+    const readlineShim = guarded(job, 'readline', {
+        createInterface() {
+            const lines = new InputEvents(job);
+            lines.once = lines.addListener = lines.on;
+            lines.close = () => {};
+            lines.setPrompt = lines.prompt = () => {};
+            lines[Symbol.asyncIterator] = async function* () {
+                for (const line of splitLines(job.input.toString('utf8'))) {
+                    yield line;
+                }
+            };
+            stdin.lineInterfaces = (stdin.lineInterfaces || []).concat([lines]);
+            return guarded(job, 'readline.Interface', lines);
+        },
+    });
+
+    const requireShim = (name) => {
+        const bare = String(name).replace(/^node:/, '');
+        if (bare === 'fs') {
+            return fsShim;
+        }
+        if (bare === 'readline') {
+            return readlineShim;
+        }
+        if (PURE_MODULES.has(bare)) {
+            return require(bare);
+        }
+        throw job.unsupported(`require('${name}')`);
+    };
+    const processShim = guarded(job, 'process', {
+        argv: [process.execPath, source],
+        env: {},
+        platform: process.platform,
+        version: process.version,
+        versions: process.versions,
+        exitCode: undefined,
+        exit(code) {
+            throw new ExitSignal(code === undefined ? processShim.exitCode || 0 : Number(code) || 0);
+        },
+        stdout: guarded(job, 'process.stdout', { write: write('stdout'), isTTY: false }),
+        stderr: guarded(job, 'process.stderr', { write: write('stderr'), isTTY: false }),
+        stdin: guarded(job, 'process.stdin', stdin),
+        nextTick: (fn, ...args) => job.timer('immediate', fn, 0, args),
+        hrtime: process.hrtime,
+        memoryUsage: process.memoryUsage,
+        cwd: () => path.dirname(source),
+    });
+    const module = { exports: {}, id: '.', filename: source, loaded: false };
+
+    const globals = {
+        console: guarded(job, 'console', {
+            log: print('stdout'), info: print('stdout'), debug: print('stdout'),
+            error: print('stderr'), warn: print('stderr'), trace: print('stderr'),
+        }),
+        process: processShim,
+        Buffer,
+        TextEncoder,
+        TextDecoder,
+        URL,
+        URLSearchParams,
+        structuredClone,
+        queueMicrotask: (fn) => job.timer('immediate', fn, 0, []),
+        setTimeout: (fn, delay, ...args) => job.timer('timeout', fn, delay, args),
+        setInterval: (fn, delay, ...args) => job.timer('interval', fn, delay, args),
+        setImmediate: (fn, ...args) => job.timer('immediate', fn, 0, args),
+        clearTimeout: (id) => job.clearTimer(id),
+        clearInterval: (id) => job.clearTimer(id),
+        clearImmediate: (id) => job.clearTimer(id),
+    };
+    return { globals, requireShim, module, stdin };
+}
+
+/*
+ * Splits input into lines the way readline does: line breaks are removed and a trailing break adds no empty line.
+ * Inputs: text (string)
+ * Outputs: lines (array of strings)
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+function splitLines(text) {
+    const lines = text.split(/\r?\n/);
+    if (lines.length && lines[lines.length - 1] === '') {
+        lines.pop();
+    }
+    return lines;
+}
+
+// The compiled submission; a runner serves a single submission, so it is compiled once
+let compiled = null;
+
+/*
+ * Runs one test case and reports its result.
+ * Inputs: message (run request)
+ * Outputs: Promise resolving to whether the runner should now recycle itself
+ * Contributors: Jay Patel, Tej Gumaste
+ */
+async function runCase(message) {
+    const job = new Job(message);
+    const source = message.source;
+    const { globals, requireShim, module, stdin } = createEnvironment(job, source);
+    job.context = vm.createContext(globals);
+    job.context.global = vm.runInContext('globalThis', job.context);
+
+    try {
+        if (!compiled || compiled.source !== source) {
+            const code = fs.readFileSync(source, 'utf8').replace(/^#!.*/, '');
+            compiled = {
+                source,
+                script: new vm.Script(`(function (exports, require, module, __filename, __dirname) {${code}\n})`,
+                    { filename: source }),
+            };
+        }
+        const main = compiled.script.runInContext(job.context);
+        job.invoke(() => main.call(module.exports, module.exports, requireShim, module, source, path.dirname(source)));
+    } catch (error) {
+        job.fail(error);
+    }
+
+    // Input events follow the main body, then the case runs until it has nothing left scheduled
+    if (!job.status && job.inputPending) {
+        await new Promise(setImmediate);
+        const text = stdin.encoding ? job.input.toString(stdin.encoding) : job.input;
+        stdin.emit('data', text);
+        stdin.emit('end');
+        stdin.emit('close');
+        for (const lines of stdin.lineInterfaces || []) {
+            for (const line of splitLines(job.input.toString('utf8'))) {
+                lines.emit('line', line);
+            }
+            lines.emit('close');
+        }
+    }
+    while (!job.status) {
+        await new Promise(setImmediate);
+        if (Date.now() >= job.deadline) {
+            job.status = 'timeout';
+        } else if (!job.timers.size) {
+            // One more turn lets promise callbacks queued by the last timer run
+            await new Promise(setImmediate);
+            if (!job.timers.size && !job.status) {
+                job.status = 'exited';
+                job.returncode = Number(globals.process.exitCode) || 0;
+            }
+        } else {
+            await new Promise((resolve) => setTimeout(resolve, 1));
+        }
+    }
+    job.cancel();
+
+    const recycle = ++jobs >= MAX_JOBS || process.memoryUsage().heapUsed > RECYCLE_HEAP_BYTES;
+    send({
+        type: 'result',
+        status: job.status,
+        returncode: job.returncode,
+        stdout: Buffer.concat(job.stdout).toString('base64'),
+        stderr: Buffer.concat(job.stderr).toString('base64'),
+        recycle,
+    });
+    return recycle;
+}
+
+let jobs = 0;
+let pending = '';
+let queue = Promise.resolve();
+
+process.stdin.on('data', (chunk) => {
+    pending += chunk.toString('utf8');
+    let end;
+    while ((end = pending.indexOf('\n')) >= 0) {
+        const message = JSON.parse(pending.slice(0, end));
+        pending = pending.slice(end + 1);
+        if (message.type !== 'run') {
+            // Cases cannot be interrupted from outside, so a kill always arrives after its case ended
+            continue;
+        }
+        queue = queue.then(() => runCase(message)).then((recycle) => {
+            if (recycle) {
+                process.exit(0);
+            }
+        });
+    }
+});
+process.stdin.on('end', () => process.exit(0));
+
+send({ type: 'ready', pid: process.pid });
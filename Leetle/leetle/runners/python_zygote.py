@@ -0,0 +1,238 @@
+"""
+This file is the Python zygote: a warm interpreter that judges one Python submission. The judge starts it ahead of time inside the sandbox, keeps it idle until a submission arrives and discards it once that submission is judged:
+
+    python3 python_zygote.py
+
+It imports the modules submissions commonly use, then forks a fresh child for every test case of the submission named in the run requests. The child starts from the zygote's clean state, so nothing one case does is seen by the next, and runs the submission as __main__ with the case's input as stdin. Requests and results are newline-delimited JSON on the zygote's stdin and stdout, in the format of leetle/protocol.py; the child's output is streamed back as it arrives so the judge can stop a wrong answer early. It runs under the system python3 and must only use the standard library.
+Authors: Jay Patel and Tej Gumaste
+"""
+import atexit
+import base64
+import gc
+import importlib
+import json
+import os
+import selectors
+import signal
+import sys
+import time
+import traceback
+import types
+
+# Imported once here instead of by every test case
+PRELOADED_MODULES = ('sys', 'json', 'ast', 'collections', 'heapq', 'bisect', 'math', 'itertools', 'functools', 're',
+                     'string')
+# Bytes of a child's stderr kept for the result; the rest is read and dropped
+STDERR_LIMIT = 65536
+
+"""
+Reads newline-delimited JSON messages from a file descriptor without blocking on partial lines, so control messages can be read alongside a running child's pipes.
+Inputs: fd (readable file descriptor)
+Outputs: ControlReader instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class ControlReader:
+    def __init__(self, fd):
+        self.fd = fd
+        self.buffer = bytearray()
+        self.closed = False
+
+    # Reads what is available and returns the complete messages received so far.
+    def read(self):
+        chunk = os.read(self.fd, 1 << 20)
+        if not chunk:
+            self.closed = True
+        self.buffer += chunk
+        messages = []
+        while True:
+            end = self.buffer.find(b'\n')
+            if end < 0:
+                return messages
+            messages.append(json.loads(self.buffer[:end]))
+            del self.buffer[:end + 1]
+
+"""
+Writes one message to the judge.
+Inputs: fd (writable file descriptor), message (dictionary)
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def send(fd, message):
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+    while data:
+        data = data[os.write(fd, data):]
+
+"""
+Runs the submission in a forked child, the way `python3 main.py` would, and exits the child with its status. Never returns.
+Inputs: source_path (string), input_fd, stdout_fd, stderr_fd (file descriptors)
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def run_child(source_path, input_fd, stdout_fd, stderr_fd):
+    status = 1
+    try:
+        # Leads its own process group, so the zygote can kill it together with anything it starts
+        os.setsid()
+        os.dup2(input_fd, 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        # Drops the zygote's control channel and every other descriptor
+        os.closerange(3, os.sysconf('SC_OPEN_MAX'))
+        sys.stdin = sys.__stdin__ = open(0, 'r', closefd=False)
+        sys.stdout = sys.__stdout__ = open(1, 'w', closefd=False)
+        sys.stderr = sys.__stderr__ = open(2, 'w', buffering=1, errors='backslashreplace', closefd=False)
+        sys.argv = [source_path]
+        gc.unfreeze()
+
+        module = types.ModuleType('__main__')
+        module.__file__ = source_path
+        module.__builtins__ = __builtins__
+        sys.modules['__main__'] = module
+        try:
+            with open(source_path, 'rb') as f:
+                code = compile(f.read(), source_path, 'exec')
+            exec(code, module.__dict__)
+            status = 0
+        except SystemExit as e:
+            if e.code is None:
+                status = 0
+            elif isinstance(e.code, int):
+                status = e.code
+            else:
+                print(e.code, file=sys.stderr)
+        except BaseException:
+            traceback.print_exc()
+        atexit._run_exitfuncs()
+        try:
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            pass
+        sys.stderr.flush()
+    finally:
+        os._exit(status & 0xff)
+
+"""
+Kills a child's process group and, when the zygote is PID 1 of the sandbox's PID namespace, every other process left in it, so nothing a test case started survives into the next one.
+Inputs: pid (integer)
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def kill_case(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    if os.getpid() != 1:
+        return
+    for entry in os.listdir('/proc'):
+        if entry.isdigit() and entry != '1':
+            try:
+                os.kill(int(entry), signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+"""
+Runs one test case in a forked child and reports its output and how it ended. The child is stopped when it exceeds the time limit, when its stdout exceeds output_limit, or when the judge sends a kill message because the output was wrong.
+Inputs: request (run message), control (ControlReader), out_fd (file descriptor for replies)
+Outputs: None (sends output and result messages)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def run_case(request, control, out_fd):
+    source_path = request['source']
+    timeout = request['timeout']
+    output_limit = request.get('output_limit')
+    input_fd = os.memfd_create('stdin')
+    os.write(input_fd, base64.b64decode(request['input']))
+    os.lseek(input_fd, 0, os.SEEK_SET)
+    stdout_read, stdout_write = os.pipe()
+    stderr_read, stderr_write = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        run_child(source_path, input_fd, stdout_write, stderr_write)
+    deadline = time.monotonic() + timeout
+    for fd in (input_fd, stdout_write, stderr_write):
+        os.close(fd)
+
+    stderr = bytearray()
+    stdout_bytes = 0
+    status = None
+    with selectors.DefaultSelector() as selector:
+        selector.register(stdout_read, selectors.EVENT_READ)
+        selector.register(stderr_read, selectors.EVENT_READ)
+        selector.register(control.fd, selectors.EVENT_READ)
+        while len(selector.get_map()) > 1 and status is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                status = 'timeout'
+                break
+            for key, _ in selector.select(remaining):
+                if key.fd == control.fd:
+                    if any(message.get('type') == 'kill' for message in control.read()) or control.closed:
+                        status = 'mismatch'
+                    continue
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    selector.unregister(key.fd)
+                elif key.fd == stderr_read:
+                    stderr += chunk[:STDERR_LIMIT - len(stderr)]
+                else:
+                    stdout_bytes += len(chunk)
+                    if output_limit is not None and stdout_bytes > output_limit:
+                        status = 'output_limit'
+                        break
+                    send(out_fd, {'type': 'output', 'data': base64.b64encode(chunk).decode('ascii')})
+
+    # Also reaps anything the program left running in the background
+    kill_case(pid)
+    os.close(stdout_read)
+    os.close(stderr_read)
+    _, wait_status = os.waitpid(pid, 0)
+    while True:
+        try:
+            if os.waitpid(-1, os.WNOHANG)[0] == 0:
+                break
+        except ChildProcessError:
+            break
+    send(out_fd, {'type': 'result', 'status': status or 'exited', 'returncode': os.waitstatus_to_exitcode(wait_status),
+                  'stderr': base64.b64encode(bytes(stderr)).decode('ascii')})
+
+"""
+Zygote entry point: preloads modules, reports ready and serves run requests until the judge closes stdin.
+Inputs: None
+Outputs: None
+Contributors: Jay Patel, Tej Gumaste
+"""
+def main():
+    # The control channel moves off 0 and 1, which become the children's stdio
+    control = ControlReader(os.dup(0))
+    out_fd = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    for name in PRELOADED_MODULES:
+        importlib.import_module(name)
+    # Keeps the garbage collector from touching, and so copying, the preloaded objects in every child
+    gc.collect()
+    gc.freeze()
+    send(out_fd, {'type': 'ready', 'pid': os.getpid()})
+
+    pending = []
+    while True:
+        while not pending:
+            if control.closed:
+                return
+            # A kill that arrives after its case already ended is stale
+            pending = [message for message in control.read() if message.get('type') == 'run']
+        request = pending.pop(0)
+        # Runs and imports resolve as for `python3 main.py` in the workspace, from the submission's directory first
+        workspace = os.path.dirname(request['source'])
+        if sys.path[0] != workspace:
+            os.chdir(workspace)
+            sys.path[0] = workspace
+        run_case(request, control, out_fd)
+
+if __name__ == '__main__':
+    main()
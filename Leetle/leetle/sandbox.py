@@ -0,0 +1,288 @@
+"""
+This file isolates judged programs. The 'process' backend runs them as ordinary child processes, as the judge always has. The 'namespaces' backend starts each run in fresh user, PID, network, mount, IPC and UTS namespaces with every capability dropped and no_new_privs set, under CPU-time, file-size and core-dump limits. Inside its mount namespace the run pivots into a minimal root: the language runtimes read-only, a fresh /proc, the null and random devices, a private /tmp, and only its own workspace writable, so the application directory, the instance directory and the rest of the host filesystem do not exist for it. Its environment is reduced to PATH, locale and runtime variables, so no secrets are inherited. Without cgroups, memory is capped with an address-space (or, for runtimes that reserve far more than they use, data-segment) rlimit. When a delegated cgroup v2 directory is configured, each run also gets its own cgroup, which enforces memory, CPU and process-count quotas and reports what the run actually used. Only the util-linux tools unshare, setpriv and prlimit are needed, so there is no container daemon and setup costs a few milliseconds.
+Authors: Tej Gumaste and Jay Patel
+"""
+import atexit
+import glob
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import current_app
+
+SANDBOX_BACKENDS = ('process', 'namespaces')
+SANDBOX_TOOLS = ('unshare', 'setpriv', 'prlimit', 'mount', 'umount', 'pivot_root', 'env')
+CGROUP_CONTROLLERS = ('cpu', 'memory', 'pids')
+CGROUP_CPU_PERIOD_USEC = 100000
+
+# New namespaces for everything but time and cgroups; --kill-child takes the whole PID namespace down with its init
+NAMESPACE_ARGS = ['unshare', '--user', '--map-root-user', '--pid', '--kill-child', '--net', '--mount', '--ipc', '--uts',
+                  '--']
+# Host paths mounted read-only into every run's root (globs allowed); the interpreter's own install prefix is added per run
+ROOT_PATHS = ('/usr', '/bin', '/sbin', '/lib', '/lib32', '/lib64', '/libx32', '/etc/alternatives', '/etc/ld.so.cache',
+              '/etc/ld.so.conf', '/etc/ld.so.conf.d', '/etc/localtime', '/etc/java-*')
+# Environment passed through to the program; everything else, including any secrets, is dropped
+ENV_KEEP = ('PATH', 'LANG', 'LC_ALL', 'JAVA_HOME', 'PYENV_ROOT', 'PYENV_VERSION')
+# Runtimes that reserve much more address space than they use; they are capped by data segment size instead
+DATA_LIMITED_COMMANDS = ('node', 'java', 'javac')
+# The directory holding this package, which no run may see
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Runs as root of the new user and mount namespaces, before the capability drop: builds the run's root on a tmpfs at $1,
+# pivots into it and starts the command in its working directory. $2 is the workspace bound read-write (may be empty),
+# $3 the working directory, $4 the colon-separated read-only paths and $5 the size of /tmp in bytes.
+ROOT_SCRIPT = '''set -e -f
+root=$1 workspace=$2 workdir=$3 paths=$4 tmp_size=$5
+shift 5
+mount -t tmpfs -o size=1m,mode=755 leetle-root "$root"
+IFS=:
+for path in $paths; do
+    if [ -L "$path" ]; then
+        mkdir -p "$root${path%/*}"
+        ln -s "$(readlink "$path")" "$root$path"
+        continue
+    elif [ -d "$path" ]; then
+        mkdir -p "$root$path"
+    elif [ -e "$path" ]; then
+        mkdir -p "$root${path%/*}"
+        : > "$root$path"
+    else
+        continue
+    fi
+    mount --rbind "$path" "$root$path"
+    mount -o remount,bind,ro,nosuid,nodev "$root$path"
+done
+unset IFS
+mkdir -p "$root/dev" "$root/proc" "$root/tmp"
+for device in null zero full random urandom; do
+    : > "$root/dev/$device"
+    mount --bind "/dev/$device" "$root/dev/$device"
+done
+mount -t proc -o nosuid,nodev,noexec proc "$root/proc"
+mount -t tmpfs -o "size=$tmp_size,mode=1777,nosuid,nodev" leetle-tmp "$root/tmp"
+if [ -n "$workspace" ]; then
+    mkdir -p "$root$workspace"
+    mount --bind "$workspace" "$root$workspace"
+fi
+cd "$root"
+mkdir .old
+pivot_root . .old
+umount -l /.old
+rmdir /.old
+cd "$workdir"
+exec "$@"'''
+# The program is root only inside its user namespace, and even there it holds no capabilities and cannot regain any
+PRIVILEGE_ARGS = ['setpriv', '--no-new-privs', '--inh-caps=-all', '--bounding-set=-all', '--']
+# Joins the run's cgroup before anything else starts, so every descendant is limited and accounted there
+CGROUP_JOIN_SCRIPT = 'echo $$ > "$0/cgroup.procs" && exec "$@"'
+
+"""
+One sandboxed execution: the command to start and, once the run has finished, what it used.
+Inputs: args (list of strings), cgroup (optional directory of the run's cgroup)
+Outputs: SandboxRun instance (cpu_seconds, memory_peak and oom_killed are filled in only with cgroup limits)
+Contributors: Tej Gumaste, Jay Patel
+"""
+class SandboxRun:
+    def __init__(self, args, cgroup=None):
+        self.args = args
+        self.cgroup = cgroup
+        self.cpu_seconds = None
+        self.memory_peak = None
+        self.oom_killed = False
+
+    # Reads what the run has used so far from its cgroup, for long-lived runs such as warm runners that need it before they exit.
+    def read_usage(self):
+        if self.cgroup is not None:
+            self.cpu_seconds, self.memory_peak, self.oom_killed = read_cgroup_usage(self.cgroup)
+        return self
+
+"""
+Builds sandboxed commands for one backend and owns the per-run cgroups.
+Inputs: backend (string), cgroup_root (optional delegated cgroup v2 directory), memory_limit_mb, cpu_limit (cores), pids_limit, cpu_time_limit (seconds), file_size_limit_mb, read_only_paths (extra host paths visible to every run)
+Outputs: Sandbox instance; raises ValueError for an unknown backend and RuntimeError when the host cannot provide it
+Contributors: Tej Gumaste, Jay Patel
+"""
+class Sandbox:
+    def __init__(self, backend='process', cgroup_root=None, memory_limit_mb=256, cpu_limit=1.0, pids_limit=128,
+                 cpu_time_limit=10, file_size_limit_mb=16, read_only_paths=()):
+        if backend not in SANDBOX_BACKENDS:
+            raise ValueError(f"Unknown sandbox backend '{backend}'")
+        self.backend = backend
+        self.cgroup_root = cgroup_root
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_limit = cpu_limit
+        self.pids_limit = pids_limit
+        self.cpu_time_limit = cpu_time_limit
+        self.file_size_limit_mb = file_size_limit_mb
+        if backend == 'namespaces':
+            missing = [tool for tool in SANDBOX_TOOLS if shutil.which(tool) is None]
+            if missing:
+                raise RuntimeError(f"The namespaces sandbox needs {', '.join(missing)} (util-linux)")
+            if cgroup_root:
+                self.enable_cgroup_controllers()
+            self.root_paths = [path for pattern in ROOT_PATHS + tuple(read_only_paths)
+                               for path in sorted(glob.glob(pattern))]
+
+    # Checks that the cgroup root is a cgroup v2 directory offering the needed controllers and enables them for its children. The root must be delegated to the server user and hold no processes itself.
+    def enable_cgroup_controllers(self):
+        try:
+            with open(os.path.join(self.cgroup_root, 'cgroup.controllers')) as f:
+                available = f.read().split()
+        except OSError:
+            raise RuntimeError(f'{self.cgroup_root} is not a cgroup v2 directory')
+        missing = [name for name in CGROUP_CONTROLLERS if name not in available]
+        if missing:
+            raise RuntimeError(f"cgroup {self.cgroup_root} does not offer the {', '.join(missing)} controllers")
+        with open(os.path.join(self.cgroup_root, 'cgroup.subtree_control'), 'w') as f:
+            f.write(' '.join('+' + name for name in CGROUP_CONTROLLERS))
+
+    # Returns the command wrapped in rlimits, namespaces, the minimal root, a clean environment and the capability drop. The workspace, if given, is the only writable host directory and the working directory; read_only adds host paths for this run.
+    def wrap(self, args, workspace=None, read_only=()):
+        limits = ['prlimit', f'--cpu={self.cpu_time_limit}', f'--fsize={self.file_size_limit_mb * 1024 * 1024}',
+                  '--core=0']
+        if not self.cgroup_root:
+            # Without a cgroup the rlimit is the only memory limit
+            resource = 'data' if os.path.basename(args[0]) in DATA_LIMITED_COMMANDS else 'as'
+            limits.append(f'--{resource}={self.memory_limit_mb * 1024 * 1024}')
+        paths = self.root_paths + runtime_paths(args[0], self.root_paths) + list(read_only)
+        root = ['sh', '-c', ROOT_SCRIPT, 'leetle-sandbox', get_root_mountpoint(), workspace or '', workspace or '/tmp',
+                ':'.join(paths), str(self.file_size_limit_mb * 1024 * 1024)]
+        env = ['env', '-i', 'HOME=/tmp', 'TMPDIR=/tmp'] + [f'{name}={os.environ[name]}' for name in ENV_KEEP
+                                                          if name in os.environ]
+        return limits + ['--'] + NAMESPACE_ARGS + root + PRIVILEGE_ARGS + env + list(args)
+
+    # Context manager yielding a SandboxRun for the command. With cgroup limits the run's cgroup is created first and, after the block, its usage is recorded and the cgroup and anything left in it are removed.
+    @contextmanager
+    def launch(self, args, workspace=None, read_only=()):
+        if self.backend == 'process':
+            yield SandboxRun(list(args))
+            return
+        if not self.cgroup_root:
+            yield SandboxRun(self.wrap(args, workspace, read_only))
+            return
+
+        cgroup = os.path.join(self.cgroup_root, f'run-{uuid.uuid4().hex}')
+        os.mkdir(cgroup)
+        try:
+            write_cgroup_file(cgroup, 'memory.max', str(self.memory_limit_mb * 1024 * 1024))
+            write_cgroup_file(cgroup, 'memory.swap.max', '0')
+            write_cgroup_file(cgroup, 'cpu.max', f'{int(self.cpu_limit * CGROUP_CPU_PERIOD_USEC)} {CGROUP_CPU_PERIOD_USEC}')
+            write_cgroup_file(cgroup, 'pids.max', str(self.pids_limit))
+            run = SandboxRun(['sh', '-c', CGROUP_JOIN_SCRIPT, cgroup] + self.wrap(args, workspace, read_only), cgroup)
+            yield run
+            run.read_usage()
+        finally:
+            remove_cgroup(cgroup)
+
+"""
+Returns the empty directory every namespaces run mounts its root over inside its private mount namespace. It is created once per process and removed at exit.
+Inputs: None
+Outputs: path (string)
+Contributors: Tej Gumaste, Jay Patel
+"""
+def get_root_mountpoint():
+    global _root_mountpoint
+    with _root_mountpoint_lock:
+        if _root_mountpoint is None or not os.path.isdir(_root_mountpoint):
+            _root_mountpoint = tempfile.mkdtemp(prefix='leetle-sandbox-root-')
+            atexit.register(shutil.rmtree, _root_mountpoint, ignore_errors=True)
+        return _root_mountpoint
+
+_root_mountpoint = None
+_root_mountpoint_lock = threading.Lock()
+
+"""
+Returns the install prefix of a command that lives outside the standard root paths, such as a pyenv or /opt runtime, so that it can be mounted read-only for the run. A prefix that would contain the application directory is narrowed to the command's own directory.
+Inputs: command (program name or path), root_paths (list of paths already mounted)
+Outputs: paths (list of strings)
+Contributors: Tej Gumaste, Jay Patel
+"""
+def runtime_paths(command, root_paths):
+    found = shutil.which(command)
+    if found is None:
+        return []
+    paths = []
+    for executable in dict.fromkeys((os.path.abspath(found), os.path.realpath(found))):
+        if any(executable == root or executable.startswith(root.rstrip('/') + '/') for root in root_paths):
+            continue
+        prefix = os.path.dirname(os.path.dirname(executable))
+        if prefix == '/' or APP_DIR == prefix or APP_DIR.startswith(prefix.rstrip('/') + '/'):
+            prefix = os.path.dirname(executable)
+        paths.append(prefix)
+    return paths
+
+"""
+Writes a cgroup interface file, skipping files the kernel does not provide (e.g. memory.swap.max without swap accounting).
+Inputs: cgroup (directory path), name (string), value (string)
+Outputs: None
+Contributors: Tej Gumaste, Jay Patel
+"""
+def write_cgroup_file(cgroup, name, value):
+    path = os.path.join(cgroup, name)
+    if os.path.exists(path):
+        with open(path, 'w') as f:
+            f.write(value)
+
+"""
+Reads a run's CPU time, peak memory and whether the kernel killed it for exceeding memory.max.
+Inputs: cgroup (directory path)
+Outputs: cpu_seconds (float or None), memory_peak (bytes or None), oom_killed (boolean)
+Contributors: Tej Gumaste, Jay Patel
+"""
+def read_cgroup_usage(cgroup):
+    stats = {}
+    for name in ('cpu.stat', 'memory.events'):
+        try:
+            with open(os.path.join(cgroup, name)) as f:
+                stats.update(line.split() for line in f if line.strip())
+        except OSError:
+            pass
+    try:
+        with open(os.path.join(cgroup, 'memory.peak')) as f:
+            memory_peak = int(f.read())
+    except (OSError, ValueError):
+        memory_peak = None
+    cpu_seconds = int(stats['usage_usec']) / 1e6 if 'usage_usec' in stats else None
+    return cpu_seconds, memory_peak, int(stats.get('oom_kill', 0)) > 0
+
+"""
+Kills whatever is left in a run's cgroup and removes it. The directory only disappears once its processes have exited, so removal is retried briefly.
+Inputs: cgroup (directory path)
+Outputs: None
+Contributors: Tej Gumaste, Jay Patel
+"""
+def remove_cgroup(cgroup):
+    write_cgroup_file(cgroup, 'cgroup.kill', '1')
+    for _ in range(100):
+        try:
+            os.rmdir(cgroup)
+            return
+        except FileNotFoundError:
+            return
+        except OSError:
+            time.sleep(0.01)
+    current_app.logger.warning('Could not remove sandbox cgroup %s', cgroup)
+
+"""
+Returns the sandbox for the current application, creating it from the JUDGE_SANDBOX settings on first use.
+Inputs: None (uses current_app.config)
+Outputs: Sandbox instance
+Contributors: Tej Gumaste, Jay Patel
+"""
+def get_sandbox():
+    sandbox = current_app.extensions.get('leetle_sandbox')
+    if sandbox is None:
+        config = current_app.config
+        sandbox = current_app.extensions['leetle_sandbox'] = Sandbox(
+            backend=config['JUDGE_SANDBOX'],
+            cgroup_root=config.get('JUDGE_CGROUP_ROOT'),
+            memory_limit_mb=config['JUDGE_MEMORY_LIMIT_MB'],
+            cpu_limit=config['JUDGE_CPU_LIMIT'],
+            pids_limit=config['JUDGE_PIDS_LIMIT'],
+            cpu_time_limit=config['JUDGE_CPU_TIME_LIMIT'],
+            read_only_paths=config['JUDGE_SANDBOX_READ_ONLY_PATHS'],
+        )
+    return sandbox
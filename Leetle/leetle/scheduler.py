@@ -0,0 +1,181 @@
+"""
+This file admits and schedules code execution. A worker process runs at most JUDGE_MAX_CONCURRENT submissions at once. Each user may have at most JUDGE_MAX_PER_USER submissions running or waiting in that process, and waiting submissions are served round-robin across users, so one user's burst cannot starve everyone else. A full queue, a user over their limit, or a wait longer than JUDGE_QUEUE_TIMEOUT is rejected with an estimated retry delay instead of piling up behind the judge. Every limit here is per process, so an instance allows up to its worker count times each of them; gunicorn.conf.py sizes them by dividing instance-wide budgets between the workers.
+Authors: Jay Patel and Tej Gumaste
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from flask import current_app
+
+"""
+Raised when a submission cannot be admitted. retry_after is a whole number of seconds suitable for a Retry-After header.
+Inputs: retry_after (integer seconds), reason (string: 'user', 'queue' or 'timeout')
+Outputs: SchedulerOverloaded exception
+Contributors: Jay Patel, Tej Gumaste
+"""
+class SchedulerOverloaded(Exception):
+    def __init__(self, retry_after, reason):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+"""
+Returns the given percentile of a list of samples, or None when there are none.
+Inputs: samples (list of floats), percent (number from 0 to 100)
+Outputs: value (float or None)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def percentile(samples, percent):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+"""
+Concurrency limiter with per-user limits and a round-robin queue across users. Each waiting submission holds an Event that the releasing thread sets when it hands over its slot.
+Inputs: max_concurrent, max_per_user, max_queue_depth (integers), queue_timeout (seconds), metrics_window (number of recent samples kept)
+Outputs: ExecutionScheduler instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class ExecutionScheduler:
+    def __init__(self, max_concurrent, max_per_user, max_queue_depth, queue_timeout, metrics_window=1000):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.lock = threading.Lock()
+        self.running = 0
+        self.queued = 0
+        # Submissions running or waiting per user
+        self.user_counts = {}
+        # Waiting submissions per user; the first user is served next and then moved to the back
+        self.queues = OrderedDict()
+        self.counters = {'admitted': 0, 'completed': 0, 'rejected_user': 0, 'rejected_queue': 0, 'rejected_timeout': 0}
+        self.queue_times = deque(maxlen=metrics_window)
+        self.run_times = deque(maxlen=metrics_window)
+
+    # Context manager that holds an execution slot for the block and yields the time spent waiting for it.
+    @contextmanager
+    def slot(self, user_id):
+        queue_time = self.acquire(user_id)
+        started = time.monotonic()
+        try:
+            yield queue_time
+        finally:
+            self.release(user_id, time.monotonic() - started)
+
+    # Takes a slot immediately when one is free and nobody is waiting, otherwise waits in the user's queue. Raises SchedulerOverloaded when the submission is not admitted.
+    def acquire(self, user_id):
+        enqueued = time.monotonic()
+        with self.lock:
+            if self.user_counts.get(user_id, 0) >= self.max_per_user:
+                self.counters['rejected_user'] += 1
+                raise SchedulerOverloaded(self.estimate_wait(), 'user')
+            if self.running < self.max_concurrent and not self.queued:
+                self.running += 1
+                self.user_counts[user_id] = self.user_counts.get(user_id, 0) + 1
+                self.counters['admitted'] += 1
+                self.queue_times.append(0.0)
+                return 0.0
+            if self.queued >= self.max_queue_depth:
+                self.counters['rejected_queue'] += 1
+                raise SchedulerOverloaded(self.estimate_wait(), 'queue')
+            ticket = threading.Event()
+            self.queues.setdefault(user_id, deque()).append(ticket)
+            self.queued += 1
+            self.user_counts[user_id] = self.user_counts.get(user_id, 0) + 1
+
+        ticket.wait(self.queue_timeout)
+        with self.lock:
+            # Checked under the lock, since a slot may be handed over just as the wait times out
+            if not ticket.is_set():
+                tickets = self.queues[user_id]
+                tickets.remove(ticket)
+                if not tickets:
+                    del self.queues[user_id]
+                self.queued -= 1
+                self.decrement_user(user_id)
+                self.counters['rejected_timeout'] += 1
+                raise SchedulerOverloaded(self.estimate_wait(), 'timeout')
+            queue_time = time.monotonic() - enqueued
+            self.counters['admitted'] += 1
+            self.queue_times.append(queue_time)
+            return queue_time
+
+    # Returns a slot, records the run time and hands the slot to the next waiting user.
+    def release(self, user_id, run_time):
+        with self.lock:
+            self.running -= 1
+            self.decrement_user(user_id)
+            self.counters['completed'] += 1
+            self.run_times.append(run_time)
+            while self.running < self.max_concurrent and self.queues:
+                next_user, tickets = next(iter(self.queues.items()))
+                ticket = tickets.popleft()
+                if tickets:
+                    self.queues.move_to_end(next_user)
+                else:
+                    del self.queues[next_user]
+                self.queued -= 1
+                self.running += 1
+                ticket.set()
+
+    # Drops one submission from a user's count. Called with the lock held.
+    def decrement_user(self, user_id):
+        if self.user_counts[user_id] <= 1:
+            del self.user_counts[user_id]
+        else:
+            self.user_counts[user_id] -= 1
+
+    # Estimates how long until a new submission would be admitted, from the recent average run time and the queue length. Called with the lock held.
+    def estimate_wait(self):
+        if not self.run_times:
+            return 1
+        average = sum(self.run_times) / len(self.run_times)
+        return min(60, max(1, math.ceil(average * (self.queued + 1) / self.max_concurrent)))
+
+    # Returns current occupancy, counters and queue/run time percentiles over the recent window.
+    def snapshot(self):
+        with self.lock:
+            queue_times = list(self.queue_times)
+            run_times = list(self.run_times)
+            return {
+                'running': self.running,
+                'queued': self.queued,
+                'waiting_users': len(self.queues),
+                'max_concurrent': self.max_concurrent,
+                'max_per_user': self.max_per_user,
+                'max_queue_depth': self.max_queue_depth,
+                **self.counters,
+                'queue_time': {'p50': percentile(queue_times, 50), 'p95': percentile(queue_times, 95),
+                               'max': max(queue_times, default=None)},
+                'run_time': {'p50': percentile(run_times, 50), 'p95': percentile(run_times, 95),
+                             'max': max(run_times, default=None)},
+            }
+
+# Serializes first-use creation, so concurrent first submissions cannot each build a scheduler and split the limits
+scheduler_lock = threading.Lock()
+
+"""
+Returns the execution scheduler for the current application, creating it from the JUDGE_* settings on first use. Each worker process gets its own, so its limits apply per process.
+Inputs: None (uses current_app.config)
+Outputs: ExecutionScheduler instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+def get_scheduler():
+    scheduler = current_app.extensions.get('leetle_scheduler')
+    if scheduler is None:
+        with scheduler_lock:
+            scheduler = current_app.extensions.get('leetle_scheduler')
+            if scheduler is None:
+                config = current_app.config
+                scheduler = current_app.extensions['leetle_scheduler'] = ExecutionScheduler(
+                    max_concurrent=config['JUDGE_MAX_CONCURRENT'],
+                    max_per_user=config['JUDGE_MAX_PER_USER'],
+                    max_queue_depth=config['JUDGE_QUEUE_DEPTH'],
+                    queue_timeout=config['JUDGE_QUEUE_TIMEOUT'],
+                )
+    return scheduler
@@ -0,0 +1,318 @@
+"""
+This file loads problems and achievements from JSON or YAML definition files into the database and provides the `flask leetle` commands that run it. Rows are matched by title (problems) or name (achievements) and carry a hash of their definition, so re-running an import only writes what changed.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import hashlib
+import json
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from .comparators import validate_comparator
+from .database import db, upgrade_schema
+from .models import Achievement, Problem, User
+from .testcases import collect_orphaned_blobs, encode_test_cases
+
+# Definitions shipped with the repository, used by `flask leetle seed`
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'seed')
+DEFINITION_EXTENSIONS = ('.json', '.yaml', '.yml')
+# Admin password used by `seed` under TESTING when LEETLE_ADMIN_PASSWORD is unset; never used otherwise
+TESTING_ADMIN_PASSWORD = 'admin123'
+
+"""
+Raised when a definition file cannot be parsed or a definition is missing required fields.
+Inputs: message (string)
+Outputs: SeedError exception
+Contributors: Daniel Neugent, Jay Patel
+"""
+class SeedError(Exception):
+    pass
+
+"""
+Reads definitions from files and directories. A directory contributes every JSON/YAML file in it, in file name order, and each file may hold a single definition or a list of them.
+Inputs: paths (list of file or directory paths)
+Outputs: Iterator of (definition dictionary, source file path) pairs
+Contributors: Daniel Neugent, Jay Patel
+"""
+def read_definitions(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                     if name.lower().endswith(DEFINITION_EXTENSIONS)]
+        else:
+            files = [path]
+        for filename in files:
+            with open(filename, encoding='utf-8') as f:
+                if filename.lower().endswith(('.yaml', '.yml')):
+                    # PyYAML is only needed when a YAML file is actually imported
+                    try:
+                        import yaml
+                    except ImportError:
+                        raise SeedError(f'{filename}: reading YAML definitions needs PyYAML (pip install PyYAML)')
+                    try:
+                        data = yaml.safe_load(f)
+                    except yaml.YAMLError as e:
+                        raise SeedError(f'{filename}: {e}')
+                else:
+                    try:
+                        data = json.load(f)
+                    except ValueError as e:
+                        raise SeedError(f'{filename}: {e}')
+            for definition in data if isinstance(data, list) else [data]:
+                if not isinstance(definition, dict):
+                    raise SeedError(f'{filename}: expected an object or a list of objects')
+                yield definition, filename
+
+"""
+Validates a problem definition and converts it to Problem column values, storing test cases the same way the admin API does.
+Inputs: definition (dictionary), source (string file path for error messages)
+Outputs: values (dictionary of Problem columns)
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+def problem_values(definition, source):
+    for field in ('title', 'description', 'test_cases'):
+        if not definition.get(field):
+            raise SeedError(f'{source}: problem is missing {field}')
+    difficulty = definition.get('difficulty', 'Medium')
+    if difficulty not in ['Easy', 'Medium', 'Hard']:
+        raise SeedError(f"{source}: invalid difficulty '{difficulty}' for {definition['title']}")
+    test_cases = definition['test_cases']
+    if not isinstance(test_cases, list) or any('input' not in t or 'output' not in t for t in test_cases):
+        raise SeedError(f"{source}: test cases for {definition['title']} must be a list of input/output pairs")
+    try:
+        comparator = validate_comparator(definition.get('comparator'))
+    except ValueError as e:
+        raise SeedError(f"{source}: {definition['title']}: {e}")
+
+    return {
+        'title': definition['title'],
+        'description': definition['description'],
+        'difficulty': difficulty,
+        'input_example': definition.get('input_example', ''),
+        'output_example': definition.get('output_example', ''),
+        **encode_test_cases([{'input': str(t['input']), 'output': str(t['output'])} for t in test_cases]),
+        'comparator': comparator,
+        'hint_text': definition.get('hint_text'),
+        'full_solution': definition.get('full_solution'),
+        'is_active': definition.get('is_active', True),
+    }
+
+"""
+Validates an achievement definition and converts it to Achievement column values.
+Inputs: definition (dictionary), source (string file path for error messages)
+Outputs: values (dictionary of Achievement columns)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def achievement_values(definition, source):
+    for field in ('name', 'description', 'criteria', 'icon'):
+        if not definition.get(field):
+            raise SeedError(f'{source}: achievement is missing {field}')
+    return {
+        'name': definition['name'],
+        'description': definition['description'],
+        'criteria': json.dumps(definition['criteria']),
+        'icon': definition['icon'],
+        'points': definition.get('points', 0),
+        'is_active': definition.get('is_active', True),
+    }
+
+"""
+Computes the content hash stored with an imported row, over its column values in a canonical JSON form.
+Inputs: values (dictionary of column values)
+Outputs: SHA-256 hex digest (string)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def content_hash(values):
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode('utf-8')).hexdigest()
+
+"""
+Inserts new rows and updates changed rows for one model in batched transactions. Existing rows are read as (key, id, hash) only, so large columns such as test cases are never loaded, and rows whose hash is unchanged are skipped.
+Inputs: model (db.Model class), key (string natural key column), rows (list of column value dictionaries), batch_size (integer)
+Outputs: counts (dictionary with inserted, updated and unchanged totals)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def bulk_upsert(model, key, rows, batch_size=500):
+    key_column = getattr(model, key)
+    existing = {row[0]: (row[1], row[2]) for row in db.session.query(key_column, model.id, model.content_hash)}
+
+    # Later definitions with the same key replace earlier ones
+    pending = {}
+    for values in rows:
+        pending[values[key]] = dict(values, content_hash=content_hash(values))
+
+    inserts, updates, unchanged = [], [], 0
+    for key_value, values in pending.items():
+        if key_value not in existing:
+            inserts.append(values)
+        elif existing[key_value][1] == values['content_hash']:
+            unchanged += 1
+        else:
+            updates.append(dict(values, id=existing[key_value][0]))
+
+    for start in range(0, len(inserts), batch_size):
+        db.session.execute(db.insert(model), inserts[start:start + batch_size])
+        db.session.commit()
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        db.session.execute(db.update(model), batch)
+        if hasattr(model, 'version'):
+            # Versioned rows must look changed to caches keyed by version
+            db.session.execute(db.update(model).where(model.id.in_([row['id'] for row in batch]))
+                               .values(version=model.version + 1)
+                               .execution_options(synchronize_session=False))
+        db.session.commit()
+
+    return {'inserted': len(inserts), 'updated': len(updates), 'unchanged': unchanged}
+
+"""
+Imports problem definitions from files or directories.
+Inputs: paths (list of file or directory paths), batch_size (integer)
+Outputs: counts (dictionary with inserted, updated and unchanged totals)
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+def import_problems(paths, batch_size=500):
+    rows = [problem_values(definition, source) for definition, source in read_definitions(paths)]
+    return bulk_upsert(Problem, 'title', rows, batch_size)
+
+"""
+Imports achievement definitions from files or directories.
+Inputs: paths (list of file or directory paths), batch_size (integer)
+Outputs: counts (dictionary with inserted, updated and unchanged totals)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def import_achievements(paths, batch_size=500):
+    rows = [achievement_values(definition, source) for definition, source in read_definitions(paths)]
+    return bulk_upsert(Achievement, 'name', rows, batch_size)
+
+"""
+Creates an admin account when the database has none, so a fresh deployment can be administered.
+Inputs: email (string), password (string)
+Outputs: created (boolean); raises SeedError when an admin is needed but the password is empty
+Contributors: Brett Balquist, Arnav Jain
+"""
+def ensure_admin_user(email, password):
+    if User.query.filter_by(role='admin').count() > 0:
+        return False
+    if not password:
+        raise SeedError('An admin password is required to create the admin user')
+    from werkzeug.security import generate_password_hash
+    db.session.add(User(email=email, password_hash=generate_password_hash(password), role='admin'))
+    db.session.commit()
+    return True
+
+"""
+Creates missing tables and columns, imports the bundled problems and achievements, and creates the admin from LEETLE_ADMIN_EMAIL and LEETLE_ADMIN_PASSWORD. Without LEETLE_ADMIN_PASSWORD no admin is created, with a warning, except under TESTING, which uses a fixed development password. Safe to run on every deploy.
+Inputs: problem_paths (list, optional), achievement_paths (list, optional)
+Outputs: summary (dictionary of per-model counts, whether the admin was created, and whether it was skipped for lack of a password)
+Contributors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, Arnav Jain
+"""
+def seed_database(problem_paths=None, achievement_paths=None):
+    db.create_all()
+    upgrade_schema()
+    summary = {
+        'problems': import_problems(problem_paths or [os.path.join(SEED_DIR, 'problems')]),
+        'achievements': import_achievements(achievement_paths or [os.path.join(SEED_DIR, 'achievements')]),
+        'admin_created': False,
+        'admin_skipped': False,
+        # Imports replace test cases, so sweep the blobs no problem references any more
+        'blobs_removed': collect_orphaned_blobs(),
+    }
+    password = os.getenv('LEETLE_ADMIN_PASSWORD')
+    if not password and current_app.config.get('TESTING'):
+        password = TESTING_ADMIN_PASSWORD
+    if password:
+        summary['admin_created'] = ensure_admin_user(os.getenv('LEETLE_ADMIN_EMAIL', 'admin@leetle.com'), password)
+    elif User.query.filter_by(role='admin').count() == 0:
+        current_app.logger.warning('No admin user exists and LEETLE_ADMIN_PASSWORD is not set; skipping admin creation')
+        summary['admin_skipped'] = True
+    return summary
+
+# `flask leetle ...` commands, registered by create_app
+cli = AppGroup('leetle', help='Leetle database maintenance commands.')
+
+"""
+Formats import counts for command output.
+Inputs: label (string), counts (dictionary)
+Outputs: line (string)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def format_counts(label, counts):
+    return f"{label}: {counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+
+"""
+Command that prepares the database and loads the bundled definitions, run on deploy and by `python app.py`.
+Inputs: --problems and --achievements paths (optional, repeatable)
+Outputs: Import counts printed to the console
+Contributors: Daniel Neugent, Brett Balquist
+"""
+@cli.command('seed')
+@click.option('--problems', 'problem_paths', multiple=True, type=click.Path(exists=True), help='Problem definition file or directory (default: seed/problems).')
+@click.option('--achievements', 'achievement_paths', multiple=True, type=click.Path(exists=True), help='Achievement definition file or directory (default: seed/achievements).')
+def seed_command(problem_paths, achievement_paths):
+    """Create tables and load the bundled problems, achievements and admin user."""
+    started = time.perf_counter()
+    try:
+        summary = seed_database(list(problem_paths), list(achievement_paths))
+    except SeedError as e:
+        raise click.ClickException(str(e))
+    click.echo(format_counts('Problems', summary['problems']))
+    click.echo(format_counts('Achievements', summary['achievements']))
+    if summary['admin_created']:
+        click.echo('Created admin user')
+    if summary['blobs_removed']:
+        click.echo(f"Removed {summary['blobs_removed']} unreferenced test-case blobs")
+    if summary['admin_skipped']:
+        click.echo('Warning: no admin user created; set LEETLE_ADMIN_PASSWORD (and LEETLE_ADMIN_EMAIL) and re-run seed',
+                   err=True)
+    click.echo(f'Done in {time.perf_counter() - started:.2f}s')
+
+"""
+Command that imports a problem bank from definition files.
+Inputs: paths (files or directories), --batch-size (integer)
+Outputs: Import counts printed to the console
+Contributors: Daniel Neugent, Tej Gumaste
+"""
+@cli.command('import-problems')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--batch-size', default=500, show_default=True, help='Rows written per transaction.')
+def import_problems_command(paths, batch_size):
+    """Bulk-upsert problem definitions from JSON/YAML files or directories."""
+    started = time.perf_counter()
+    db.create_all()
+    upgrade_schema()
+    try:
+        counts = import_problems(list(paths), batch_size)
+    except SeedError as e:
+        raise click.ClickException(str(e))
+    click.echo(format_counts('Problems', counts))
+    click.echo(f'Done in {time.perf_counter() - started:.2f}s')
+
+"""
+Command that fills the database with a synthetic dataset for scaling and load tests. Never run it against production data.
+Inputs: --users, --submissions, --problems, --days, --seed, --batch-size (integers)
+Outputs: Row counts printed to the console
+Contributors: Jay Patel, Daniel Neugent
+"""
+@cli.command('generate-data')
+@click.option('--users', default=1000, show_default=True, help='Users to create.')
+@click.option('--submissions', default=100000, show_default=True, help='Submissions to create.')
+@click.option('--problems', default=50, show_default=True, help='Minimum number of problems; synthetic ones are added if needed.')
+@click.option('--days', default=90, show_default=True, help='Days of history to spread submissions over.')
+@click.option('--seed', default=0, show_default=True, help='Random seed; the same seed gives the same data.')
+@click.option('--batch-size', default=10000, show_default=True, help='Rows written per insert.')
+def generate_data_command(users, submissions, problems, days, seed, batch_size):
+    """Bulk-insert deterministic synthetic users, submissions, hints and achievements."""
+    from .datagen import generate_dataset
+
+    started = time.perf_counter()
+    db.create_all()
+    upgrade_schema()
+    # Achievements must exist for generated users to earn them
+    import_achievements([os.path.join(SEED_DIR, 'achievements')])
+    counts = generate_dataset(users, submissions, problems, days, seed, batch_size=batch_size)
+    for table, count in counts.items():
+        click.echo(f'{table}: {count} inserted')
+    click.echo(f'Done in {time.perf_counter() - started:.2f}s')
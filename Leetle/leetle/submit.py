@@ -0,0 +1,230 @@
+"""
+This file serves the daily problem and accepts code submissions, updating user statistics, streaks, and achievements after each attempt.
+Authors: Daniel Neugent, Brett Balquist, Tej Gumaste, Jay Patel, and Arnav Jain
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+from flask import Blueprint, jsonify, render_template, request
+
+from .auth import token_required
+from .database import commit_with_retry, db, mark_primary_sticky, read_replica
+from .models import Achievement, Problem, Submission, User, UserAchievement, UserStats
+
+bp = Blueprint('submit', __name__)
+
+"""
+Selects a problem based on the current day of the month to ensure all users see the same daily challenge.
+Inputs: None
+Outputs: Problem object or None
+Contributors: Daniel Neugent, Brett Balquist
+"""
+def get_today_problem():
+    # For simplicity, cycle through problems based on day
+    day = datetime.now().day % db.session.query(Problem).count()
+    if day == 0:
+        day = db.session.query(Problem).count()
+    return db.session.get(Problem, day)
+
+"""
+Computes the current streak of consecutive days a user has successfully solved a problem.
+Inputs: user (User object)
+Outputs: streak (integer)
+Contributors: Brett Balquist, Daniel Neugent
+"""
+def calculate_user_streak(user):
+    """Calculate current streak based on submission dates"""
+    # Walk successful submissions newest first, reading only as far back as the streak goes
+    result = db.session.execute(
+        db.select(Submission.submitted_at)
+          .filter_by(user_id=user.id, is_correct=True)
+          .order_by(Submission.submitted_at.desc())
+          .execution_options(yield_per=100)
+    )
+
+    # Count consecutive days from today backwards
+    streak = 0
+    current_date = datetime.now().date()
+    try:
+        for submitted_at in result.scalars():
+            date = submitted_at.date()
+            if date == current_date:
+                streak += 1
+                current_date -= timedelta(days=1)
+            elif date < current_date:
+                break
+    finally:
+        result.close()
+
+    return streak
+
+"""
+Updates the user's statistics, including success rate, favorite language, and streak counters, after a submission.
+Inputs: user (User object), language (string), is_correct (boolean)
+Outputs: None
+Contributors: Jay Patel, Arnav Jain
+"""
+def update_user_stats(user, language, is_correct):
+    """Update user statistics and streaks after a submission"""
+    # Get or create user stats
+    stats = UserStats.query.filter_by(user_id=user.id).first()
+    if not stats:
+        # Column defaults only apply on flush, so seed the counters explicitly
+        stats = UserStats(user_id=user.id, total_attempts=0, total_correct=0)
+        db.session.add(stats)
+
+    # Update attempts and success rate
+    stats.total_attempts += 1
+    if is_correct:
+        stats.total_correct += 1
+    stats.success_rate = (stats.total_correct / stats.total_attempts) * 100 if stats.total_attempts > 0 else 0
+
+    # Update favorite language based on usage frequency, counted by the database
+    favorite = db.session.query(Submission.language).filter_by(user_id=user.id)\
+                         .group_by(Submission.language)\
+                         .order_by(db.func.count(Submission.id).desc(), Submission.language).first()
+    stats.favorite_language = favorite[0] if favorite else language
+
+    stats.updated_at = datetime.now(timezone.utc)
+    stats.problems_attempted = db.session.query(db.func.count(db.distinct(Submission.problem_id)))\
+                                         .filter_by(user_id=user.id).scalar()
+
+    # Update streak information
+    if is_correct:
+        today = datetime.now().date()
+        user.last_submission_date = today
+        user.current_streak = calculate_user_streak(user)
+        user.longest_streak = max(user.longest_streak, user.current_streak)
+        user.total_solutions += 1
+
+    db.session.commit()
+
+"""
+Evaluates the user's progress against achievement criteria and awards new achievements if conditions are met.
+Inputs: user (User object)
+Outputs: None
+Contributors: Tej Gumaste, Brett Balquist, Daniel Neugent
+"""
+def check_and_award_achievements(user):
+    """Check if user has earned any new achievements"""
+    achievements = Achievement.query.all()
+    user_achievement_ids = [ua.achievement_id for ua in UserAchievement.query.filter_by(user_id=user.id).all()]
+    stats = UserStats.query.filter_by(user_id=user.id).first()
+
+    for achievement in achievements:
+        if achievement.id in user_achievement_ids:
+            continue
+
+        criteria = json.loads(achievement.criteria)
+
+        earned = True
+        if 'min_streak' in criteria and user.current_streak < criteria['min_streak']:
+            earned = False
+        if 'total_solutions' in criteria and user.total_solutions < criteria['total_solutions']:
+            earned = False
+        if 'success_rate' in criteria and stats.success_rate < criteria['success_rate']:
+            earned = False
+
+        if earned:
+            user_achievement = UserAchievement(user_id=user.id, achievement_id=achievement.id)
+            db.session.add(user_achievement)
+
+    db.session.commit()
+
+"""
+Renders the main landing page of the application.
+Inputs: None
+Outputs: Rendered HTML template
+Contributors: Jay Patel
+"""
+# Routes
+@bp.route('/')
+def home():
+    return render_template('home.html')
+
+"""
+Retrieves the details of the daily problem, including description and examples.
+Inputs: None
+Outputs: JSON response (problem details) or error
+Contributors: Brett Balquist, Daniel Neugent
+"""
+@bp.route('/problem')
+@read_replica
+def problem():
+    try:
+        problem = get_today_problem()
+        if not problem:
+            return jsonify({'error': 'No problem found'}), 404
+            
+        return jsonify({
+            'title': problem.title,
+            'description': problem.description,
+            'difficulty': getattr(problem, 'difficulty', 'Medium'),
+            'input_example': problem.input_example,
+            'output_example': problem.output_example
+        }), 200
+    except Exception as e:
+        print(f"Error in /problem route: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+"""
+Processes a code submission, validates it against test cases once the execution scheduler admits it, and updates user stats.
+Inputs: JSON payload (language, code), User ID (from token)
+Outputs: JSON response (success status, execution time) or error (429 with Retry-After when the judge is saturated, 503 when no remote judge worker is available)
+Contributors: Tej Gumaste, Arnav Jain, Jay Patel
+"""
+@bp.route('/submit', methods=['POST'])
+@token_required
+def submit():
+    data = request.get_json()
+
+    if not data or not data.get('language') or not data.get('code'):
+        return jsonify({'error': 'Language and code are required'}), 400
+
+    language = data['language']
+    code = data['code']
+
+    # Get user info from token
+    user_id = request.user_id
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 401
+
+    problem = get_today_problem()
+    if not problem:
+        return jsonify({'error': 'No problem available today'}), 404
+
+    # Imported here so workers that never judge code skip loading the runner
+    from .dispatch import JudgeUnavailable
+    from .judge import validate_submission
+    from .scheduler import SchedulerOverloaded, get_scheduler
+    try:
+        with get_scheduler().slot(user_id):
+            is_correct, exec_time = validate_submission(problem, language, code)
+    except SchedulerOverloaded as e:
+        return jsonify({'error': 'Too many submissions are running, please try again shortly'}), 429, {'Retry-After': str(e.retry_after)}
+    except JudgeUnavailable:
+        return jsonify({'error': 'The judge is unavailable, please try again shortly'}), 503, {'Retry-After': '1'}
+
+    # Save submission - always save, even if incorrect, to track attempts
+    def save_submission():
+        submission = Submission(user_id=user_id, problem_id=problem.id,
+                               language=language, code=code, exec_time=exec_time,
+                               is_correct=is_correct)
+        db.session.add(submission)
+    commit_with_retry(save_submission)
+    mark_primary_sticky(user_id)
+
+    if not is_correct:
+        return jsonify({'error': 'Incorrect solution'}), 400
+
+    # Update user stats and streaks
+    commit_with_retry(lambda: update_user_stats(user, language, is_correct))
+    commit_with_retry(lambda: check_and_award_achievements(user))
+
+    return jsonify({
+        'message': 'Submission successful!',
+        'execution_time': exec_time,
+        'problem_id': problem.id
+    }), 200
@@ -0,0 +1,108 @@
+"""
+This file stores and loads problem test cases. Test-case sets larger than TESTCASE_INLINE_MAX_BYTES are written to the content-addressed blob store and the problem row keeps only their hash, so large inputs never travel with ordinary problem queries. Sets prepared for judging are kept in a size-bounded LRU keyed by problem id, creation time and version.
+Authors: Daniel Neugent and Jay Patel
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from .blobstore import BlobStore
+
+# Prepared test cases keyed by (problem id, created_at, version), in least-recently-used order, with their sizes in bytes
+prepared_test_case_cache = OrderedDict()
+prepared_test_case_cache_bytes = 0
+prepared_test_case_cache_lock = threading.Lock()
+
+"""
+Returns the blob store for the current application, creating it on first use.
+Inputs: None (uses current_app.config['TESTCASE_BLOB_DIR'])
+Outputs: BlobStore instance
+Contributors: Daniel Neugent, Jay Patel
+"""
+def get_blob_store():
+    store = current_app.extensions.get('leetle_blobs')
+    if store is None:
+        store = current_app.extensions['leetle_blobs'] = BlobStore(current_app.config['TESTCASE_BLOB_DIR'])
+    return store
+
+"""
+Serializes a list of test cases into Problem column values, moving the data to the blob store when it exceeds the inline limit.
+Inputs: test_cases (list of dictionaries with input and output)
+Outputs: values (dictionary with test_cases and test_cases_hash)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def encode_test_cases(test_cases):
+    encoded = json.dumps(test_cases)
+    data = encoded.encode('utf-8')
+    if len(data) <= current_app.config['TESTCASE_INLINE_MAX_BYTES']:
+        return {'test_cases': encoded, 'test_cases_hash': None}
+    digest = get_blob_store().put(data)
+    # The inline column is NOT NULL on existing databases, so externalized rows keep an empty list there
+    return {'test_cases': '[]', 'test_cases_hash': digest}
+
+"""
+Deletes test-case blobs that no problem references any more, e.g. after problems were edited or deleted. Blobs written within the grace period are kept, since their problem row may not be committed yet.
+Inputs: grace_seconds (integer)
+Outputs: removed (integer count of deleted blobs)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def collect_orphaned_blobs(grace_seconds=3600):
+    from .models import Problem
+    referenced = {digest for (digest,) in Problem.query.with_entities(Problem.test_cases_hash)
+                  .filter(Problem.test_cases_hash.isnot(None)).distinct()}
+    return get_blob_store().sweep(referenced, grace_seconds)
+
+"""
+Replaces a problem's test cases, storing them inline or in the blob store, and bumps its version so cached prepared sets are no longer used. The bump runs in SQL, so concurrent edits from different workers each get a version of their own.
+Inputs: problem (Problem object), test_cases (list of dictionaries with input and output)
+Outputs: None (Sets attributes on the problem; the caller commits)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def set_test_cases(problem, test_cases):
+    from .models import Problem
+    for column, value in encode_test_cases(test_cases).items():
+        setattr(problem, column, value)
+    problem.version = Problem.version + 1
+
+"""
+Returns a problem's parsed test cases, reading blob-backed sets from the store and inline sets from the deferred column.
+Inputs: problem (Problem object)
+Outputs: test_cases (list of dictionaries with input and output)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def load_test_cases(problem):
+    if problem.test_cases_hash:
+        return json.loads(get_blob_store().read_bytes(problem.test_cases_hash))
+    return json.loads(problem.test_cases)
+
+"""
+Returns a problem's test cases ready for judging: inputs encoded to bytes for the child's stdin and expected outputs stripped the way program output is. Prepared sets are cached per process under (problem id, created_at, version), so a hit needs neither the test case column nor any parsing. Bumping the version on edit makes stale entries unreachable, and the creation time keeps a deleted problem's entry from being served for a new problem that reuses its id.
+Inputs: problem (Problem object)
+Outputs: prepared (tuple of (input bytes, expected output string) pairs)
+Contributors: Daniel Neugent, Jay Patel
+"""
+def get_prepared_test_cases(problem):
+    global prepared_test_case_cache_bytes
+    key = (problem.id, problem.created_at, problem.version)
+    with prepared_test_case_cache_lock:
+        cached = prepared_test_case_cache.get(key)
+        if cached is not None:
+            prepared_test_case_cache.move_to_end(key)
+            return cached[0]
+
+    prepared = tuple((str(test['input']).encode('utf-8'), str(test['output']).strip())
+                     for test in load_test_cases(problem))
+    size = sum(len(input_data) + len(expected) for input_data, expected in prepared)
+
+    max_bytes = current_app.config['TESTCASE_CACHE_MAX_BYTES']
+    if size <= max_bytes:
+        with prepared_test_case_cache_lock:
+            if key not in prepared_test_case_cache:
+                prepared_test_case_cache[key] = (prepared, size)
+                prepared_test_case_cache_bytes += size
+            while prepared_test_case_cache_bytes > max_bytes:
+                _, (_, evicted_size) = prepared_test_case_cache.popitem(last=False)
+                prepared_test_case_cache_bytes -= evicted_size
+    return prepared
@@ -0,0 +1,191 @@
+"""
+This file runs a standalone judge worker, so code execution can be scaled and placed apart from the web tier:
+
+    python -m leetle.worker --connect 'unix:/srv/leetle/judge-*.sock' --capacity 4
+
+The worker connects to every dispatcher it is given (Unix socket paths may be glob patterns, matching the per-process sockets of a multi-process web tier, and TCP addresses may be port ranges), authenticates with the shared judge key and checks the dispatcher's proof in return, registers its capacity, sends heartbeats reporting how many jobs it is running, and judges the jobs it receives with the same sandbox and limits as local judging. Dispatchers that appear later are picked up on the next heartbeat, and lost connections are retried.
+Authors: Jay Patel and Tej Gumaste
+"""
+import argparse
+import glob
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import create_app
+from .judge import judge_cases
+from .protocol import (HANDSHAKE_TIMEOUT, connect, decode_cases, encode_message, expand_address, judge_secret, make_nonce,
+                       read_message, sign_nonce, verify_nonce)
+
+logger = logging.getLogger(__name__)
+
+"""
+The worker's connection to one dispatcher, with a lock so results and heartbeats are written whole.
+Inputs: address (string), sock (connected socket)
+Outputs: DispatcherLink instance
+Contributors: Jay Patel, Tej Gumaste
+"""
+class DispatcherLink:
+    def __init__(self, address, sock):
+        self.address = address
+        self.sock = sock
+        self.send_lock = threading.Lock()
+
+    # Sends a message, returning False when the connection is gone.
+    def send(self, message):
+        try:
+            with self.send_lock:
+                self.sock.sendall(encode_message(message))
+            return True
+        except OSError:
+            return False
+
+"""
+Judge worker serving one or more dispatchers from a shared pool of capacity threads.
+Inputs: app (Flask application providing the judge configuration), addresses (list of address strings or Unix glob patterns), capacity (integer), heartbeat_interval (seconds)
+Outputs: JudgeWorker instance (call run() to serve until stop())
+Contributors: Jay Patel, Tej Gumaste
+"""
+class JudgeWorker:
+    def __init__(self, app, addresses, capacity, heartbeat_interval=2.0):
+        self.app = app
+        self.addresses = addresses
+        self.capacity = capacity
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_id = f'{socket.gethostname()}-{os.getpid()}'
+        self.secret = judge_secret(app.config)
+        self.executor = ThreadPoolExecutor(max_workers=capacity, thread_name_prefix='leetle-judge')
+        self.lock = threading.Lock()
+        self.active = 0
+        self.links = {}
+        self.stopped = threading.Event()
+
+    # Expands the configured addresses, resolving glob patterns against the Unix sockets that currently exist and port ranges into their ports.
+    def discover(self):
+        for address in self.addresses:
+            if address.startswith('unix:') and glob.has_magic(address[len('unix:'):]):
+                for match in sorted(glob.glob(address[len('unix:'):])):
+                    yield 'unix:' + match
+            else:
+                yield from expand_address(address)
+
+    # Connects to new dispatchers and sends heartbeats until stopped.
+    def run(self):
+        logger.info('Judge worker %s serving %s with capacity %d', self.worker_id, ', '.join(self.addresses), self.capacity)
+        while not self.stopped.is_set():
+            for address in self.discover():
+                with self.lock:
+                    connected = address in self.links
+                if not connected:
+                    self.open(address)
+            with self.lock:
+                links = list(self.links.values())
+                active = self.active
+            for link in links:
+                link.send({'type': 'heartbeat', 'active': active})
+            self.stopped.wait(self.heartbeat_interval)
+        self.executor.shutdown(wait=True)
+
+    def stop(self):
+        self.stopped.set()
+        with self.lock:
+            links = list(self.links.values())
+        for link in links:
+            link.sock.close()
+
+    # Connects, authenticates and registers with a dispatcher. A dispatcher that is not up yet, or a stale socket file, is simply retried on the next heartbeat; one that cannot prove it holds the judge key is never sent anything further.
+    def open(self, address):
+        try:
+            sock = connect(address, timeout=2)
+        except OSError:
+            return
+        stream = sock.makefile('rb')
+        try:
+            sock.settimeout(HANDSHAKE_TIMEOUT)
+            challenge = read_message(stream)
+            if not challenge or challenge.get('type') != 'challenge':
+                raise ValueError('no challenge')
+            nonce = make_nonce()
+            sock.sendall(encode_message({'type': 'register', 'worker_id': self.worker_id, 'capacity': self.capacity,
+                                         'nonce': nonce,
+                                         'auth': sign_nonce(self.secret, 'worker', str(challenge.get('nonce')))}))
+            welcome = read_message(stream)
+            if not welcome or not verify_nonce(self.secret, 'dispatcher', nonce, welcome.get('auth')):
+                logger.warning('Judge dispatcher %s failed authentication', address)
+                raise ValueError('dispatcher failed authentication')
+            sock.settimeout(None)
+        except (OSError, ValueError):
+            stream.close()
+            sock.close()
+            return
+        link = DispatcherLink(address, sock)
+        with self.lock:
+            self.links[address] = link
+        threading.Thread(target=self.read_jobs, args=(link, stream), name='leetle-worker-link', daemon=True).start()
+
+    # Queues every job received from a dispatcher until its connection ends.
+    def read_jobs(self, link, stream):
+        try:
+            while True:
+                message = read_message(stream)
+                if message is None:
+                    break
+                if message.get('type') == 'job':
+                    self.executor.submit(self.execute, link, message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+            link.sock.close()
+            with self.lock:
+                if self.links.get(link.address) is link:
+                    del self.links[link.address]
+
+    # Judges one job and sends the verdict back on the connection it came from.
+    def execute(self, link, job):
+        with self.lock:
+            self.active += 1
+        try:
+            with self.app.app_context():
+                is_valid, execution_time = judge_cases(job['language'], job['code'], decode_cases(job['cases']),
+                                                       job.get('comparator'))
+        except Exception:
+            logger.exception('Judging job %s failed', job.get('job_id'))
+            is_valid, execution_time = False, 0.0
+        finally:
+            with self.lock:
+                self.active -= 1
+        link.send({'type': 'result', 'job_id': job['job_id'], 'is_valid': is_valid, 'execution_time': execution_time})
+
+"""
+Command-line entry point for python -m leetle.worker.
+Inputs: argv (optional list of arguments)
+Outputs: None (Serves until SIGTERM or SIGINT)
+Contributors: Jay Patel, Tej Gumaste
+"""
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m leetle.worker', description='Run a Leetle judge worker.')
+    parser.add_argument('--connect', action='append',
+                        help='Dispatcher address, unix:/path, host:port or host:first-last; Unix paths may be glob patterns. '
+                             'Repeatable. Default: JUDGE_DISPATCH_ADDRESS with {pid} matching any process.')
+    parser.add_argument('--capacity', type=int, help='Jobs judged at once (default: JUDGE_MAX_CONCURRENT).')
+    parser.add_argument('--heartbeat-interval', type=float, help='Seconds between heartbeats (default: JUDGE_HEARTBEAT_INTERVAL).')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    app = create_app()
+    worker = JudgeWorker(
+        app,
+        args.connect or [app.config['JUDGE_DISPATCH_ADDRESS'].replace('{pid}', '*')],
+        args.capacity or app.config['JUDGE_MAX_CONCURRENT'],
+        args.heartbeat_interval or app.config['JUDGE_HEARTBEAT_INTERVAL'],
+    )
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: worker.stop())
+    worker.run()
+
+if __name__ == '__main__':
+    main()
@@ -4,28 +4,32 @@
 import pytest
 import os
 import sys
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 
-# Add the parent directory to the path so we can import app
+# Add the parent directory to the path so we can import the leetle package
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app import app, db, Problem
+from leetle import create_app, db
+from leetle.config import normalize_database_uri
+from leetle.models import Problem
 
-# Creates and configures a temporary Flask application instance with testing settings and an in-memory SQLite database.
-# Inputs: None
+# Set LEETLE_TEST_DATABASE_URL (e.g. postgresql://localhost/leetle_test) to run the suite against another backend
+TEST_DATABASE_URI = normalize_database_uri(os.getenv('LEETLE_TEST_DATABASE_URL', 'sqlite:///:memory:'))
+
+# Creates an application instance through the create_app factory with testing settings, a temporary test-case blob directory and an in-memory SQLite database, or the database named by LEETLE_TEST_DATABASE_URL.
+# Inputs: tmp_path_factory (fixture)
 # Outputs: Yields a configured Flask application instance
 # Contributor: Daniel Neugent
 @pytest.fixture(scope='session')
-def flask_app():
-    test_app = Flask(__name__)
-    test_app.config['TESTING'] = True
-    test_app.config['SECRET_KEY'] = 'test-secret-key'
-    test_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    test_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+def flask_app(tmp_path_factory):
+    test_app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test-secret-key',
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URI,
+        'DB_PROFILE': 'default',
+        'TESTCASE_BLOB_DIR': str(tmp_path_factory.mktemp('testcases')),
+    })
 
     with test_app.app_context():
-        db.init_app(test_app)
         db.create_all()
         yield test_app
 
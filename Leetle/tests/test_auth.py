@@ -0,0 +1,269 @@
+# This file tests JWT handling, verifying that verified tokens are cached, that role claims authorize admins without a database lookup, and that token versions, bumped by logging out everywhere or changing the password, revoke refresh tokens.
+# Author: Arnav Jain
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import auth, create_app
+from leetle.database import db
+from leetle.models import RefreshToken, User
+
+
+# Clears the process-wide verified token cache so each test starts cold.
+# Inputs: None
+# Outputs: None
+# Contributor: Arnav Jain
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth.verified_token_cache.clear()
+    yield
+    auth.verified_token_cache.clear()
+
+
+class TestTokenVerification:
+    """Test the verified token cache and role claims."""
+
+    # Verifies that a token is only HMAC-checked once while it stays cached.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts decode call count)
+    # Contributor: Arnav Jain
+    def test_verified_tokens_are_cached(self, flask_app, monkeypatch):
+        token = auth.generate_access_token(SimpleNamespace(id=1, role='user', token_version=0))
+        decode_calls = []
+        real_decode = jwt.decode
+        monkeypatch.setattr(jwt, 'decode', lambda *a, **kw: decode_calls.append(1) or real_decode(*a, **kw))
+
+        first = auth.verify_token(token)
+        second = auth.verify_token(token)
+        assert first['user_id'] == second['user_id'] == 1
+        assert len(decode_calls) == 1
+
+    # Verifies that expired cache entries are re-verified rather than trusted and that the cache never exceeds its bound.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts cache contents and decode call count)
+    # Contributor: Arnav Jain
+    def test_cache_expiry_and_bound(self, flask_app, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'JWT_VERIFY_CACHE_SIZE', 2)
+        tokens = [auth.generate_access_token(SimpleNamespace(id=i, role='user', token_version=0)) for i in range(3)]
+        for token in tokens:
+            auth.verify_token(token)
+        assert len(auth.verified_token_cache) == 2
+
+        decode_calls = []
+        real_decode = jwt.decode
+        monkeypatch.setattr(jwt, 'decode', lambda *a, **kw: decode_calls.append(1) or real_decode(*a, **kw))
+        cached_payload = next(reversed(auth.verified_token_cache.values()))
+        cached_payload['exp'] = time.time() - 1
+
+        assert auth.verify_token(tokens[-1])['user_id'] == 2
+        assert len(decode_calls) == 1
+
+    # Verifies that an access token with an admin role claim passes admin_required without querying the User table.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts response status)
+    # Contributor: Arnav Jain
+    def test_admin_required_uses_role_claim(self, flask_app, monkeypatch):
+        def no_database(*args, **kwargs):
+            raise AssertionError('admin_required should not query the database')
+        monkeypatch.setattr(User, 'query', SimpleNamespace(get=no_database))
+
+        @auth.admin_required
+        def admin_view():
+            return 'ok'
+
+        admin_token = auth.generate_access_token(SimpleNamespace(id=1, role='admin', token_version=0))
+        user_token = auth.generate_access_token(SimpleNamespace(id=2, role='user', token_version=0))
+
+        with flask_app.test_request_context(headers={'Authorization': f'Bearer {admin_token}'}):
+            assert admin_view() == 'ok'
+        with flask_app.test_request_context(headers={'Authorization': f'Bearer {user_token}'}):
+            response, status = admin_view()
+            assert status == 403
+
+
+class TestCredentialProtection:
+    """Test login rate limiting and the bounded password hashing pool."""
+
+    # Verifies that a bucket allows its burst, then reports how long to wait for the next token.
+    # Inputs: None
+    # Outputs: None (Asserts limiter decisions)
+    # Contributor: Arnav Jain
+    def test_token_bucket_allows_burst_then_limits(self):
+        limiter = auth.TokenBucketLimiter(capacity=2, refill_per_second=0.5)
+        assert limiter.consume('1.2.3.4') == 0
+        assert limiter.consume('1.2.3.4') == 0
+        assert limiter.consume('1.2.3.4') > 0
+        assert limiter.consume('5.6.7.8') == 0
+
+    # Verifies that an exhausted per-email bucket rejects login with 429 before the user is looked up or any hash is checked.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts response status and headers)
+    # Contributor: Arnav Jain
+    def test_login_rate_limited_before_hashing(self, flask_app, monkeypatch):
+        monkeypatch.setitem(flask_app.extensions['leetle_auth'], 'login_email_limiter', auth.TokenBucketLimiter(capacity=0, refill_per_second=1 / 60))
+        monkeypatch.setattr(auth, 'run_password_job', lambda *args: pytest.fail('password hashed while rate limited'))
+
+        with flask_app.test_request_context(json={'email': 'victim@leetle.com', 'password': 'guess123'}):
+            response, status, headers = auth.login()
+        assert status == 429
+        assert int(headers['Retry-After']) >= 1
+
+    # Verifies that with PROXY_FIX_X_FOR set, the per-IP limit keys on the forwarded client address rather than the proxy's.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts which clients are limited)
+    # Contributor: Arnav Jain
+    def test_ip_limit_uses_forwarded_client_address(self, tmp_path):
+        app = create_app({'TESTING': True, 'SECRET_KEY': 'test-secret-key', 'PROXY_FIX_X_FOR': 1,
+                          'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'proxy.db'}",
+                          'AUTH_RATE_LIMIT_IP_BURST': 1, 'AUTH_RATE_LIMIT_IP_PER_MINUTE': 1})
+        with app.app_context():
+            db.create_all()
+            client = app.test_client()
+
+            def login(client_ip):
+                return client.post('/auth/login', json={'email': 'nobody@leetle.com', 'password': 'secret123'},
+                                   headers={'X-Forwarded-For': client_ip}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+            assert login('198.51.100.7').status_code == 401
+            assert login('198.51.100.7').status_code == 429
+            assert login('203.0.113.9').status_code == 401
+            db.engine.dispose()
+
+    # Verifies that password jobs run on the process pool and that jobs beyond the queue depth are shed.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts hashing results and overload error)
+    # Contributor: Arnav Jain
+    def test_password_pool_round_trip_and_shedding(self, flask_app, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'PASSWORD_HASH_WORKERS', 1)
+        password_hash = auth.run_password_job(generate_password_hash, 'secret123')
+        assert auth.run_password_job(check_password_hash, password_hash, 'secret123')
+        assert auth.password_hash_executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+        full_slots = threading.BoundedSemaphore(1)
+        full_slots.acquire()
+        monkeypatch.setitem(flask_app.extensions['leetle_auth'], 'password_hash_slots', full_slots)
+        with pytest.raises(auth.PasswordHashingOverloaded):
+            auth.run_password_job(generate_password_hash, 'secret123')
+
+
+class TestRefreshTokenRotation:
+    """Test refresh token rotation, reuse detection and purging."""
+
+    # Creates a user and issues a first refresh token for it inside the test database.
+    # Inputs: flask_app (Flask application)
+    # Outputs: encoded refresh token (str)
+    # Contributor: Arnav Jain
+    def issue_token(self, flask_app):
+        user = User(email='rotate@leetle.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        token = auth.generate_refresh_token(user)
+        db.session.commit()
+        return token
+
+    # Posts a refresh token to the refresh view and returns the status code and JSON body.
+    # Inputs: flask_app (Flask application), token (str)
+    # Outputs: Tuple of status code (int) and response data (dict)
+    # Contributor: Arnav Jain
+    def refresh(self, flask_app, token):
+        with flask_app.test_request_context(json={'refresh_token': token}):
+            response, status = auth.refresh_token()
+            return status, response.get_json()
+
+    # Verifies that a refresh returns a new token pair and that replaying the old token revokes the whole family.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts response codes)
+    # Contributor: Arnav Jain
+    def test_rotation_and_reuse_detection(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setattr(auth, 'revoked_refresh_jtis', OrderedDict())
+        first_token = self.issue_token(flask_app)
+
+        status, data = self.refresh(flask_app, first_token)
+        assert status == 200
+        second_token = data['refresh_token']
+        assert second_token != first_token
+
+        status, data = self.refresh(flask_app, first_token)
+        assert status == 401
+        status, data = self.refresh(flask_app, second_token)
+        assert status == 401
+        assert RefreshToken.query.filter_by(revoked=False).count() == 0
+
+    # Verifies that logging out revokes the presented refresh token.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts response codes)
+    # Contributor: Arnav Jain
+    def test_logout_revokes_token(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setattr(auth, 'revoked_refresh_jtis', OrderedDict())
+        token = self.issue_token(flask_app)
+
+        with flask_app.test_request_context(json={'refresh_token': token}):
+            response, status = auth.logout()
+        assert status == 200
+        assert self.refresh(flask_app, token)[0] == 401
+
+    # Verifies that logging out everywhere bumps the token version and revokes every session of the user.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts response codes and the token version)
+    # Contributor: Arnav Jain
+    def test_logout_all_revokes_every_session(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setattr(auth, 'revoked_refresh_jtis', OrderedDict())
+        first = self.issue_token(flask_app)
+        user = User.query.filter_by(email='rotate@leetle.com').one()
+        second = auth.generate_refresh_token(user)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {auth.generate_access_token(user)}'}
+
+        assert flask_app.test_client().post('/auth/logout-all', headers=headers).status_code == 200
+        assert db.session.get(User, user.id).token_version == 1
+        assert self.refresh(flask_app, first)[0] == 401
+        assert self.refresh(flask_app, second)[0] == 401
+
+    # Verifies that changing the password needs the current one, revokes older sessions and returns a working token pair.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts response codes and the stored hash)
+    # Contributor: Arnav Jain
+    def test_password_change_revokes_sessions(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setattr(auth, 'revoked_refresh_jtis', OrderedDict())
+        monkeypatch.setitem(flask_app.config, 'PASSWORD_HASH_WORKERS', 0)
+        old_token = self.issue_token(flask_app)
+        user = User.query.filter_by(email='rotate@leetle.com').one()
+        user.password_hash = generate_password_hash('old-password')
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {auth.generate_access_token(user)}'}
+        client = flask_app.test_client()
+
+        wrong = client.post('/auth/password', headers=headers,
+                            json={'current_password': 'guess', 'new_password': 'new-password'})
+        assert wrong.status_code == 401
+        changed = client.post('/auth/password', headers=headers,
+                              json={'current_password': 'old-password', 'new_password': 'new-password'})
+        assert changed.status_code == 200
+
+        assert check_password_hash(db.session.get(User, user.id).password_hash, 'new-password')
+        assert self.refresh(flask_app, old_token)[0] == 401
+        assert self.refresh(flask_app, changed.get_json()['refresh_token'])[0] == 200
+
+    # Verifies that expired rows are deleted in batches while live tokens are kept.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts remaining rows)
+    # Contributor: Arnav Jain
+    def test_purge_expired_tokens_in_batches(self, flask_app, test_db):
+        expired = datetime.utcnow() - timedelta(days=1)
+        for i in range(5):
+            db.session.add(RefreshToken(jti=f'old{i}', family_id='f', user_id=1, expires_at=expired))
+        self.issue_token(flask_app)
+
+        assert auth.purge_expired_refresh_tokens(batch_size=2) == 5
+        assert RefreshToken.query.count() == 1
@@ -0,0 +1,118 @@
+# This file tests the output comparators, verifying each registered comparator over outputs split into arbitrary chunks and that the judge stops a wrong answer as soon as its output diverges.
+# Author: Tej Gumaste
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import testcases
+from leetle.comparators import create_comparator, validate_comparator
+from leetle.database import db
+from leetle.judge import validate_submission
+from leetle.models import Problem
+
+
+# Feeds output to a fresh comparator in chunks of the given size and returns its verdict.
+# Inputs: spec (str), expected (str), output (str), size (int)
+# Outputs: True when the comparator accepts the output (bool)
+# Contributor: Tej Gumaste
+def judge(spec, expected, output, size=1):
+    comparator = create_comparator(spec, expected)
+    data = output.encode('utf-8')
+    for start in range(0, len(data), size):
+        if not comparator.feed(data[start:start + size]):
+            return False
+    return comparator.finish()
+
+
+class TestComparators:
+    """Test the registered comparators on chunked output."""
+
+    # Verifies each comparator's accept and reject cases for one-byte and whole-output chunks.
+    # Inputs: spec, expected, output, accepted (parametrized), size (parametrized)
+    # Outputs: None (Asserts verdicts)
+    # Contributor: Tej Gumaste
+    @pytest.mark.parametrize('size', [1, 4096])
+    @pytest.mark.parametrize('spec, expected, output, accepted', [
+        (None, '[0, 1]', '  [0, 1]\n\n', True),
+        ('exact', '[0, 1]', '[0,1]', False),
+        ('exact', 'a b', 'a b c', False),
+        ('exact', 'a b', 'a', False),
+        ('tokens', '1 2\n3', '1\n2  3\n', True),
+        ('tokens', '1 2 3', '1 2 34', False),
+        ('tokens', '1 2', '1 2 3', False),
+        ('float', '0.333333 2', '0.3333331 2.0000000001\n', True),
+        ('float:0.1', '1.0', '1.05', True),
+        ('float', '1.0', '1.1', False),
+        ('float', 'inf', 'nan', False),
+        ('unordered_lines', 'a\nb\nb', 'b\n\na\nb\n', True),
+        ('unordered_lines', 'a\nb', 'b\nb', False),
+        ('json', '{"a": [1, 2], "b": "x"}', '{"b":"x","a":[1,2]}', True),
+        ('json', '[1, 2]', '[2, 1]', False),
+        ('json', '[1]', 'not json', False),
+    ])
+    def test_verdicts(self, spec, expected, output, accepted, size):
+        assert judge(spec, expected, output, size) is accepted
+
+    # Verifies that streaming comparators report a mismatch at the first wrong token rather than at the end.
+    # Inputs: None
+    # Outputs: None (Asserts feed results)
+    # Contributor: Tej Gumaste
+    def test_mismatch_is_reported_early(self):
+        for spec in ('exact', 'tokens', 'unordered_lines'):
+            comparator = create_comparator(spec, '1\n2\n3')
+            assert comparator.feed(b'1\n')
+            assert not comparator.feed(b'9\n')
+
+    # Verifies that comparator specs are checked by name and argument.
+    # Inputs: None
+    # Outputs: None (Asserts accepted and rejected specs)
+    # Contributor: Tej Gumaste
+    def test_validate_comparator(self):
+        assert validate_comparator('float:1e-3') == 'float:1e-3'
+        assert validate_comparator('') is None
+        for spec in ('fuzzy', 'float:abc', 'float:-1', 5):
+            with pytest.raises(ValueError):
+                validate_comparator(spec)
+
+
+class TestStreamingJudge:
+    """Test judging with per-problem comparators."""
+
+    # Creates a problem with the given comparator and test cases.
+    # Inputs: comparator (str), cases (list of dict)
+    # Outputs: Problem object (committed)
+    # Contributor: Tej Gumaste
+    def add_problem(self, comparator, cases):
+        problem = Problem(title=f'Compare {comparator}', description='d', difficulty='Easy', input_example='',
+                          output_example='', comparator=comparator, **testcases.encode_test_cases(cases))
+        db.session.add(problem)
+        db.session.commit()
+        return problem
+
+    # Verifies that a float problem accepts output within tolerance and rejects output outside it.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts judging results)
+    # Contributor: Tej Gumaste
+    def test_problem_comparator_is_used(self, flask_app, test_db):
+        problem = self.add_problem('float:1e-3', [{'input': '3', 'output': '0.333'}])
+
+        assert validate_submission(problem, 'python', 'print(1 / int(input()))')[0]
+        assert not validate_submission(problem, 'python', 'print(0.3)')[0]
+
+    # Verifies that a program whose first line is wrong is stopped without waiting for it to finish.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts verdict and elapsed time)
+    # Contributor: Tej Gumaste
+    def test_wrong_answer_is_stopped_early(self, flask_app, test_db):
+        problem = self.add_problem('tokens', [{'input': '', 'output': '1 2'}])
+        code = "import time\nprint(9, flush=True)\ntime.sleep(20)\nprint(2)"
+
+        started = time.monotonic()
+        is_valid, _ = validate_submission(problem, 'python', code)
+        assert not is_valid
+        assert time.monotonic() - started < 10
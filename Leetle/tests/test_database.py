@@ -0,0 +1,226 @@
+# This file tests the database storage profiles, verifying that connection pragmas are applied and that locked writes are retried.
+# Author: Daniel Neugent
+
+import os
+import sys
+
+import pytest
+from flask import Flask, g, request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import config, create_app, database
+from leetle.database import db
+from leetle.models import User
+
+
+class TestStorageProfiles:
+    """Test SQLite storage profiles and write retries."""
+
+    # Opens a file-backed SQLite engine under the production profile and checks that WAL and the busy timeout are active.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts pragma values)
+    # Contributor: Daniel Neugent
+    def test_production_profile_applies_pragmas(self, tmp_path):
+        profile_app = Flask(__name__)
+        profile_app.config['DB_PROFILE'] = 'production'
+        engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+
+        with profile_app.app_context(), engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+            assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        engine.dispose()
+
+    # Checks that pool sizing options are dropped for in-memory SQLite, which cannot use a sized pool.
+    # Inputs: None
+    # Outputs: None (Asserts engine options)
+    # Contributor: Daniel Neugent
+    def test_memory_database_skips_pool_options(self):
+        options = config.get_engine_options('production', 'sqlite:///:memory:')
+        assert 'pool_size' not in options
+        assert options['connect_args']['timeout'] == 5
+
+    # Simulates a locked database on the first attempt and verifies the unit of work is retried until it commits.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts retry count)
+    # Contributor: Daniel Neugent
+    def test_commit_with_retry_recovers_from_lock(self, flask_app, monkeypatch):
+        monkeypatch.setattr(database.time, 'sleep', lambda seconds: None)
+        calls = []
+
+        def unit_of_work():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('INSERT', {}, Exception('database is locked'))
+            return 'saved'
+
+        with flask_app.app_context():
+            assert database.commit_with_retry(unit_of_work) == 'saved'
+        assert len(calls) == 2
+
+    # Verifies that errors other than lock contention are raised immediately without retrying.
+    # Inputs: flask_app (fixture)
+    # Outputs: None (Asserts exception and call count)
+    # Contributor: Daniel Neugent
+    def test_commit_with_retry_raises_other_errors(self, flask_app):
+        calls = []
+
+        def unit_of_work():
+            calls.append(1)
+            raise OperationalError('INSERT', {}, Exception('no such table: user'))
+
+        with flask_app.app_context(), pytest.raises(OperationalError):
+            database.commit_with_retry(unit_of_work)
+        assert len(calls) == 1
+
+
+class TestBackendPortability:
+    """Test backend selection and portable column types."""
+
+    # Verifies that legacy postgres:// URLs are rewritten and that client/server backends get a pre-pinged, recycled pool.
+    # Inputs: None
+    # Outputs: None (Asserts URI and engine options)
+    # Contributor: Daniel Neugent
+    def test_postgres_uri_and_pool_options(self):
+        uri = config.normalize_database_uri('postgres://leetle@localhost/leetle')
+        assert uri == 'postgresql://leetle@localhost/leetle'
+
+        options = config.get_engine_options('default', uri, env={'LEETLE_DB_POOL_SIZE': '4'})
+        assert options['pool_size'] == 4
+        assert options['pool_pre_ping'] is True
+        assert options['pool_recycle'] == 1800
+        assert 'connect_args' not in options
+
+    # Checks that JSON columns stay TEXT unless native JSON is enabled for PostgreSQL, and that values round-trip as JSON strings.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts column type and conversions)
+    # Contributor: Daniel Neugent
+    def test_json_text_maps_to_jsonb_on_postgres(self, flask_app, monkeypatch):
+        from sqlalchemy.dialects import postgresql, sqlite
+        from sqlalchemy.dialects.postgresql import JSONB
+
+        column_type = database.JSONText()
+        pg_dialect = postgresql.dialect()
+        assert not isinstance(column_type.load_dialect_impl(pg_dialect), JSONB)
+
+        monkeypatch.setitem(flask_app.config, 'DB_NATIVE_JSON', True)
+        assert isinstance(column_type.load_dialect_impl(pg_dialect), JSONB)
+        assert not isinstance(column_type.load_dialect_impl(sqlite.dialect()), JSONB)
+
+        stored = column_type.process_bind_param('[{"input": "1", "output": "2"}]', pg_dialect)
+        assert stored == [{'input': '1', 'output': '2'}]
+        assert column_type.process_result_value(stored, pg_dialect) == '[{"input": "1", "output": "2"}]'
+
+
+class TestReadReplicaRouting:
+    """Test routing of read-only endpoints to a replica bind."""
+
+    # Builds an app whose primary and replica are separate SQLite files holding different rows, so the bind used is observable.
+    # Inputs: tmp_path (fixture)
+    # Outputs: Yields a Flask application instance
+    # Contributor: Daniel Neugent
+    @pytest.fixture
+    def replica_app(self, tmp_path):
+        replica_app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+            'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{tmp_path / 'replica.db'}"},
+        })
+
+        with replica_app.app_context():
+            db.create_all(bind_key=None)
+            db.metadata.create_all(db.engines['replica'])
+            db.session.add(User(email='primary@leetle.com', password_hash='x'))
+            db.session.commit()
+        yield replica_app
+
+        # init_app registered a 'replica' metadata on the shared db; drop it so other apps' create_all ignore it
+        db.metadatas.pop('replica', None)
+        with replica_app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    # Verifies that reads go to the replica only while g.use_replica is set and that writes always use the primary.
+    # Inputs: replica_app (fixture)
+    # Outputs: None (Asserts which database answered)
+    # Contributor: Daniel Neugent
+    def test_reads_route_to_replica(self, replica_app):
+        with replica_app.test_request_context():
+            g.use_replica = True
+            assert User.query.count() == 0
+            db.session.add(User(email='write@leetle.com', password_hash='x'))
+            db.session.commit()
+
+        with replica_app.test_request_context():
+            assert User.query.count() == 2
+
+    # Verifies that a user who just submitted is pinned to the primary by the signed header, in any process, and only until it expires.
+    # Inputs: replica_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts routing decisions)
+    # Contributor: Daniel Neugent
+    def test_recent_writer_is_pinned_to_primary(self, replica_app, monkeypatch):
+        @database.read_replica
+        def count_users():
+            return User.query.count()
+
+        with replica_app.test_request_context():
+            database.mark_primary_sticky(7)
+            response = replica_app.process_response(replica_app.response_class())
+        token = response.headers[database.PRIMARY_STICKY_HEADER]
+
+        for user_id, header, expected in ((7, None, 0), (7, token, 1), (8, token, 0), (None, token, 1),
+                                          (7, token + 'x', 0)):
+            headers = {database.PRIMARY_STICKY_HEADER: header} if header else {}
+            with replica_app.test_request_context(headers=headers):
+                request.user_id = user_id
+                assert count_users() == expected, (user_id, header)
+                db.session.remove()
+
+        monkeypatch.setitem(replica_app.config, 'DB_REPLICA_STICKY_SECONDS', -1)
+        with replica_app.test_request_context(headers={database.PRIMARY_STICKY_HEADER: token}):
+            request.user_id = 7
+            assert count_users() == 0
+
+
+class TestSchemaUpgrades:
+    """Test in-place upgrades of databases created by older versions."""
+
+    # Creates a user table without the newer columns and verifies that upgrade_schema adds them exactly once.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts the upgraded columns)
+    # Contributor: Daniel Neugent
+    def test_upgrade_adds_missing_columns(self, tmp_path):
+        legacy_app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'legacy.db'}"})
+
+        with legacy_app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(text('CREATE TABLE user (id INTEGER PRIMARY KEY, email VARCHAR(120))'))
+                conn.execute(text("INSERT INTO user (email) VALUES ('old@leetle.com')"))
+
+            database.upgrade_schema()
+            database.upgrade_schema()
+
+            with db.engine.connect() as conn:
+                assert conn.execute(text('SELECT token_version FROM user')).scalar() == 0
+            db.engine.dispose()
+
+    # Creates a submission table without indexes and verifies that upgrade_schema adds the model's indexes.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts the created indexes)
+    # Contributor: Jay Patel
+    def test_upgrade_adds_missing_indexes(self, tmp_path):
+        legacy_app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'legacy.db'}"})
+
+        with legacy_app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(text('CREATE TABLE submission (id INTEGER PRIMARY KEY, user_id INTEGER, problem_id INTEGER, '
+                                  'language VARCHAR(10), code TEXT, exec_time FLOAT, is_correct BOOLEAN, submitted_at DATETIME)'))
+
+            database.upgrade_schema()
+            database.upgrade_schema()
+
+            indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('submission')}
+            assert {'ix_submission_user_submitted', 'ix_submission_problem_correct'} <= indexes
+            db.engine.dispose()
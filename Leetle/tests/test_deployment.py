@@ -0,0 +1,115 @@
+# This file tests the gunicorn production configuration and worker startup, verifying the worker pool profiles, that database engines are reset after fork, and that heavy modules stay unloaded until first use.
+# Author: Jay Patel
+
+import io
+import os
+import runpy
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import config as config_module
+from leetle import create_app, db
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py')
+
+
+class TestGunicornConfig:
+    """Test the gunicorn configuration module."""
+
+    # Loads the config for the judge pool and checks that it preloads the app, uses gthread workers with the long timeout, and divides the cores between the workers' execution slots.
+    # Inputs: monkeypatch (fixture)
+    # Outputs: None (Asserts configuration values)
+    # Contributor: Jay Patel
+    def test_pool_profiles(self, monkeypatch):
+        # The config file exports defaults through os.environ, so give it a throwaway copy
+        monkeypatch.setattr(os, 'environ', dict(os.environ))
+        monkeypatch.setenv('LEETLE_POOL', 'judge')
+        monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+        monkeypatch.delenv('LEETLE_JUDGE_MAX_CONCURRENT', raising=False)
+        monkeypatch.delenv('LEETLE_JUDGE_TOTAL_CONCURRENT', raising=False)
+        config = runpy.run_path(CONFIG_PATH)
+
+        assert config['preload_app'] is True
+        assert config['worker_class'] == 'gthread'
+        assert config['workers'] == min(config['cores'], 2)
+        assert config['threads'] > config['cores'] // config['workers']
+        assert os.environ['LEETLE_JUDGE_MAX_CONCURRENT'] == str(max(1, config['cores'] // config['workers']))
+        assert config['timeout'] == 120
+        assert config['max_requests_jitter'] > 0
+
+    # Verifies that the core count comes from the CPU quota or the override rather than the host's core count, and that the judge budgets are split between the workers.
+    # Inputs: monkeypatch (fixture)
+    # Outputs: None (Asserts detected cores and per-worker slots)
+    # Contributor: Jay Patel
+    def test_cores_respect_quota_and_override(self, monkeypatch):
+        monkeypatch.setattr(os, 'environ', dict(os.environ))
+        monkeypatch.delenv('LEETLE_CPU_COUNT', raising=False)
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(16)))
+        real_open = open
+
+        def fake_open(path, *args, **kwargs):
+            if path == '/sys/fs/cgroup/cpu.max':
+                return io.StringIO('250000 100000\n')
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr('builtins.open', fake_open)
+        assert config_module.available_cpus() == 3
+        monkeypatch.setenv('LEETLE_CPU_COUNT', '6')
+        assert config_module.available_cpus() == 6
+        monkeypatch.setattr('builtins.open', real_open)
+
+        monkeypatch.setenv('LEETLE_POOL', 'judge')
+        monkeypatch.setenv('LEETLE_JUDGE_TOTAL_CONCURRENT', '5')
+        monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+        monkeypatch.delenv('LEETLE_JUDGE_MAX_CONCURRENT', raising=False)
+        monkeypatch.delenv('LEETLE_JUDGE_MAX_PER_USER', raising=False)
+        monkeypatch.delenv('LEETLE_JUDGE_TOTAL_PER_USER', raising=False)
+        config = runpy.run_path(CONFIG_PATH)
+        assert config['cores'] == 6 and config['workers'] == 2
+        assert os.environ['LEETLE_JUDGE_MAX_CONCURRENT'] == '2'
+        assert os.environ['LEETLE_JUDGE_MAX_PER_USER'] == '1'
+
+    # Verifies that post_fork empties the inherited connection pool instead of reusing the parent's connections.
+    # Inputs: monkeypatch (fixture)
+    # Outputs: None (Asserts pool state)
+    # Contributor: Jay Patel
+    def test_post_fork_disposes_engines(self, monkeypatch):
+        monkeypatch.setattr(os, 'environ', dict(os.environ))
+        config = runpy.run_path(CONFIG_PATH)
+        import app as leetle
+        with leetle.app.app_context():
+            engine = db.engine
+            old_pool = engine.pool
+            config['post_fork'](server=None, worker=None)
+            assert engine.pool is not old_pool
+
+
+class TestStartup:
+    """Test the application factory and deferred imports."""
+
+    # Imports the app in a fresh interpreter and checks that modules deferred to first use were not loaded.
+    # Inputs: None
+    # Outputs: None (Asserts the loaded module list)
+    # Contributor: Jay Patel
+    def test_import_defers_heavy_modules(self):
+        probe = ('import sys, app; print(",".join(name for name in ("jwt", "sqlalchemy.dialects.postgresql", '
+                 '"concurrent.futures.process", "leetle.judge") if name in sys.modules))')
+        result = subprocess.run([sys.executable, '-c', probe], cwd=os.path.join(os.path.dirname(__file__), '..'),
+                                env=dict(os.environ, DATABASE_URL='sqlite:///:memory:'),
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ''
+
+    # Builds two apps from the factory and checks that their config and rate limiter state are independent.
+    # Inputs: None
+    # Outputs: None (Asserts per-app settings)
+    # Contributor: Jay Patel
+    def test_create_app_instances_are_isolated(self):
+        first = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'HINT_DAILY_LIMIT': 5})
+        second = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+
+        assert first.config['HINT_DAILY_LIMIT'] == 5
+        assert second.config['HINT_DAILY_LIMIT'] == 3
+        assert first.extensions['leetle_auth'] is not second.extensions['leetle_auth']
+        assert 'auth.login' in first.view_functions
@@ -0,0 +1,112 @@
+# This file tests the hint system, verifying the cost rules for partial and full hints that the daily quota holds under concurrent reveals, and that concurrent reveals of one problem are charged once.
+# Author: Brett Balquist
+
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import create_app, hints
+from leetle.auth import generate_access_token
+from leetle.database import db
+from leetle.models import Problem, UserHintUsage
+
+
+class TestHintQuota:
+    """Test hint reveal costs and the atomic daily quota."""
+
+    # Calls the reveal_hint view as the given user and returns the status code and JSON body.
+    # Inputs: flask_app (Flask application), user_id (int), problem_id (int), hint_level (str)
+    # Outputs: Tuple of status code (int) and response data (dict)
+    # Contributor: Brett Balquist
+    def reveal(self, flask_app, user_id, problem_id, hint_level):
+        token = generate_access_token(SimpleNamespace(id=user_id, role='user', token_version=0))
+        with flask_app.test_request_context(method='POST', headers={'Authorization': f'Bearer {token}'}):
+            response, status = hints.reveal_hint(problem_id, hint_level)
+            return status, response.get_json()
+
+    # Verifies that partial costs 1, upgrading to full costs 1, a fresh full costs 2, and that the limit of 3 is enforced.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts costs and usage)
+    # Contributor: Brett Balquist
+    def test_cost_rules(self, flask_app, test_db):
+        status, data = self.reveal(flask_app, 1, 1, 'partial')
+        assert (status, data['cost'], data['daily_usage']) == (200, 1, 1)
+
+        status, data = self.reveal(flask_app, 1, 1, 'full')
+        assert (status, data['cost'], data['daily_usage']) == (200, 1, 2)
+
+        status, data = self.reveal(flask_app, 1, 2, 'full')
+        assert status == 429
+
+        status, data = self.reveal(flask_app, 1, 2, 'partial')
+        assert (status, data['daily_usage']) == (200, 3)
+        assert hints.get_hint_usage_today(1) == 3
+
+    # Fires concurrent single-charge requests at a file-backed database and verifies exactly the limit is granted.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts number of successful charges)
+    # Contributor: Brett Balquist
+    def test_concurrent_charges_never_exceed_limit(self, tmp_path):
+        quota_app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'quota.db'}",
+            'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+        })
+        with quota_app.app_context():
+            db.create_all()
+
+        granted = []
+
+        def charge():
+            with quota_app.app_context():
+                if hints.charge_hint_quota(1, 1) is not None:
+                    granted.append(1)
+                db.session.commit()
+
+        threads = [threading.Thread(target=charge) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(granted) == quota_app.config['HINT_DAILY_LIMIT']
+        with quota_app.app_context():
+            assert hints.get_hint_usage_today(1) == quota_app.config['HINT_DAILY_LIMIT']
+            db.engine.dispose()
+
+    # Reveals the same problem's partial hint from several threads at once and verifies only one reveal is recorded and charged.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts responses, usage rows and the charged quota)
+    # Contributor: Brett Balquist
+    def test_concurrent_reveals_of_one_problem_charge_once(self, tmp_path):
+        reveal_app = create_app({
+            'SECRET_KEY': 'test-secret-key',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'reveal.db'}",
+            'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+        })
+        with reveal_app.app_context():
+            db.create_all()
+            db.session.add(Problem(title='Hinted', description='d', difficulty='Easy', input_example='',
+                                   output_example='', test_cases='[]', hint_text='Think'))
+            db.session.commit()
+            problem_id = Problem.query.one().id
+
+        statuses = []
+
+        def reveal():
+            with reveal_app.app_context():
+                statuses.append(self.reveal(reveal_app, 1, problem_id, 'partial')[0])
+
+        threads = [threading.Thread(target=reveal) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == [200] + [400] * 5
+        with reveal_app.app_context():
+            assert UserHintUsage.query.filter_by(user_id=1, problem_id=problem_id).count() == 1
+            assert hints.get_hint_usage_today(1) == 1
+            db.engine.dispose()
@@ -0,0 +1,98 @@
+# This file tests the judge's process runner, verifying that a run is killed as soon as its output diverges from or outgrows the expected output, together with any processes it started, and that submissions run in a scratch workspace that is removed afterwards.
+# Author: Jay Patel
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import testcases
+from leetle.comparators import create_comparator
+from leetle.database import db
+from leetle.judge import stream_process, validate_submission
+from leetle.models import Problem
+
+
+class TestEarlyTermination:
+    """Test that wrong answers stop the child process immediately."""
+
+    # Verifies that output continuing past the expected answer is rejected without waiting for the program to end.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts verdict and elapsed time)
+    # Contributor: Jay Patel
+    def test_output_longer_than_expected_is_killed(self, flask_app, test_db):
+        problem = Problem(title='Endless', description='d', difficulty='Easy', input_example='', output_example='',
+                          **testcases.encode_test_cases([{'input': '', 'output': 'ok'}]))
+        db.session.add(problem)
+        db.session.commit()
+
+        started = time.monotonic()
+        is_valid, _ = validate_submission(problem, 'python', "while True:\n    print('ok', flush=True)")
+        assert not is_valid
+        assert time.monotonic() - started < 10
+
+    # Verifies that output beyond the byte limit stops the run even when the comparator cannot decide yet.
+    # Inputs: None
+    # Outputs: None (Asserts stop reason and captured size)
+    # Contributor: Jay Patel
+    def test_output_limit(self):
+        code = "import sys\nwhile True:\n    sys.stdout.write(' ' * 4096)\n    sys.stdout.flush()"
+        stdout, _, stopped = stream_process([sys.executable, '-c', code], b'', 20,
+                                            create_comparator('exact', ''), output_limit=100000)
+        assert stopped == 'output_limit'
+        assert len(stdout) <= 100000 + 65536
+
+    # Verifies that a mismatch kills processes started by the program as well as the program itself.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts the grandchild is gone)
+    # Contributor: Jay Patel
+    def test_mismatch_kills_process_group(self, tmp_path):
+        pid_file = tmp_path / 'child.pid'
+        code = (
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+            "print('wrong', flush=True)\n"
+            "time.sleep(60)\n"
+        )
+        started = time.monotonic()
+        _, _, stopped = stream_process([sys.executable, '-c', code], b'', 30, create_comparator('exact', 'right'))
+        assert stopped == 'mismatch'
+        assert time.monotonic() - started < 10
+
+        # The orphaned grandchild may linger as a zombie until init reaps it, which counts as stopped
+        stat_path = f'/proc/{int(pid_file.read_text())}/stat'
+        for _ in range(50):
+            if not os.path.exists(stat_path) or open(stat_path).read().rsplit(')', 1)[1].split()[0] in 'ZX':
+                break
+            time.sleep(0.1)
+        else:
+            raise AssertionError('grandchild still running')
+
+
+class TestWorkspace:
+    """Test per-submission scratch workspaces."""
+
+    # Verifies that all test cases run in one workspace, that files the program writes land there, and that the workspace is removed afterwards.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts verdict and scratch directory contents)
+    # Contributor: Jay Patel
+    def test_workspace_is_shared_and_removed(self, flask_app, test_db, monkeypatch, tmp_path):
+        monkeypatch.setitem(flask_app.config, 'JUDGE_SCRATCH_DIR', str(tmp_path))
+        problem = Problem(title='Workspace', description='d', difficulty='Easy', input_example='', output_example='',
+                          **testcases.encode_test_cases([{'input': str(i), 'output': str(i + 1)} for i in range(3)]))
+        db.session.add(problem)
+        db.session.commit()
+
+        # Each run appends to a file in its working directory and checks it sees the earlier runs' lines
+        code = (
+            "import os\n"
+            "input()\n"
+            "with open('runs.txt', 'a') as f:\n"
+            "    f.write('x')\n"
+            "print(len(open('runs.txt').read()) if os.path.exists('main.py') else -1)\n"
+        )
+        is_valid, _ = validate_submission(problem, 'python', code)
+        assert is_valid
+        assert os.listdir(tmp_path) == []
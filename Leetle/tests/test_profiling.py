@@ -0,0 +1,126 @@
+# This file tests the opt-in request profiler, verifying the Server-Timing header, the per-endpoint and slow request data served to admins, and the collapsed stack dumps written in sampler mode.
+# Author: Jay Patel
+
+import os
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import auth, create_app
+from leetle.database import db
+from leetle.models import Achievement
+
+
+# Builds an Authorization header for the given user id and role.
+# Inputs: user_id (int), role (str)
+# Outputs: Header dictionary
+# Contributor: Jay Patel
+def auth_headers(user_id, role='user'):
+    token = auth.generate_access_token(SimpleNamespace(id=user_id, role=role, token_version=0))
+    return {'Authorization': f'Bearer {token}'}
+
+
+# Creates an application with profiling and stack sampling on, plus a deliberately slow route that runs one query.
+# Inputs: tmp_path (fixture)
+# Outputs: Yields the Flask application, with an application context pushed
+# Contributor: Jay Patel
+@pytest.fixture
+def profiled_app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test-secret-key',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'profiled.db'}",
+        'PROFILING_ENABLED': True,
+        'PROFILING_SAMPLER': True,
+        'PROFILING_SLOW_MS': 40,
+        'PROFILING_SAMPLE_INTERVAL_MS': 1,
+        'PROFILING_MAX_DUMPS': 2,
+        'PROFILING_DIR': str(tmp_path / 'profiles'),
+    })
+
+    @app.route('/test/slow')
+    def slow_route():
+        db.session.query(Achievement).count()
+        time.sleep(0.08)
+        return 'done'
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Achievement(name='First', description='d', criteria='{}', icon='star'))
+        db.session.commit()
+        yield app
+        db.engine.dispose()
+
+
+class TestRequestProfiling:
+    """Test per-request timings, query counts and slow request stack dumps."""
+
+    # Requests the achievements endpoint and verifies the Server-Timing header reports its two queries.
+    # Inputs: profiled_app (fixture)
+    # Outputs: None (Asserts the header metrics)
+    # Contributor: Jay Patel
+    def test_server_timing_header(self, profiled_app):
+        response = profiled_app.test_client().get('/api/achievements', headers=auth_headers(1))
+
+        assert response.status_code == 200
+        timing = response.headers['Server-Timing']
+        assert re.search(r'total;dur=[\d.]+', timing)
+        assert re.search(r'cpu;dur=[\d.]+', timing)
+        assert 'desc="2 queries"' in timing
+
+    # Makes fast and slow requests and verifies the admin snapshot aggregates them and logs the slow one with its statements and stacks.
+    # Inputs: profiled_app (fixture)
+    # Outputs: None (Asserts the snapshot and the downloaded stack dump)
+    # Contributor: Jay Patel
+    def test_admin_snapshot_and_stack_dump(self, profiled_app):
+        client = profiled_app.test_client()
+        for _ in range(3):
+            client.get('/api/achievements', headers=auth_headers(1))
+        client.get('/test/slow')
+
+        snapshot = client.get('/api/admin/profiling', headers=auth_headers(1, 'admin')).get_json()
+        assert snapshot['enabled'] and snapshot['sampler']
+        assert snapshot['endpoints']['leaderboard.get_achievements']['count'] == 3
+        assert snapshot['endpoints']['leaderboard.get_achievements']['queries'] == {'avg': 2, 'max': 2}
+
+        slow = snapshot['slow_requests'][0]
+        assert slow['endpoint'] == 'slow_route'
+        assert slow['wall_ms'] >= 80
+        assert slow['queries'] == 1
+        assert 'achievement' in slow['slowest_statements'][0]['statement']
+
+        stacks = client.get(f"/api/admin/profiling/stacks/{slow['stacks']}", headers=auth_headers(1, 'admin'))
+        assert stacks.status_code == 200
+        lines = stacks.get_data(as_text=True).splitlines()
+        assert lines and all(re.match(r'^\S.* \d+$', line) for line in lines)
+        assert any('slow_route (test_profiling.py' in line for line in lines)
+
+    # Verifies that stack dumps beyond PROFILING_MAX_DUMPS are deleted and that dump names are validated.
+    # Inputs: profiled_app (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts the remaining files and 404s)
+    # Contributor: Jay Patel
+    def test_old_dumps_are_removed(self, profiled_app, tmp_path):
+        client = profiled_app.test_client()
+        for _ in range(3):
+            client.get('/test/slow')
+
+        assert len(os.listdir(tmp_path / 'profiles')) == 2
+        admin = auth_headers(1, 'admin')
+        assert client.get('/api/admin/profiling/stacks/..%2Fprofiled.db', headers=admin).status_code == 404
+        assert client.get('/api/admin/profiling/stacks/1-1-1-missing.folded', headers=admin).status_code == 404
+
+    # Verifies that profiling is off by default: no header and a disabled snapshot.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts the absence of profiling)
+    # Contributor: Jay Patel
+    def test_disabled_by_default(self, flask_app, test_db):
+        client = flask_app.test_client()
+        response = client.get('/api/achievements', headers=auth_headers(1))
+
+        assert 'Server-Timing' not in response.headers
+        assert client.get('/api/admin/profiling', headers=auth_headers(1, 'admin')).get_json() == {'enabled': False}
@@ -27,7 +27,9 @@ from typing import Dict, List, Tuple
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app import app, db, Problem
+from app import app
+from leetle import db
+from leetle.models import Problem
 
 
 class TestRunner:
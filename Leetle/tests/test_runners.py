@@ -0,0 +1,273 @@
+# This file tests the judge's warm runners, verifying that the Python zygote, the Node.js runner and the JVM judge host judge like a fresh interpreter, isolate test cases from each other, enforce time and output limits, stop wrong answers early, and fall back to plain processes for what they cannot run.
+# Author: Jay Patel
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle.comparators import create_comparator
+from leetle.judge import build_program, judge_cases
+from leetle.runners import get_runner_pool
+from leetle.sandbox import Sandbox
+from tests.test_sandbox import needs_namespaces
+
+needs_java = pytest.mark.skipif(shutil.which('java') is None or shutil.which('javac') is None,
+                                reason='a JDK is not installed')
+TWO_SUM_CASES = ((b'[2,7,11,15]\n9\n', '[0,1]'), (b'[3,2,4]\n6\n', '[1,2]'), (b'[3,3]\n6\n', '[0,1]'))
+
+
+# Reads a reference solution.
+# Inputs: name (problem file name without extension), language (string)
+# Outputs: Source code (string)
+# Contributor: Jay Patel
+def reference_solution(name, language='python'):
+    file_name = {'python': f'{name}.py', 'javascript': f'{name}.js',
+                 'java': ''.join(part.title() for part in name.split('_')) + '.java'}[language]
+    with open(os.path.join(os.path.dirname(__file__), 'reference_solutions', language, file_name)) as f:
+        return f.read()
+
+
+# Enables the Python zygote for the test.
+# Inputs: flask_app (fixture), monkeypatch (fixture)
+# Outputs: None
+# Contributor: Jay Patel
+@pytest.fixture
+def warm_python(flask_app, monkeypatch):
+    monkeypatch.setitem(flask_app.config, 'JUDGE_WARM_RUNNERS', ('python',))
+
+
+class TestPythonZygote:
+    """Test judging Python submissions on the zygote."""
+
+    # Verifies that submissions get the same verdicts and output on the zygote as in a fresh interpreter.
+    # Inputs: warm_python (fixture)
+    # Outputs: None (Asserts verdicts and output)
+    # Contributor: Jay Patel
+    def test_judges_like_cold_runs(self, warm_python):
+        with build_program('python', 'import sys\nprint(sys.argv[0].endswith("main.py"), __name__, input()[::-1])') as program:
+            assert program.runner is not None
+            assert program.run(b'abc\n')[0] == 'True __main__ cba'
+        assert judge_cases('python', reference_solution('two_sum'), TWO_SUM_CASES)[0] is True
+        assert judge_cases('python', "print('[0,1]')", TWO_SUM_CASES)[0] is False
+        assert judge_cases('python', 'def broken(:\n', TWO_SUM_CASES)[0] is False
+        assert judge_cases('python', "raise ValueError('boom')", TWO_SUM_CASES)[0] is False
+
+    # Verifies that module state changed by one test case is not seen by the next.
+    # Inputs: warm_python (fixture)
+    # Outputs: None (Asserts verdict)
+    # Contributor: Jay Patel
+    def test_cases_start_clean(self, warm_python):
+        code = "import json\njson.seen = getattr(json, 'seen', 0) + 1\nprint(json.seen)"
+        assert judge_cases('python', code, ((b'', '1'),) * 3)[0] is True
+
+    # Verifies that a case over its time limit is reported as a timeout and the zygote keeps serving later cases.
+    # Inputs: warm_python (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts the timeout and the next run)
+    # Contributor: Jay Patel
+    def test_timeout_kills_only_the_case(self, warm_python, tmp_path):
+        source = tmp_path / 'main.py'
+        source.write_text("import sys\nif sys.stdin.read() == 'spin':\n    while True:\n        pass\nprint('done')")
+        runner = get_runner_pool('python').start()
+        try:
+            started = time.monotonic()
+            with pytest.raises(subprocess.TimeoutExpired):
+                runner.run(str(source), b'spin', 0.5)
+            assert time.monotonic() - started < 3
+            assert runner.run(str(source), b'', 5) == (b'done\n', b'', None)
+        finally:
+            runner.close()
+
+    # Verifies that divergent and oversized output stop the case without waiting for it to finish.
+    # Inputs: warm_python (fixture)
+    # Outputs: None (Asserts stop reasons)
+    # Contributor: Jay Patel
+    def test_wrong_output_is_stopped_early(self, warm_python):
+        with build_program('python', "while True:\n    print('no', flush=True)") as program:
+            started = time.monotonic()
+            _, _, stopped = program.runner.run(program.source, b'', 30, create_comparator(None, 'ok'))
+            assert stopped == 'mismatch'
+            _, _, stopped = program.runner.run(program.source, b'', 30, output_limit=4096)
+            assert stopped == 'output_limit'
+            assert time.monotonic() - started < 10
+
+    # Verifies that test cases on the zygote are faster than starting an interpreter for each one.
+    # Inputs: flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts relative per-case latency)
+    # Contributor: Jay Patel
+    def test_faster_than_cold(self, flask_app, monkeypatch):
+        per_case = {}
+        for warm in (False, True):
+            monkeypatch.setitem(flask_app.config, 'JUDGE_WARM_RUNNERS', ('python',) if warm else ())
+            with build_program('python', reference_solution('two_sum')) as program:
+                started = time.perf_counter()
+                for _ in range(10):
+                    assert program.run(TWO_SUM_CASES[0][0])[2]
+                per_case[warm] = (time.perf_counter() - started) / 10
+        assert per_case[True] < per_case[False]
+
+    # Verifies that the zygote runs and judges inside the namespaces sandbox.
+    # Inputs: warm_python (fixture), flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts verdict and parent process)
+    # Contributor: Jay Patel
+    @needs_namespaces
+    def test_zygote_in_namespaces(self, warm_python, flask_app, monkeypatch):
+        monkeypatch.setitem(flask_app.extensions, 'leetle_sandbox', Sandbox('namespaces'))
+        # Idle runners already started in the default sandbox are not reused
+        monkeypatch.setitem(flask_app.extensions, 'leetle_runner_pools', {})
+        with build_program('python', 'import os\nprint(os.getppid())') as program:
+            assert program.runner is not None
+            # Each case is a child of the zygote, which is PID 1 of the sandbox
+            assert program.run(b'')[0] == '1'
+        assert judge_cases('python', reference_solution('two_sum'), TWO_SUM_CASES)[0] is True
+        get_runner_pool('python').close()
+
+
+# Enables the Node.js runner for the test.
+# Inputs: flask_app (fixture), monkeypatch (fixture)
+# Outputs: None
+# Contributor: Jay Patel
+@pytest.fixture
+def warm_node(flask_app, monkeypatch):
+    monkeypatch.setitem(flask_app.config, 'JUDGE_WARM_RUNNERS', ('javascript',))
+
+
+class TestNodeRunner:
+    """Test judging JavaScript submissions on the Node.js runner."""
+
+    # Verifies that the reference solutions and broken submissions get the same verdicts on the runner as in a fresh process.
+    # Inputs: warm_node (fixture)
+    # Outputs: None (Asserts verdicts)
+    # Contributor: Jay Patel
+    def test_judges_like_cold_runs(self, warm_node):
+        with build_program('javascript', "const fs = require('fs');\n"
+                                         "console.log(fs.readFileSync(0, 'utf8').trim().split('').reverse().join(''));") as program:
+            assert program.runner is not None
+            assert program.run(b'abc\n')[0] == 'cba'
+        assert judge_cases('javascript', reference_solution('two_sum', 'javascript'), TWO_SUM_CASES)[0] is True
+        assert judge_cases('javascript', "console.log('[0,1]')", TWO_SUM_CASES)[0] is False
+        assert judge_cases('javascript', 'function broken( {', TWO_SUM_CASES)[0] is False
+        assert judge_cases('javascript', "throw new Error('boom')", TWO_SUM_CASES)[0] is False
+        assert judge_cases('javascript', "console.log('[0,1]');\nprocess.exit(0);\nconsole.log('after')",
+                           TWO_SUM_CASES[:1])[0] is True
+
+    # Verifies that globals and built-in changes made by one test case are not seen by the next.
+    # Inputs: warm_node (fixture)
+    # Outputs: None (Asserts verdict)
+    # Contributor: Jay Patel
+    def test_cases_start_clean(self, warm_node):
+        code = "globalThis.seen = (globalThis.seen || 0) + 1;\nArray.prototype.extra = 1;\nconsole.log(seen, [].extra)"
+        assert judge_cases('javascript', code, ((b'', '1 1'),) * 3)[0] is True
+
+    # Verifies that a case over its time limit is reported as a timeout and the runner keeps serving later cases.
+    # Inputs: warm_node (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts the timeout and the next run)
+    # Contributor: Jay Patel
+    def test_timeout_kills_only_the_case(self, warm_node, tmp_path):
+        source = tmp_path / 'main.js'
+        source.write_text("const input = require('fs').readFileSync(0, 'utf8');\n"
+                          "while (input === 'spin') {}\nconsole.log('done');")
+        runner = get_runner_pool('javascript').start()
+        try:
+            started = time.monotonic()
+            with pytest.raises(subprocess.TimeoutExpired):
+                runner.run(str(source), b'spin', 0.5)
+            assert time.monotonic() - started < 3
+            assert runner.run(str(source), b'', 5) == (b'done\n', b'', None)
+        finally:
+            runner.close()
+
+    # Verifies that a program using a module the runner does not provide is judged in a plain process instead.
+    # Inputs: warm_node (fixture)
+    # Outputs: None (Asserts the verdict and that the runner was let go)
+    # Contributor: Jay Patel
+    def test_unsupported_programs_run_cold(self, warm_node):
+        code = "const { execSync } = require('child_process');\nconsole.log(execSync('echo cold').toString().trim());"
+        with build_program('javascript', code) as program:
+            assert program.runner is not None
+            assert program.run(b'')[0] == 'cold'
+            assert program.runner is None
+        assert judge_cases('javascript', code, ((b'', 'cold'),) * 2)[0] is True
+
+    # Verifies that a runner that recycles itself after its job limit is replaced and later cases still pass.
+    # Inputs: warm_node (fixture), flask_app (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts outputs and that more than one runner served the submission)
+    # Contributor: Jay Patel
+    def test_recycled_runner_is_replaced(self, warm_node, flask_app, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'JUDGE_RUNNER_MAX_JOBS', 1)
+        monkeypatch.setitem(flask_app.extensions, 'leetle_runner_pools', {})
+        runners = set()
+        with build_program('javascript', reference_solution('two_sum', 'javascript')) as program:
+            for input_data, expected in TWO_SUM_CASES:
+                assert program.run(input_data)[0] == expected
+                runners.add(program.runner.proc.pid)
+        assert len(runners) == len(TWO_SUM_CASES)
+        get_runner_pool('javascript').close()
+
+
+# Enables the JVM judge host for the test.
+# Inputs: flask_app (fixture), monkeypatch (fixture)
+# Outputs: None
+# Contributor: Jay Patel
+@pytest.fixture
+def warm_java(flask_app, monkeypatch):
+    monkeypatch.setitem(flask_app.config, 'JUDGE_WARM_RUNNERS', ('java',))
+
+
+@needs_java
+class TestJudgeHost:
+    """Test judging Java submissions on the JVM judge host."""
+
+    # Verifies that the reference solution and broken submissions get the same verdicts on the host as in a fresh JVM.
+    # Inputs: warm_java (fixture)
+    # Outputs: None (Asserts verdicts)
+    # Contributor: Jay Patel
+    def test_judges_like_cold_runs(self, warm_java):
+        with build_program('java', reference_solution('two_sum', 'java')) as program:
+            assert program.runner is not None
+            assert program.run(TWO_SUM_CASES[0][0])[0] == TWO_SUM_CASES[0][1]
+        assert judge_cases('java', reference_solution('two_sum', 'java'), TWO_SUM_CASES)[0] is True
+        wrong = 'public class Main { public static void main(String[] a) { System.out.println("[0,1]"); } }'
+        assert judge_cases('java', wrong, TWO_SUM_CASES)[0] is False
+        throws = 'public class Main { public static void main(String[] a) { throw new RuntimeException("boom"); } }'
+        assert judge_cases('java', throws, TWO_SUM_CASES)[0] is False
+
+    # Verifies that static fields start from their initial values in every test case.
+    # Inputs: warm_java (fixture)
+    # Outputs: None (Asserts verdict)
+    # Contributor: Jay Patel
+    def test_cases_start_clean(self, warm_java):
+        code = 'public class Main { static int seen; public static void main(String[] a) { System.out.println(++seen); } }'
+        assert judge_cases('java', code, ((b'', '1'),) * 3)[0] is True
+
+    # Verifies that a case over its time limit is reported as a timeout and a later case still runs.
+    # Inputs: warm_java (fixture)
+    # Outputs: None (Asserts the timeout and the next run)
+    # Contributor: Jay Patel
+    def test_timeout_interrupts_the_case(self, warm_java):
+        code = ('public class Main { public static void main(String[] a) throws Exception {\n'
+                '    if (new java.util.Scanner(System.in).nextLine().equals("spin")) { Thread.sleep(60000); }\n'
+                '    System.out.println("done"); } }')
+        with build_program('java', code) as program:
+            source = program.source
+            started = time.monotonic()
+            with pytest.raises(subprocess.TimeoutExpired):
+                program.runner.run(source, b'spin\n', 0.5)
+            assert time.monotonic() - started < 3
+            assert program.runner.run(source, b'go\n', 5) == (b'done\n', b'', None)
+
+    # Verifies that a program calling System.exit, which would end the host, is judged in a plain JVM instead.
+    # Inputs: warm_java (fixture)
+    # Outputs: None (Asserts the verdict and that the runner was let go)
+    # Contributor: Jay Patel
+    def test_exit_runs_cold(self, warm_java):
+        code = 'public class Main { public static void main(String[] a) { System.out.println("cold"); System.exit(0); } }'
+        with build_program('java', code) as program:
+            assert program.run(b'')[0] == 'cold'
+            assert program.runner is None
+        assert judge_cases('java', code, ((b'', 'cold'),) * 2)[0] is True
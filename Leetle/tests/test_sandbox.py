@@ -0,0 +1,136 @@
+# This file tests the judge sandbox, verifying that the namespaces backend isolates the process ID space, network and filesystem and limits memory, and that misconfiguration is reported when the sandbox is created.
+# Author: Tej Gumaste
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import testcases
+from leetle.database import db
+from leetle.judge import stream_process, validate_submission
+from leetle.models import Problem
+from leetle.sandbox import Sandbox
+
+
+# Returns True when this host lets an unprivileged user create the namespaces the sandbox needs.
+# Inputs: None
+# Outputs: bool
+# Contributor: Tej Gumaste
+def namespaces_available():
+    try:
+        return subprocess.run(Sandbox('namespaces').wrap(['true']), capture_output=True, timeout=10).returncode == 0
+    except (RuntimeError, OSError, subprocess.TimeoutExpired):
+        return False
+
+
+needs_namespaces = pytest.mark.skipif(not namespaces_available(), reason='user namespaces are not available')
+
+
+class TestSandbox:
+    """Test sandbox construction and isolation."""
+
+    # Verifies that unknown backends and cgroup roots that are not cgroup v2 directories are rejected.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts raised errors)
+    # Contributor: Tej Gumaste
+    def test_invalid_configuration(self, tmp_path):
+        with pytest.raises(ValueError):
+            Sandbox('docker')
+        if namespaces_available():
+            with pytest.raises(RuntimeError, match='cgroup v2'):
+                Sandbox('namespaces', cgroup_root=str(tmp_path))
+
+    # Verifies that the process backend runs the command unchanged.
+    # Inputs: None
+    # Outputs: None (Asserts command)
+    # Contributor: Tej Gumaste
+    def test_process_backend_is_passthrough(self):
+        with Sandbox('process').launch(['python3', 'main.py']) as run:
+            assert run.args == ['python3', 'main.py']
+
+    # Verifies that a sandboxed program is PID 1 of its own namespace, holds no capabilities and has no network.
+    # Inputs: None
+    # Outputs: None (Asserts the program's view of the system)
+    # Contributor: Tej Gumaste
+    @needs_namespaces
+    def test_namespaces_isolate_program(self):
+        code = (
+            "import os, socket\n"
+            "print(os.getpid())\n"
+            "print(open('/proc/self/status').read().split('CapEff:')[1].split()[0])\n"
+            "try:\n"
+            "    socket.create_connection(('1.1.1.1', 80), timeout=1)\n"
+            "    print('online')\n"
+            "except OSError:\n"
+            "    print('offline')\n"
+        )
+        with Sandbox('namespaces').launch([sys.executable, '-c', code]) as run:
+            stdout, stderr, _ = stream_process(run.args, b'', 20)
+        assert stdout.split() == [b'1', b'0000000000000000', b'offline'], stderr
+
+    # Verifies that submissions are judged normally through the namespaces backend.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts judging result)
+    # Contributor: Tej Gumaste
+    @needs_namespaces
+    def test_judging_in_namespaces(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setitem(flask_app.extensions, 'leetle_sandbox', Sandbox('namespaces'))
+        problem = Problem(title='Sandboxed', description='d', difficulty='Easy', input_example='', output_example='',
+                          **testcases.encode_test_cases([{'input': '20', 'output': '40'}]))
+        db.session.add(problem)
+        db.session.commit()
+
+        assert validate_submission(problem, 'python', 'print(int(input()) * 2)')[0]
+
+    # Verifies that a sandboxed program cannot read the application directory or other host files and can write only to its workspace and private /tmp.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts what the program can open)
+    # Contributor: Tej Gumaste
+    @needs_namespaces
+    def test_namespaces_hide_host_filesystem(self, tmp_path):
+        workspace = tmp_path / 'workspace'
+        workspace.mkdir()
+        app_file = os.path.join(os.path.dirname(__file__), '..', 'app.py')
+        secret = tmp_path / 'secret.txt'
+        secret.write_text('secret')
+        code = (
+            "import os, sys\n"
+            "def check(path, mode):\n"
+            "    try:\n"
+            "        open(path, mode).close()\n"
+            "        print('open')\n"
+            "    except OSError:\n"
+            "        print('denied')\n"
+            f"check({os.path.abspath(app_file)!r}, 'r')\n"
+            f"check({str(secret)!r}, 'r')\n"
+            "check('/usr/bad', 'w')\n"
+            "check('/tmp/scratch', 'w')\n"
+            "check('out.txt', 'w')\n"
+            "print('SECRET_KEY' in os.environ)\n"
+        )
+        with Sandbox('namespaces').launch([sys.executable, '-c', code], workspace=str(workspace)) as run:
+            stdout, stderr, _ = stream_process(run.args, b'', 20, cwd=str(workspace))
+        assert os.path.exists(app_file)
+        assert stdout.split() == [b'denied', b'denied', b'denied', b'open', b'open', b'False'], stderr
+        assert (workspace / 'out.txt').exists()
+
+    # Verifies that without a cgroup the memory limit is enforced by an rlimit.
+    # Inputs: None
+    # Outputs: None (Asserts the allocation fails)
+    # Contributor: Tej Gumaste
+    @needs_namespaces
+    def test_memory_limit_without_cgroup(self):
+        code = (
+            "try:\n"
+            "    data = bytearray(256 * 1024 * 1024)\n"
+            "    print('allocated')\n"
+            "except MemoryError:\n"
+            "    print('limited')\n"
+        )
+        with Sandbox('namespaces', memory_limit_mb=128).launch([sys.executable, '-c', code]) as run:
+            stdout, stderr, _ = stream_process(run.args, b'', 20)
+        assert stdout.split() == [b'limited'], stderr
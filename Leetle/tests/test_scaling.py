@@ -0,0 +1,209 @@
+# This file tests how the read endpoints scale on a large synthetic dataset, asserting per-endpoint query counts (and, when asked, latency budgets), and that the dataset generator is deterministic and internally consistent. Set LEETLE_SCALING_USERS and LEETLE_SCALING_SUBMISSIONS (e.g. 10000 and 2000000) to run it at production scale. Latency depends on the machine, so the budgets are only enforced when LEETLE_SCALING_CHECK_LATENCY=1, e.g. on a dedicated benchmark host; LEETLE_SCALING_LATENCY_SCALE loosens them there.
+# Author: Jay Patel
+
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import auth, create_app, datagen, seed
+from leetle.database import db
+from leetle.models import Submission, User, UserHintQuota, UserStats
+from leetle.submit import calculate_user_streak
+
+USERS = int(os.getenv('LEETLE_SCALING_USERS', '400'))
+SUBMISSIONS = int(os.getenv('LEETLE_SCALING_SUBMISSIONS', '40000'))
+LATENCY_SCALE = float(os.getenv('LEETLE_SCALING_LATENCY_SCALE', '1'))
+CHECK_LATENCY = os.getenv('LEETLE_SCALING_CHECK_LATENCY', '').lower() in ('1', 'true', 'yes')
+
+# Endpoint: (maximum SQL statements, latency budget in ms at the default size). Query counts must not depend on
+# the number of users or submissions and are always checked; the latency budgets only with LEETLE_SCALING_CHECK_LATENCY.
+BUDGETS = {
+    '/api/leaderboard': (1, 100),
+    '/api/leaderboard?period=daily': (1, 100),
+    '/api/leaderboard?period=weekly': (1, 100),
+    '/api/user/stats/{user_id}': (4, 200),
+    '/api/achievements': (2, 50),
+    '/api/admin/users': (1, 200),
+    '/api/admin/analytics': (7, 400),
+    '/api/admin/problems': (2, 200),
+}
+
+
+# Creates an application on a temporary SQLite file and fills it with a generated dataset of the configured size.
+# Inputs: tmp_path_factory (fixture)
+# Outputs: Yields the Flask application
+# Contributor: Jay Patel
+@pytest.fixture(scope='module')
+def scaled_app(tmp_path_factory):
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test-secret-key',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path_factory.mktemp('scaling') / 'scaling.db'}",
+        'TESTCASE_BLOB_DIR': str(tmp_path_factory.mktemp('testcases')),
+    })
+    with app.app_context():
+        db.create_all()
+        seed.import_achievements([os.path.join(seed.SEED_DIR, 'achievements')])
+        datagen.generate_dataset(users=USERS, submissions=SUBMISSIONS, problems=30, seed=7)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+# Counts the SQL statements executed on the current app's engine while the block runs.
+# Inputs: None
+# Outputs: Yields a list that receives one entry per statement
+# Contributor: Jay Patel
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+# Builds an Authorization header for the given user id and role.
+# Inputs: user_id (int), role (str)
+# Outputs: Header dictionary
+# Contributor: Jay Patel
+def auth_headers(user_id, role='user'):
+    token = auth.generate_access_token(SimpleNamespace(id=user_id, role=role, token_version=0))
+    return {'Authorization': f'Bearer {token}'}
+
+
+# Requests a URL and measures it, keeping the fastest of a few runs so a single scheduling hiccup cannot fail the budget.
+# Inputs: client (test client), url (str), headers (dict), runs (int)
+# Outputs: (response, SQL statement count, best latency in ms)
+# Contributor: Jay Patel
+def measure(client, url, headers, runs=3):
+    best = None
+    for _ in range(runs):
+        with count_queries() as statements:
+            started = time.perf_counter()
+            response = client.get(url, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+        assert response.status_code == 200, (url, response.get_json())
+        best = elapsed if best is None else min(best, elapsed)
+    return response, len(statements), best
+
+
+# Finds the users with the most and the fewest submissions.
+# Inputs: None
+# Outputs: (most active user id, least active user id)
+# Contributor: Jay Patel
+def busiest_and_quietest():
+    counts = db.session.query(Submission.user_id, db.func.count(Submission.id)).group_by(Submission.user_id).all()
+    counts.sort(key=lambda row: (row[1], row[0]))
+    return counts[-1][0], counts[0][0]
+
+
+class TestEndpointBudgets:
+    """Test query counts and latency of the read endpoints on a large dataset."""
+
+    # Requests each budgeted endpoint as the busiest user and verifies its SQL statement count, and its latency when enabled.
+    # Inputs: scaled_app (fixture), url (str), budget (tuple)
+    # Outputs: None (Asserts the budgets)
+    # Contributor: Jay Patel
+    @pytest.mark.parametrize('url,budget', BUDGETS.items(), ids=list(BUDGETS))
+    def test_endpoint_within_budget(self, scaled_app, url, budget):
+        max_queries, max_ms = budget
+        with scaled_app.app_context():
+            busiest, _ = busiest_and_quietest()
+            role = 'admin' if url.startswith('/api/admin') else 'user'
+            _, queries, elapsed = measure(scaled_app.test_client(), url.format(user_id=busiest),
+                                          auth_headers(busiest, role))
+        assert queries <= max_queries, f'{url} ran {queries} SQL statements (budget {max_queries})'
+        if CHECK_LATENCY:
+            # Latency budgets are set for the default size; larger datasets scale them with the submission count
+            allowed_ms = max_ms * LATENCY_SCALE * max(1.0, SUBMISSIONS / 40000)
+            assert elapsed <= allowed_ms, f'{url} took {elapsed:.0f} ms (budget {allowed_ms:.0f} ms)'
+
+    # Verifies that user statistics cost the same number of queries for the busiest and quietest users.
+    # Inputs: scaled_app (fixture)
+    # Outputs: None (Asserts equal statement counts and matching totals)
+    # Contributor: Jay Patel
+    def test_user_stats_queries_do_not_grow_with_activity(self, scaled_app):
+        with scaled_app.app_context():
+            busiest, quietest = busiest_and_quietest()
+            client = scaled_app.test_client()
+            response, busy_queries, _ = measure(client, f'/api/user/stats/{busiest}', auth_headers(busiest), runs=1)
+            _, quiet_queries, _ = measure(client, f'/api/user/stats/{quietest}', auth_headers(quietest), runs=1)
+            total = Submission.query.filter_by(user_id=busiest).count()
+
+        assert busy_queries == quiet_queries
+        data = response.get_json()
+        assert sum(lang['attempts'] for lang in data['language_stats'].values()) == total
+        assert data['stats']['total_attempts'] == total
+
+    # Verifies that the leaderboard is ordered by score and returns at most the requested number of users.
+    # Inputs: scaled_app (fixture)
+    # Outputs: None (Asserts ordering and limit)
+    # Contributor: Jay Patel
+    def test_leaderboard_ranks_in_database(self, scaled_app):
+        with scaled_app.app_context():
+            response, _, _ = measure(scaled_app.test_client(), '/api/leaderboard?limit=25', auth_headers(1), runs=1)
+
+        entries = response.get_json()['leaderboard']
+        assert len(entries) == min(25, USERS)
+        assert [entry['rank'] for entry in entries] == list(range(1, len(entries) + 1))
+        scores = [entry['score'] for entry in entries]
+        assert scores == sorted(scores, reverse=True)
+
+
+class TestDatasetGenerator:
+    """Test that generated datasets are deterministic and consistent with what the app derives."""
+
+    # Generates the same dataset into two databases and verifies the submissions are identical.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts equal rows)
+    # Contributor: Jay Patel
+    def test_same_seed_gives_same_rows(self, tmp_path):
+        now = datetime(2025, 3, 1, 12, 0)
+        rows = []
+        for name in ('first', 'second'):
+            app = create_app({'SECRET_KEY': 'test-secret-key',
+                              'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / name}.db"})
+            with app.app_context():
+                db.create_all()
+                datagen.generate_dataset(users=30, submissions=2000, problems=5, seed=3, now=now, batch_size=300)
+                rows.append(db.session.query(Submission.user_id, Submission.problem_id, Submission.language,
+                                             Submission.is_correct, Submission.submitted_at)
+                            .order_by(Submission.id).all())
+                db.engine.dispose()
+
+        assert len(rows[0]) == 2000
+        assert rows[0] == rows[1]
+
+    # Verifies that generated stats, streaks and hint quotas agree with the submissions and the daily limit.
+    # Inputs: scaled_app (fixture)
+    # Outputs: None (Asserts derived values)
+    # Contributor: Jay Patel
+    def test_derived_rows_match_submissions(self, scaled_app):
+        with scaled_app.app_context():
+            attempts = Counter(dict(db.session.query(Submission.user_id, db.func.count(Submission.id))
+                                    .group_by(Submission.user_id).all()))
+            for stats in UserStats.query.all():
+                assert stats.total_attempts == attempts[stats.user_id]
+
+            busiest, _ = busiest_and_quietest()
+            user = db.session.get(User, busiest)
+            assert user.total_solutions == Submission.query.filter_by(user_id=busiest, is_correct=True).count()
+            assert user.current_streak == calculate_user_streak(user)
+            assert user.longest_streak >= user.current_streak
+
+            assert db.session.query(db.func.max(UserHintQuota.used)).scalar() <= scaled_app.config['HINT_DAILY_LIMIT']
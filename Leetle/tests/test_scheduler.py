@@ -0,0 +1,150 @@
+# This file tests the code execution scheduler, verifying the concurrency cap, per-user limits, round-robin service across users, queue timeouts, and the 429 response from /submit.
+# Author: Jay Patel
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle.auth import generate_access_token
+from leetle.database import db
+from leetle.models import User
+from leetle.scheduler import ExecutionScheduler, SchedulerOverloaded, get_scheduler
+
+
+# Starts a thread that takes a scheduler slot for the user, records the order in which users got in, and holds the slot until released.
+# Inputs: scheduler (ExecutionScheduler), user_id (int), order (list), release (threading.Event)
+# Outputs: Started thread
+# Contributor: Jay Patel
+def hold_slot(scheduler, user_id, order, release):
+    def run():
+        with scheduler.slot(user_id):
+            order.append(user_id)
+            release.wait(5)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+# Waits until the scheduler has the given number of queued submissions.
+# Inputs: scheduler (ExecutionScheduler), queued (int)
+# Outputs: None
+# Contributor: Jay Patel
+def wait_for_queue(scheduler, queued):
+    deadline = time.monotonic() + 5
+    while scheduler.snapshot()['queued'] != queued:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+class TestExecutionScheduler:
+    """Test admission and ordering in the execution scheduler."""
+
+    # Verifies that with one slot, queued submissions are served alternately across users rather than in arrival order.
+    # Inputs: None
+    # Outputs: None (Asserts service order and metrics)
+    # Contributor: Jay Patel
+    def test_round_robin_across_users(self):
+        scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=3, max_queue_depth=10, queue_timeout=5)
+        order, release = [], threading.Event()
+        threads = [hold_slot(scheduler, 'a', order, release)]
+        wait_for_queue(scheduler, 0)
+        for count, user_id in enumerate(['a', 'a', 'b'], start=1):
+            threads.append(hold_slot(scheduler, user_id, order, release))
+            wait_for_queue(scheduler, count)
+
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert order == ['a', 'a', 'b', 'a']
+        snapshot = scheduler.snapshot()
+        assert (snapshot['admitted'], snapshot['completed'], snapshot['running']) == (4, 4, 0)
+        assert snapshot['queue_time']['max'] > 0
+
+    # Verifies that a user over the per-user limit and a full queue are both rejected with a retry delay.
+    # Inputs: None
+    # Outputs: None (Asserts rejection reasons)
+    # Contributor: Jay Patel
+    def test_limits_reject(self):
+        scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=1, max_queue_depth=1, queue_timeout=5)
+        release = threading.Event()
+        threads = [hold_slot(scheduler, 'a', [], release)]
+        wait_for_queue(scheduler, 0)
+        while scheduler.snapshot()['running'] != 1:
+            time.sleep(0.005)
+
+        with pytest.raises(SchedulerOverloaded) as error:
+            scheduler.acquire('a')
+        assert error.value.reason == 'user' and error.value.retry_after >= 1
+
+        threads.append(hold_slot(scheduler, 'b', [], release))
+        wait_for_queue(scheduler, 1)
+        with pytest.raises(SchedulerOverloaded, match='queue'):
+            scheduler.acquire('c')
+
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    # Verifies that a submission waiting longer than the queue timeout gives up and leaves the queue.
+    # Inputs: None
+    # Outputs: None (Asserts rejection and scheduler state)
+    # Contributor: Jay Patel
+    def test_queue_timeout(self):
+        scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=2, max_queue_depth=5, queue_timeout=0.05)
+        with scheduler.slot('a'):
+            with pytest.raises(SchedulerOverloaded, match='timeout'):
+                scheduler.acquire('b')
+            snapshot = scheduler.snapshot()
+            assert (snapshot['queued'], snapshot['waiting_users'], snapshot['rejected_timeout']) == (0, 0, 1)
+        assert scheduler.snapshot()['running'] == 0
+
+
+class TestSubmitAdmission:
+    """Test the scheduler in front of /submit."""
+
+    # Verifies that a submission from a user already at their limit gets 429 with Retry-After before any code runs.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts status and headers)
+    # Contributor: Jay Patel
+    def test_submit_returns_429_when_saturated(self, flask_app, test_db, monkeypatch):
+        user = User(email='busy@leetle.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=1, max_queue_depth=1, queue_timeout=1)
+        monkeypatch.setitem(flask_app.extensions, 'leetle_scheduler', scheduler)
+
+        token = generate_access_token(SimpleNamespace(id=user.id, role='user', token_version=0))
+        with scheduler.slot(user.id):
+            response = flask_app.test_client().post('/submit', headers={'Authorization': f'Bearer {token}'},
+                                                    json={'language': 'python', 'code': 'print(1)'})
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        assert scheduler.snapshot()['rejected_user'] == 1
+
+    # Verifies that threads racing to the first submission all get the same scheduler.
+    # Inputs: flask_app (fixture)
+    # Outputs: None (Asserts a single instance)
+    # Contributor: Jay Patel
+    def test_concurrent_first_use_creates_one_scheduler(self, flask_app):
+        flask_app.extensions.pop('leetle_scheduler', None)
+        barrier = threading.Barrier(8)
+        schedulers = []
+
+        def first_use():
+            with flask_app.app_context():
+                barrier.wait()
+                schedulers.append(get_scheduler())
+
+        threads = [threading.Thread(target=first_use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(schedulers) == 8 and len(set(map(id, schedulers))) == 1
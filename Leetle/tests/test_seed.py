@@ -0,0 +1,146 @@
+# This file tests the problem and achievement loader, verifying that imports are idempotent, that changed definitions are updated in place, that the flask leetle commands run end to end, and that no admin is created without a configured password.
+# Author: Tej Gumaste
+
+import json
+import os
+import sys
+
+import pytest
+from werkzeug.security import check_password_hash
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import seed
+from leetle.database import db
+from leetle.models import Achievement, Problem, User
+
+
+# Writes a list of problem definitions as a JSON file in the given directory.
+# Inputs: directory (Path), name (str), problems (list of dict)
+# Outputs: Path of the written file
+# Contributor: Tej Gumaste
+def write_problems(directory, name, problems):
+    path = directory / name
+    path.write_text(json.dumps(problems))
+    return path
+
+
+# Builds a problem definition with the given title and number of test cases.
+# Inputs: title (str), cases (int)
+# Outputs: Problem definition (dict)
+# Contributor: Tej Gumaste
+def make_problem(title, cases=2):
+    return {
+        'title': title,
+        'description': f'Solve {title}',
+        'difficulty': 'Easy',
+        'test_cases': [{'input': str(i), 'output': str(i * 2)} for i in range(cases)],
+    }
+
+
+class TestProblemImport:
+    """Test bulk upserts of problem definitions."""
+
+    # Imports a directory twice and verifies the second run writes nothing, then changes one definition and verifies only it is updated.
+    # Inputs: flask_app (fixture), test_db (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts import counts and stored values)
+    # Contributor: Tej Gumaste
+    def test_import_is_idempotent_and_updates_changes(self, flask_app, test_db, tmp_path):
+        problems = [make_problem(f'Bank {i}') for i in range(30)]
+        write_problems(tmp_path, 'bank.json', problems)
+
+        assert seed.import_problems([str(tmp_path)], batch_size=7) == {'inserted': 30, 'updated': 0, 'unchanged': 0}
+        assert seed.import_problems([str(tmp_path)]) == {'inserted': 0, 'updated': 0, 'unchanged': 30}
+
+        problems[3]['test_cases'].append({'input': '9', 'output': '18'})
+        write_problems(tmp_path, 'bank.json', problems)
+        assert seed.import_problems([str(tmp_path)]) == {'inserted': 0, 'updated': 1, 'unchanged': 29}
+
+        updated = Problem.query.filter_by(title='Bank 3').one()
+        assert len(json.loads(updated.test_cases)) == 3
+        assert updated.version == 2
+        assert Problem.query.filter_by(title='Bank 4').one().version == 1
+
+    # Verifies that YAML files are read alongside JSON files and that invalid definitions name their source file.
+    # Inputs: flask_app (fixture), test_db (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts import counts and error message)
+    # Contributor: Tej Gumaste
+    def test_yaml_files_and_validation_errors(self, flask_app, test_db, tmp_path):
+        pytest.importorskip('yaml')
+        (tmp_path / 'one.yaml').write_text(
+            'title: YAML Problem\n'
+            'description: From YAML\n'
+            'difficulty: Hard\n'
+            'test_cases:\n'
+            '  - {input: "1", output: "2"}\n'
+        )
+        assert seed.import_problems([str(tmp_path)])['inserted'] == 1
+        assert Problem.query.filter_by(title='YAML Problem').one().difficulty == 'Hard'
+
+        bad = write_problems(tmp_path, 'bad.json', [{'title': 'No Cases', 'description': 'x'}])
+        with pytest.raises(seed.SeedError, match='bad.json'):
+            seed.import_problems([str(bad)])
+
+    # Verifies that importing a YAML file without PyYAML installed fails with a SeedError that says so.
+    # Inputs: flask_app (fixture), test_db (fixture), tmp_path (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts the error message)
+    # Contributor: Tej Gumaste
+    def test_yaml_without_pyyaml(self, flask_app, test_db, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'yaml', None)
+        (tmp_path / 'one.yaml').write_text('title: YAML Problem\n')
+        with pytest.raises(seed.SeedError, match='one.yaml: reading YAML definitions needs PyYAML'):
+            seed.import_problems([str(tmp_path)])
+
+
+class TestSeedCommand:
+    """Test the flask leetle commands."""
+
+    # Runs `flask leetle seed` twice and verifies the bundled definitions and admin are created once.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts command output and row counts)
+    # Contributor: Tej Gumaste
+    def test_seed_command_is_repeatable(self, flask_app, test_db):
+        runner = flask_app.test_cli_runner()
+
+        first = runner.invoke(args=['leetle', 'seed'])
+        assert first.exit_code == 0, first.output
+        assert 'Created admin user' in first.output
+
+        second = runner.invoke(args=['leetle', 'seed'])
+        assert second.exit_code == 0, second.output
+        assert 'Problems: 0 inserted, 0 updated, 5 unchanged' in second.output
+
+        assert Achievement.query.count() == 6
+        assert User.query.filter_by(role='admin').count() == 1
+
+    # Verifies that outside TESTING, seed creates no admin without LEETLE_ADMIN_PASSWORD and uses it when set.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts the warning and the created admin)
+    # Contributor: Tej Gumaste
+    def test_seed_requires_admin_password(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'TESTING', False)
+        monkeypatch.delenv('LEETLE_ADMIN_PASSWORD', raising=False)
+        runner = flask_app.test_cli_runner()
+
+        skipped = runner.invoke(args=['leetle', 'seed'])
+        assert skipped.exit_code == 0, skipped.output
+        assert 'no admin user created' in skipped.output
+        assert User.query.filter_by(role='admin').count() == 0
+
+        monkeypatch.setenv('LEETLE_ADMIN_PASSWORD', 'a-long-deploy-secret')
+        created = runner.invoke(args=['leetle', 'seed'])
+        assert 'Created admin user' in created.output
+        admin = User.query.filter_by(role='admin').one()
+        assert check_password_hash(admin.password_hash, 'a-long-deploy-secret')
+
+    # Runs `flask leetle import-problems` on a file and verifies the rows are loaded.
+    # Inputs: flask_app (fixture), test_db (fixture), tmp_path (fixture)
+    # Outputs: None (Asserts command output)
+    # Contributor: Tej Gumaste
+    def test_import_problems_command(self, flask_app, test_db, tmp_path):
+        path = write_problems(tmp_path, 'bank.json', [make_problem('CLI One'), make_problem('CLI Two')])
+        result = flask_app.test_cli_runner().invoke(args=['leetle', 'import-problems', str(path)])
+
+        assert result.exit_code == 0, result.output
+        assert 'Problems: 2 inserted' in result.output
+        assert db.session.query(Problem).filter(Problem.title.like('CLI%')).count() == 2
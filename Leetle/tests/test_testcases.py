@@ -0,0 +1,189 @@
+# This file tests test-case storage, verifying that large sets move to the content-addressed blob store, that blobs no problem references are swept, that prepared sets are cached by problem version, and that problem queries leave test cases unloaded.
+# Author: Jay Patel
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import testcases
+from leetle.blobstore import BlobStore
+from leetle.database import db
+from leetle.judge import validate_submission
+from leetle.models import Problem
+
+
+# Empties the process-wide prepared test-case cache around each test.
+# Inputs: monkeypatch (fixture)
+# Outputs: None
+# Contributor: Jay Patel
+@pytest.fixture(autouse=True)
+def clear_prepared_cache(monkeypatch):
+    monkeypatch.setattr(testcases, 'prepared_test_case_cache', testcases.OrderedDict())
+    monkeypatch.setattr(testcases, 'prepared_test_case_cache_bytes', 0)
+
+
+# Creates a problem whose test cases are stored through the testcases module.
+# Inputs: title (str), cases (list of dict)
+# Outputs: Problem object (committed)
+# Contributor: Jay Patel
+def add_problem(title, cases):
+    problem = Problem(title=title, description='d', difficulty='Easy', input_example='', output_example='',
+                      **testcases.encode_test_cases(cases))
+    db.session.add(problem)
+    db.session.commit()
+    return problem
+
+
+class TestBlobStore:
+    """Test the content-addressed blob store."""
+
+    # Verifies that identical content is stored once under its SHA-256 and read back intact.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts digests and contents)
+    # Contributor: Jay Patel
+    def test_put_is_content_addressed(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        first = store.put('héllo'.encode('utf-8'))
+        assert store.put('héllo'.encode('utf-8')) == first
+        assert os.path.exists(os.path.join(str(tmp_path), first[:2], first[2:]))
+        assert store.read_text(first) == 'héllo'
+        with pytest.raises(FileNotFoundError):
+            store.read_text('0' * 64)
+
+
+class TestExternalTestCases:
+    """Test inline versus blob-backed test cases."""
+
+    # Verifies that a set over the inline limit is stored as a blob, read back intact and judged correctly.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts storage location and judging result)
+    # Contributor: Jay Patel
+    def test_large_sets_use_blob_store(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'TESTCASE_INLINE_MAX_BYTES', 64)
+        cases = [{'input': 'x' * 100 + str(i), 'output': str(i)} for i in range(5)]
+        problem = add_problem('Large Input', cases)
+
+        assert problem.test_cases_hash
+        assert problem.test_cases == '[]'
+        assert testcases.load_test_cases(problem) == cases
+
+        is_valid, _ = validate_submission(problem, 'python', "import sys\nprint(sys.stdin.read().strip()[100:])")
+        assert is_valid
+
+    # Verifies that the sweep deletes old blobs no problem references while keeping referenced and recently written ones.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts which blobs remain)
+    # Contributor: Jay Patel
+    def test_orphaned_blobs_are_collected(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'TESTCASE_INLINE_MAX_BYTES', 64)
+        problem = add_problem('Replaced', [{'input': 'y' * 100, 'output': 'old'}])
+        old_digest = problem.test_cases_hash
+        testcases.set_test_cases(problem, [{'input': 'y' * 100, 'output': 'new'}])
+        db.session.commit()
+        store = testcases.get_blob_store()
+        fresh = store.put(b'written for a problem that is not committed yet')
+        an_hour_ago = time.time() - 3601
+        for digest in (old_digest, problem.test_cases_hash):
+            os.utime(store.path(digest), (an_hour_ago, an_hour_ago))
+
+        assert testcases.collect_orphaned_blobs() == 1
+        assert not store.exists(old_digest)
+        assert store.exists(problem.test_cases_hash) and store.exists(fresh)
+        assert testcases.load_test_cases(problem) == [{'input': 'y' * 100, 'output': 'new'}]
+
+    # Verifies that small sets stay inline and that listing problems does not load the test case column.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts inline storage and deferred loading)
+    # Contributor: Jay Patel
+    def test_small_sets_inline_and_deferred(self, flask_app, test_db):
+        add_problem('Small Input', [{'input': '1', 'output': '2'}])
+        db.session.expunge_all()
+
+        problems = Problem.query.all()
+        assert all('test_cases' not in problem.__dict__ for problem in problems)
+        small = next(p for p in problems if p.title == 'Small Input')
+        assert small.test_cases_hash is None
+        assert testcases.load_test_cases(small) == [{'input': '1', 'output': '2'}]
+
+    # Verifies that prepared sets are normalized once and that a cache hit parses nothing and leaves the deferred column unloaded.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts prepared values and cache use)
+    # Contributor: Jay Patel
+    def test_prepared_sets_are_cached_by_version(self, flask_app, test_db, monkeypatch):
+        problem_id = add_problem('Prepared', [{'input': '3', 'output': ' 6\n'}]).id
+        db.session.expunge_all()
+
+        problem = db.session.get(Problem, problem_id)
+        assert testcases.get_prepared_test_cases(problem) == ((b'3', '6'),)
+
+        db.session.expunge_all()
+        problem = db.session.get(Problem, problem_id)
+        monkeypatch.setattr(testcases.json, 'loads', lambda *args: pytest.fail('parsed on a cache hit'))
+        assert testcases.get_prepared_test_cases(problem) == ((b'3', '6'),)
+        assert 'test_cases' not in problem.__dict__
+
+    # Verifies that replacing test cases bumps the version so the judge never sees the stale cached set.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts version and prepared values)
+    # Contributor: Jay Patel
+    def test_editing_test_cases_bumps_version(self, flask_app, test_db):
+        problem = add_problem('Edited', [{'input': '1', 'output': '1'}])
+        assert problem.version == 1
+        assert testcases.get_prepared_test_cases(problem) == ((b'1', '1'),)
+
+        testcases.set_test_cases(problem, [{'input': '2', 'output': '4'}])
+        db.session.commit()
+        assert problem.version == 2
+        assert testcases.get_prepared_test_cases(problem) == ((b'2', '4'),)
+
+    # Verifies that every update gives the prepared set a new cache key, even when another worker bumped the version after this one loaded the problem.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts distinct cache keys and prepared values)
+    # Contributor: Jay Patel
+    def test_concurrent_edits_get_distinct_versions(self, flask_app, test_db):
+        problem = add_problem('Concurrent', [{'input': '1', 'output': '1'}])
+        keys = [(problem.id, problem.created_at, problem.version)]
+
+        # Another worker's edit lands while this session still holds version 1
+        db.session.execute(db.update(Problem).where(Problem.id == problem.id).values(version=Problem.version + 1)
+                           .execution_options(synchronize_session=False))
+        for output in ('2', '3'):
+            testcases.set_test_cases(problem, [{'input': '1', 'output': output}])
+            db.session.commit()
+            keys.append((problem.id, problem.created_at, problem.version))
+            assert testcases.get_prepared_test_cases(problem) == ((b'1', output),)
+
+        assert [key[2] for key in keys] == [1, 3, 4]
+        assert len(set(keys)) == len(keys)
+
+    # Verifies that a problem reusing a deleted problem's id does not get the deleted problem's cached set.
+    # Inputs: flask_app (fixture), test_db (fixture)
+    # Outputs: None (Asserts prepared values)
+    # Contributor: Jay Patel
+    def test_reused_id_is_not_served_stale_set(self, flask_app, test_db):
+        old = add_problem('Deleted', [{'input': '1', 'output': 'old'}])
+        old_id = old.id
+        assert testcases.get_prepared_test_cases(old) == ((b'1', 'old'),)
+        db.session.delete(old)
+        db.session.commit()
+
+        new = add_problem('Recreated', [{'input': '1', 'output': 'new'}])
+        assert new.id == old_id
+        assert testcases.get_prepared_test_cases(new) == ((b'1', 'new'),)
+
+    # Verifies that the prepared cache evicts least recently used sets once it exceeds its byte budget.
+    # Inputs: flask_app (fixture), test_db (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts cache contents)
+    # Contributor: Jay Patel
+    def test_cache_is_bounded_by_bytes(self, flask_app, test_db, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'TESTCASE_CACHE_MAX_BYTES', 100)
+        problems = [add_problem(f'Cached {i}', [{'input': str(i) * 40, 'output': str(i)}]) for i in range(3)]
+        for problem in problems:
+            testcases.get_prepared_test_cases(problem)
+
+        assert list(testcases.prepared_test_case_cache) == [(p.id, p.created_at, 1) for p in problems[1:]]
+        assert testcases.prepared_test_case_cache_bytes <= 100
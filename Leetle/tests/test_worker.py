@@ -0,0 +1,247 @@
+# This file tests remote judging, verifying that jobs run on connected judge workers, that a job whose worker dies is dispatched again, that silent workers are dropped after missing heartbeats, that a timed-out job fails alone, that workers must authenticate, that TCP port ranges give each process a port, and that validate_submission uses workers in remote mode.
+# Author: Jay Patel
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from leetle import dispatch
+from leetle.config import load_config
+from leetle.dispatch import Dispatcher, JudgeUnavailable
+from leetle.judge import validate_submission
+from leetle.protocol import connect, encode_message, judge_secret, read_message, sign_nonce
+
+PACKAGE_ROOT = os.path.join(os.path.dirname(__file__), '..')
+TWO_SUM_SOLUTION = os.path.join(os.path.dirname(__file__), 'reference_solutions', 'python', 'two_sum.py')
+ECHO_CASES = ((b'3\n', '3'), (b'hello\n', 'hello'))
+# The key worker processes started by the tests derive from the same environment
+SECRET = judge_secret(load_config())
+
+
+# Waits until a dispatcher has the given number of registered workers.
+# Inputs: dispatcher (Dispatcher), count (int)
+# Outputs: None
+# Contributor: Jay Patel
+def wait_for_workers(dispatcher, count):
+    deadline = time.monotonic() + 20
+    while len(dispatcher.snapshot()) != count:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+# Connects to a dispatcher and completes the handshake as a worker would, without judging anything.
+# Inputs: dispatcher (Dispatcher), worker_id (str), capacity (int), secret (bytes)
+# Outputs: (connected socket, its read stream)
+# Contributor: Jay Patel
+def register_fake_worker(dispatcher, worker_id, capacity, secret=SECRET):
+    sock = connect(dispatcher.address)
+    stream = sock.makefile('rb')
+    challenge = read_message(stream)
+    sock.sendall(encode_message({'type': 'register', 'worker_id': worker_id, 'capacity': capacity, 'nonce': '00',
+                                 'auth': sign_nonce(secret, 'worker', challenge['nonce'])}))
+    return sock, stream
+
+
+# Starts a dispatcher on a Unix socket in a temporary directory and stops it after the test.
+# Inputs: tmp_path (fixture)
+# Outputs: Yields a started Dispatcher
+# Contributor: Jay Patel
+@pytest.fixture
+def dispatcher(tmp_path):
+    started = Dispatcher('unix:' + str(tmp_path / 'judge.sock'), SECRET, heartbeat_timeout=3, worker_wait=2,
+                         job_timeout=30).start()
+    yield started
+    started.stop()
+
+
+# Starts two single-slot judge worker processes connected to the dispatcher and terminates them after the test.
+# Inputs: dispatcher (fixture)
+# Outputs: Yields a dictionary of worker id to worker process
+# Contributor: Jay Patel
+@pytest.fixture
+def workers(dispatcher):
+    processes = [subprocess.Popen([sys.executable, '-m', 'leetle.worker', '--connect', dispatcher.address,
+                                   '--capacity', '1', '--heartbeat-interval', '0.2'],
+                                  cwd=PACKAGE_ROOT, stderr=subprocess.DEVNULL)
+                 for _ in range(2)]
+    wait_for_workers(dispatcher, 2)
+    yield {f'{socket.gethostname()}-{process.pid}': process for process in processes}
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+class TestRemoteJudging:
+    """Test judging through the dispatcher and worker processes."""
+
+    # Verifies that correct and incorrect submissions get the same verdicts from a worker as from local judging.
+    # Inputs: dispatcher (fixture), workers (fixture)
+    # Outputs: None (Asserts verdicts)
+    # Contributor: Jay Patel
+    def test_worker_judges_jobs(self, dispatcher, workers):
+        is_valid, execution_time = dispatcher.run('python', 'print(input())', ECHO_CASES)
+        assert is_valid and execution_time > 0
+        assert dispatcher.run('python', "print('wrong')", ECHO_CASES)[0] is False
+        assert dispatcher.run('javascript', 'not valid javascript (', ECHO_CASES)[0] is False
+
+    # Verifies that concurrent jobs are spread across workers by load.
+    # Inputs: dispatcher (fixture), workers (fixture)
+    # Outputs: None (Asserts both workers were busy at once)
+    # Contributor: Jay Patel
+    def test_jobs_are_spread_across_workers(self, dispatcher, workers):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            dispatcher.run('python', 'import time\ntime.sleep(0.5)\nprint(input())', ECHO_CASES[:1])))
+            for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while [worker['jobs'] for worker in dispatcher.snapshot()] != [1, 1]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        assert [result[0] for result in results] == [True, True]
+
+    # Verifies that a job whose worker is killed mid-run is judged by the remaining worker.
+    # Inputs: dispatcher (fixture), workers (fixture)
+    # Outputs: None (Asserts the verdict and the remaining workers)
+    # Contributor: Jay Patel
+    def test_job_is_redispatched_when_worker_dies(self, dispatcher, workers):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            dispatcher.run('python', 'import time\ntime.sleep(1)\nprint(input())', ECHO_CASES[:1])))
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not any(worker['jobs'] for worker in dispatcher.snapshot()):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        busy = next(worker['worker_id'] for worker in dispatcher.snapshot() if worker['jobs'])
+        workers[busy].kill()
+        thread.join(15)
+
+        assert results and results[0][0] is True
+        assert busy not in [worker['worker_id'] for worker in dispatcher.snapshot()]
+
+    # Verifies that a worker that registers but never sends heartbeats is dropped, and that its job fails over to JudgeUnavailable when no other worker exists.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts the worker is dropped and the error raised)
+    # Contributor: Jay Patel
+    def test_silent_worker_is_dropped(self, tmp_path):
+        silent = Dispatcher('unix:' + str(tmp_path / 'silent.sock'), SECRET, heartbeat_timeout=0.3, worker_wait=0.5).start()
+        try:
+            sock, _ = register_fake_worker(silent, 'hung', 4)
+            wait_for_workers(silent, 1)
+
+            started = time.monotonic()
+            with pytest.raises(JudgeUnavailable):
+                silent.run('python', 'print(input())', ECHO_CASES)
+            assert time.monotonic() - started < 5
+            assert silent.snapshot() == []
+            sock.close()
+        finally:
+            silent.stop()
+
+
+    # Verifies that a job that times out fails alone, leaving its worker registered and its late result ignored.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts the error, the worker and the next job's result)
+    # Contributor: Jay Patel
+    def test_job_timeout_keeps_worker(self, tmp_path):
+        slow = Dispatcher('unix:' + str(tmp_path / 'slow.sock'), SECRET, job_timeout=0.3).start()
+        try:
+            sock, stream = register_fake_worker(slow, 'slow', 4)
+            assert read_message(stream)['type'] == 'welcome'
+            wait_for_workers(slow, 1)
+
+            with pytest.raises(JudgeUnavailable, match='timed out'):
+                slow.run('python', 'print(input())', ECHO_CASES)
+            late = read_message(stream)
+            sock.sendall(encode_message({'type': 'result', 'job_id': late['job_id'], 'is_valid': True,
+                                         'execution_time': 9.0}))
+            assert [worker['jobs'] for worker in slow.snapshot()] == [0]
+
+            results = []
+            thread = threading.Thread(target=lambda: results.append(slow.run('python', 'print(1)', ECHO_CASES)))
+            thread.start()
+            job = read_message(stream)
+            sock.sendall(encode_message({'type': 'result', 'job_id': job['job_id'], 'is_valid': False,
+                                         'execution_time': 0.1}))
+            thread.join(5)
+            assert results == [(False, 0.1)]
+            sock.close()
+        finally:
+            slow.stop()
+
+
+class TestJudgeProtocolSecurity:
+    """Test worker authentication and per-process TCP ports."""
+
+    # Verifies that a worker without the judge key is disconnected before it is registered or sent a job.
+    # Inputs: tmp_path (fixture)
+    # Outputs: None (Asserts the closed connection and empty worker list)
+    # Contributor: Jay Patel
+    def test_unauthenticated_worker_is_rejected(self, tmp_path):
+        guarded = Dispatcher('unix:' + str(tmp_path / 'guarded.sock'), SECRET).start()
+        try:
+            sock, stream = register_fake_worker(guarded, 'intruder', 4, secret=b'wrong key')
+            assert read_message(stream) is None
+            assert guarded.snapshot() == []
+            sock.close()
+        finally:
+            guarded.stop()
+
+    # Verifies that dispatchers sharing a TCP port range each bind their own loopback port, that a full range is reported, and that a worker given the range registers with all of them.
+    # Inputs: None
+    # Outputs: None (Asserts bound addresses and registrations)
+    # Contributor: Jay Patel
+    def test_port_range_gives_each_process_a_port(self):
+        probe = socket.socket()
+        probe.bind(('127.0.0.1', 0))
+        first = probe.getsockname()[1]
+        probe.close()
+        address = f':{first}-{first + 1}'
+
+        dispatchers = [Dispatcher(address, SECRET).start(), Dispatcher(address, SECRET).start()]
+        process = None
+        try:
+            assert sorted(d.address for d in dispatchers) == [f':{first}', f':{first + 1}']
+            with pytest.raises(OSError, match='in use'):
+                Dispatcher(address, SECRET).start()
+
+            process = subprocess.Popen([sys.executable, '-m', 'leetle.worker', '--connect', f'127.0.0.1:{first}-{first + 1}',
+                                        '--capacity', '1', '--heartbeat-interval', '0.2'],
+                                       cwd=PACKAGE_ROOT, stderr=subprocess.DEVNULL)
+            for started in dispatchers:
+                wait_for_workers(started, 1)
+        finally:
+            if process is not None:
+                process.kill()
+                process.wait()
+            for started in dispatchers:
+                started.stop()
+
+
+class TestRemoteMode:
+    """Test validate_submission with JUDGE_MODE=remote."""
+
+    # Verifies that in remote mode a problem's prepared test cases are judged by a worker.
+    # Inputs: flask_app (fixture), problems_data (fixture), dispatcher (fixture), workers (fixture), monkeypatch (fixture)
+    # Outputs: None (Asserts verdicts)
+    # Contributor: Jay Patel
+    def test_validate_submission_uses_workers(self, flask_app, problems_data, dispatcher, workers, monkeypatch):
+        monkeypatch.setitem(flask_app.config, 'JUDGE_MODE', 'remote')
+        monkeypatch.setattr(dispatch, 'dispatcher', dispatcher)
+        monkeypatch.setattr(dispatch, 'dispatcher_pid', os.getpid())
+
+        problem = problems_data['two_sum']
+        with open(TWO_SUM_SOLUTION) as f:
+            assert validate_submission(problem, 'python', f.read())[0] is True
+        assert validate_submission(problem, 'python', "print('[]')")[0] is False